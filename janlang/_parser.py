@@ -1,41 +1,110 @@
 import astree as ast
 from contextlib import contextmanager
+import functools
 import tokens
-from typing import List, Type, Never, Generic, TypeVar
+from typing import Callable, List, Type, Never, Generic, TypeVar
 
 TokenType = TypeVar("TokenType", bound=tokens.BaseToken)
 
-comparison_tokens: dict[Type[tokens.BaseToken], Type[ast.ComparisonOperator]] = {
-    tokens.Eq: ast.Eq,
-    tokens.NotEq: ast.NotEq,
-    tokens.Gt: ast.Gt,
-    tokens.GtE: ast.GtE,
-    tokens.Lt: ast.Lt,
-    tokens.LtE: ast.LtE,
-}
-binary_tokens_to_ast_nodes: dict[Type[tokens.BaseToken], Type[ast.Operator]] = {
-    **comparison_tokens,
-    tokens.Star: ast.Multiply,
-    tokens.Plus: ast.Add,
-    tokens.Minus: ast.Subtract,
+LOWEST_PRECEDENCE = OR = 1
+AND = 2
+COMPARISON = 3
+ADDITIVE = 4
+MULTIPLICATIVE = 5
+EXPONENT = 6
+
+
+class BinaryOperator:
+    def __init__(self, precedence: int, node_type: Type, right_associative=False,
+                 build: Callable[[ast.Expr, ast.Expr], ast.Expr] | None = None):
+        self.precedence = precedence
+        self.node_type = node_type
+        self.right_associative = right_associative
+        # operators with a node of their own pass its constructor, the rest wrap node_type in a BinOp
+        self.build = build or self.build_bin_op
+
+    def build_bin_op(self, left: ast.Expr, right: ast.Expr) -> ast.BinOp:
+        return ast.BinOp(left, self.node_type(), right)
+
+
+binary_operators: dict[Type[tokens.BaseToken], BinaryOperator] = {
+    tokens.OrToken: BinaryOperator(OR, ast.Or, build=ast.Or),
+    tokens.AndToken: BinaryOperator(AND, ast.And, build=ast.And),
+    tokens.Eq: BinaryOperator(COMPARISON, ast.Eq),
+    tokens.NotEq: BinaryOperator(COMPARISON, ast.NotEq),
+    tokens.Gt: BinaryOperator(COMPARISON, ast.Gt),
+    tokens.GtE: BinaryOperator(COMPARISON, ast.GtE),
+    tokens.Lt: BinaryOperator(COMPARISON, ast.Lt),
+    tokens.LtE: BinaryOperator(COMPARISON, ast.LtE),
+    tokens.Plus: BinaryOperator(ADDITIVE, ast.Add),
+    tokens.Minus: BinaryOperator(ADDITIVE, ast.Subtract),
+    tokens.Star: BinaryOperator(MULTIPLICATIVE, ast.Multiply),
+    tokens.Slash: BinaryOperator(MULTIPLICATIVE, ast.Divide),
+    tokens.DoubleStar: BinaryOperator(EXPONENT, ast.Exponent, right_associative=True, build=ast.Exponent),
 }
 
+
+def memoized(parse_fn):
+    """
+    packrat memoization keyed by (rule, position, args), only active when the
+    parser was created with memoize=True. Soft failures are cached as well so
+    a failed alternative is never re-parsed from the same position
+    """
+    rule = parse_fn.__name__
+
+    @functools.wraps(parse_fn)
+    def wrapper(self: "Parser", *args):
+        if self.memo is None:
+            return parse_fn(self, *args)
+        key = (rule, self.pos, args)
+        entry = self.memo.get(key)
+        if entry is not None:
+            self.memo_stats.hits += 1
+            result, self.pos, error = entry
+            if error is not None:
+                raise error.with_traceback(None)
+            return result
+        self.memo_stats.misses += 1
+        try:
+            result = parse_fn(self, *args)
+        except ParseError as e:
+            self.memo[key] = (None, self.pos, e)
+            raise
+        self.memo[key] = (result, self.pos, None)
+        return result
+
+    return wrapper
+
+
+class MemoStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"MemoStats(hits={self.hits}, misses={self.misses})"
+
+
 class Parser:
-    def __init__(self, _tokens):
+    def __init__(self, _tokens, memoize=False):
         self.tokens: list[tokens.BaseToken] = _tokens
         self.pos = 0
+        self.memo: dict | None = {} if memoize else None
+        self.memo_stats = MemoStats()
         self.errors = []
         self._hard_fail_on_error = False
         self.statement_parse_order = (
             self.parse_function_definition,
             self.parse_class_definition,
             self.parse_return_statement,
+            self.parse_yield_statement,
             self.parse_if_statement,
             self.parse_while_statement,
             self.parse_for_statement,
             self.parse_continue_statement,
             self.parse_break_statement,
             self.parse_assert_statement,
+            self.parse_import_statement,
             # self.parse_assign_and_declaration_statement,
             self.parse_declaration_statement,
             self.parse_assign_statement,
@@ -88,9 +157,12 @@ class Parser:
         expecting a valid statement here, so hard error if everything errors
         """
         start_pos = self.pos
+        line = self.peek().source[1]
         for parse_fn in self.statement_parse_order:
             try:
-                return parse_fn()
+                result = parse_fn()
+                result.line = line
+                return result
             except ParseError:
                 self.pos = start_pos
         start_pos = self.pos
@@ -211,6 +283,15 @@ class Parser:
         self.require(tokens.NL)
         return ast.Return(val)
 
+    def parse_yield_statement(self):
+        self.expect(tokens.Yield)
+        try:
+            val = self.parse_expression()
+        except ParseError:
+            val = None
+        self.require(tokens.NL)
+        return ast.Yield(val)
+
     def parse_block(self):
         self.expect(tokens.Indent)
         stmts = self.parse_statements()
@@ -220,35 +301,6 @@ class Parser:
         filtered_pass_stmts = [x for x in stmts if not isinstance(x, PassResult)]
         return ast.Block(filtered_pass_stmts)
 
-    def parse_operations(self, next_parse_fn, operator_tokens):
-        operands: list[ast.Expr] = []
-        operators: list[ast.Operator] = []
-        while True:
-            try:
-                if len(operands) == len(operators):
-                    node = next_parse_fn()
-                    add_list = operands
-                else:
-                    tok = self.expect(*operator_tokens)
-                    node: ast.Operator = binary_tokens_to_ast_nodes[type(tok)]()
-                    add_list = operators
-            except ParseError as e:
-                if not operands:
-                    raise e
-                break
-            else:
-                add_list.append(node)
-        assert not operands or len(operands) - 1 == len(operators)
-        return operands, operators
-
-    def binop_tree(self, next_parse_fn, operator_tokens):
-        operands, operators = self.parse_operations(next_parse_fn, operator_tokens)
-        left = operands[0]
-        for i, op in enumerate(operators, start=1):
-            right = operands[i]
-            left = ast.BinOp(left, op, right)
-        return left
-
     def parse_pass_statement(self):
         self.expect(tokens.Pass)
         self.require(tokens.NL)
@@ -259,25 +311,41 @@ class Parser:
         self.require(tokens.NL)
         return result
 
-    def parse_expression(self) -> ast.Expr:
-        return self.parse_compare()
-
-    def parse_compare(self):
-        op_tokens = tuple(comparison_tokens)
-        (left, *comparators), operators = self.parse_operations(
-            self.parse_additive, op_tokens
-        )
-        if not comparators:
-            return left
-        return ast.Compare(left, operators, comparators)
-
-    def parse_additive(self):
-        op_tokens = (tokens.Plus, tokens.Minus)
-        return self.binop_tree(self.parse_multiplicative, op_tokens)
-
-    def parse_multiplicative(self):
-        op_tokens = (tokens.Star, tokens.Slash)
-        return self.binop_tree(self.parse_unary, op_tokens)
+    @memoized
+    def parse_expression(self, min_precedence=LOWEST_PRECEDENCE) -> ast.Expr:
+        """
+        precedence climbing over binary_operators, operators are found by peeking
+        so the end of an operand run never raises
+        """
+        left = self.parse_unary()
+        while True:
+            operator = binary_operators.get(type(self.peek()))
+            if operator is None or operator.precedence < min_precedence:
+                return left
+            self.advance()
+            if operator.precedence == COMPARISON:
+                left = self.finish_compare(left, operator)
+                continue
+            next_precedence = operator.precedence
+            if not operator.right_associative:
+                next_precedence += 1
+            right = self.parse_operand(next_precedence)
+            left = operator.build(left, right)
+
+    def parse_operand(self, min_precedence: int) -> ast.Expr:
+        with self.reraise_parse_error("Expecting an expression after operator"):
+            return self.parse_expression(min_precedence)
+
+    def finish_compare(self, left: ast.Expr, operator: "BinaryOperator") -> ast.Compare:
+        ops: list[ast.ComparisonOperator] = []
+        comparators: list[ast.Expr] = []
+        while True:
+            ops.append(operator.node_type())
+            comparators.append(self.parse_operand(COMPARISON + 1))
+            operator = binary_operators.get(type(self.peek()))
+            if operator is None or operator.precedence != COMPARISON:
+                return ast.Compare(left, ops, comparators)
+            self.advance()
 
     def parse_grouping(self):
         self.expect(tokens.OpenParen)
@@ -286,18 +354,19 @@ class Parser:
         self.require(tokens.CloseParen)
         return expr
 
+    @memoized
     def parse_unary(self):
-        try:
-            tok = self.expect(tokens.Not, tokens.Minus)
-        except ParseError:
+        tok = self.peek()
+        if not isinstance(tok, (tokens.Not, tokens.Minus)):
             return self.parse_primary()
-        expr = self.parse_unary()
+        self.advance()
+        # unary operators bind looser than ** so -2 ** 2 is -(2 ** 2)
+        expr = self.parse_operand(EXPONENT)
         if isinstance(tok, tokens.Not):
             return ast.Not(expr)
-        if isinstance(tok, tokens.Minus):
-            return ast.Negative(expr)
-        raise NotImplementedError
+        return ast.Negative(expr)
 
+    @memoized
     def parse_primary(self):
         start_pos = self.pos
         node: ast.Expr | None = None
@@ -365,6 +434,12 @@ class Parser:
             test = self.parse_expression()
         return ast.AssertStatement(test)
 
+    def parse_import_statement(self):
+        self.expect(tokens.Import)
+        name = self.require(tokens.Name, "Expecting a module name after import")
+        self.require(tokens.NL)
+        return ast.Import(name.value)
+
     def parse_boolean(self):
         tok = self.expect(tokens.TrueToken, tokens.FalseToken)
         if isinstance(tok, tokens.TrueToken):
@@ -483,12 +558,15 @@ class Parser:
         return cls_def
     
     def parse_method(self):
+        line = self.peek().source[1]
         name = self.require(tokens.Name).value
         self.require(tokens.OpenParen)
         params = self.parse_parameters()
         self.require(tokens.CloseParen)
         body = self.colon_newline_and_block()
-        return ast.FunctionDefinition(name, params, [], body)
+        method = ast.FunctionDefinition(name, params, [], body)
+        method.line = line
+        return method
 
     def expect_greedy(self, *types, min_to_pass=1):
         count = 0
@@ -543,7 +621,7 @@ class Parser:
         error_msg = f'Got an error at line {line}, "{text}" {tok}'
         if msg:
             error_msg += f"\n{msg}"
-        raise error_class(error_msg)
+        raise error_class(error_msg, line)
 
     def error(self, msg=""):
         self._error(msg, ParseError)
@@ -556,8 +634,12 @@ class PassResult():
     pass
 
 class ParseError(Exception):
-    pass
+    def __init__(self, message="", line: int | None = None):
+        super().__init__(message)
+        self.line = line
 
 
 class HardParseError(Exception):
-    pass
+    def __init__(self, message="", line: int | None = None):
+        super().__init__(message)
+        self.line = line
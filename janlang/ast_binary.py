@@ -0,0 +1,233 @@
+"""
+compact binary serialization of astree nodes
+
+Values are written as a tag byte followed by their payload. Strings and node
+shapes (a node class plus its field names) are interned: the first occurrence
+is written in full and later ones refer back to it by index, so repeated names
+and node types cost a couple of bytes each. Loading only ever instantiates
+classes defined in astree.
+"""
+import struct
+import astree as ast
+
+MAGIC = b"JANAST\x01"
+
+NONE, TRUE, FALSE, INT, NEG_INT, FLOAT, STR, STR_REF, LIST, TUPLE, DICT, SHAPE, NODE = range(13)
+
+pack_float = struct.Struct("<d").pack
+unpack_float = struct.Struct("<d").unpack_from
+
+
+class FormatError(Exception):
+    pass
+
+
+def dumps(root) -> bytes:
+    writer = Writer()
+    writer.write(root)
+    return MAGIC + bytes(writer.out)
+
+
+def loads(data: bytes):
+    if not data.startswith(MAGIC):
+        raise FormatError("Not a binary jan AST")
+    reader = Reader(data, len(MAGIC))
+    try:
+        root = reader.read()
+    except (IndexError, TypeError, ValueError, struct.error):
+        raise FormatError("Corrupt or truncated AST") from None
+    if reader.pos != len(data):
+        raise FormatError("Trailing data after AST")
+    return root
+
+
+class Writer:
+    def __init__(self):
+        self.out = bytearray()
+        self.strings: dict[str, int] = {}
+        self.shapes: dict[tuple, int] = {}
+
+    def varint(self, n: int):
+        out = self.out
+        while n > 0x7F:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+
+    def string(self, s: str):
+        index = self.strings.get(s)
+        if index is not None:
+            self.out.append(STR_REF)
+            self.varint(index)
+            return
+        self.strings[s] = len(self.strings)
+        encoded = s.encode()
+        self.out.append(STR)
+        self.varint(len(encoded))
+        self.out += encoded
+
+    def write(self, root):
+        out = self.out
+        # values still to be written, last one first, so deep trees don't recurse
+        stack = [root]
+        while stack:
+            value = stack.pop()
+            cls = type(value)
+            if value is None:
+                out.append(NONE)
+            elif cls is bool:
+                out.append(TRUE if value else FALSE)
+            elif cls is int:
+                if value >= 0:
+                    out.append(INT)
+                    self.varint(value)
+                else:
+                    out.append(NEG_INT)
+                    self.varint(-value)
+            elif cls is float:
+                out.append(FLOAT)
+                out += pack_float(value)
+            elif cls is str:
+                self.string(value)
+            elif cls is list or cls is tuple:
+                out.append(LIST if cls is list else TUPLE)
+                self.varint(len(value))
+                stack.extend(reversed(value))
+            elif cls is dict:
+                out.append(DICT)
+                self.varint(len(value))
+                for k, v in reversed(value.items()):
+                    stack.append(v)
+                    stack.append(k)
+            elif getattr(ast, cls.__name__, None) is cls:
+                fields = value.__dict__
+                shape = (cls, *fields)
+                index = self.shapes.get(shape)
+                if index is None:
+                    index = self.shapes[shape] = len(self.shapes)
+                    out.append(SHAPE)
+                    self.string(cls.__name__)
+                    self.varint(len(fields))
+                    for name in fields:
+                        self.string(name)
+                else:
+                    out.append(NODE)
+                    self.varint(index)
+                stack.extend(reversed(fields.values()))
+            else:
+                raise FormatError(f"Cannot serialize {cls.__name__}")
+
+
+class Reader:
+    def __init__(self, data: bytes, pos: int):
+        self.data = data
+        self.pos = pos
+        self.strings: list[str] = []
+        self.shapes: list[tuple[type, tuple[str, ...]]] = []
+
+    def varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        self.pos = pos + 1
+        if byte < 0x80:
+            return byte
+        result = byte & 0x7F
+        shift = 7
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def string(self) -> str:
+        tag = self.data[self.pos]
+        self.pos += 1
+        if tag == STR_REF:
+            return self.strings[self.varint()]
+        if tag != STR:
+            raise FormatError("Expected a string")
+        length = self.varint()
+        end = self.pos + length
+        if end > len(self.data):
+            raise FormatError("Truncated AST")
+        s = self.data[self.pos:end].decode()
+        self.pos = end
+        self.strings.append(s)
+        return s
+
+    def read(self):
+        data = self.data
+        varint = self.varint
+        # containers still being filled, innermost last: [tag, values left,
+        # values, node shape]; kept on a list so deep trees don't recurse
+        stack: list[list] = []
+        while True:
+            try:
+                tag = data[self.pos]
+            except IndexError:
+                raise FormatError("Truncated AST") from None
+            if tag == STR or tag == STR_REF:
+                value = self.string()
+            else:
+                self.pos += 1
+                if tag == NODE or tag == SHAPE:
+                    if tag == NODE:
+                        shape = self.shapes[varint()]
+                    else:
+                        cls = getattr(ast, self.string(), None)
+                        if not isinstance(cls, type):
+                            raise FormatError("Unknown node type")
+                        shape = (cls, tuple([self.string() for _ in range(varint())]))
+                        self.shapes.append(shape)
+                    if shape[1]:
+                        stack.append([NODE, len(shape[1]), [], shape])
+                        continue
+                    value = build(NODE, [], shape)
+                elif tag == LIST or tag == TUPLE or tag == DICT:
+                    count = varint() * (2 if tag == DICT else 1)
+                    if count:
+                        stack.append([tag, count, [], None])
+                        continue
+                    value = build(tag, [], None)
+                elif tag == INT:
+                    value = varint()
+                elif tag == NONE:
+                    value = None
+                elif tag == TRUE:
+                    value = True
+                elif tag == FALSE:
+                    value = False
+                elif tag == NEG_INT:
+                    value = -varint()
+                elif tag == FLOAT:
+                    (value,) = unpack_float(data, self.pos)
+                    self.pos += 8
+                else:
+                    raise FormatError(f"Unknown tag {tag}")
+            # hand the value to its container, and finished containers to theirs
+            while stack:
+                frame = stack[-1]
+                frame[2].append(value)
+                frame[1] -= 1
+                if frame[1]:
+                    break
+                stack.pop()
+                value = build(frame[0], frame[2], frame[3])
+            else:
+                return value
+
+
+def build(tag: int, values: list, shape):
+    if tag == NODE:
+        cls, names = shape
+        node = cls.__new__(cls)
+        node.__dict__.update(zip(names, values))
+        return node
+    if tag == LIST:
+        return values
+    if tag == TUPLE:
+        return tuple(values)
+    return dict(zip(values[::2], values[1::2]))
@@ -1,4 +1,5 @@
 import json
+from json.encoder import encode_basestring_ascii
 import astree as ast
 
 def dumps(root):
@@ -6,4 +7,85 @@ def dumps(root):
         root,
         default=lambda x: {'_type': x.__class__.__name__, **x.__dict__},
         indent=4,
-    )
\ No newline at end of file
+    )
+
+
+def dump(root, fp, indent=4, chunk_size=1 << 16):
+    """
+    stream root to fp as the same JSON dumps produces, without holding the whole
+    document in memory or recursing, so arbitrarily large and deep trees can be written
+    """
+    parts: list[str] = []
+    size = 0
+    for part in iter_json(root, indent):
+        parts.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            fp.write(''.join(parts))
+            parts.clear()
+            size = 0
+    fp.write(''.join(parts))
+
+
+def iter_json(root, indent=4):
+    item_separator = ',' if indent is not None else ', '
+    stack: list = [(root, 0)]
+    while stack:
+        entry = stack.pop()
+        if type(entry) is str:
+            yield entry
+            continue
+        value, depth = entry
+        if value is None:
+            yield 'null'
+        elif value is True:
+            yield 'true'
+        elif value is False:
+            yield 'false'
+        elif isinstance(value, str):
+            yield encode_basestring_ascii(value)
+        elif isinstance(value, int):
+            yield int.__repr__(value)
+        elif isinstance(value, float):
+            yield json_float(value)
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                yield '[]'
+                continue
+            yield '['
+            push_items(stack, [(None, item) for item in value], depth, indent, item_separator, ']')
+        else:
+            if isinstance(value, dict):
+                items = list(value.items())
+            else:
+                items = [('_type', value.__class__.__name__), *value.__dict__.items()]
+            if not items:
+                yield '{}'
+                continue
+            yield '{'
+            push_items(stack, items, depth, indent, item_separator, '}')
+
+
+def push_items(stack, items, depth, indent, item_separator, close):
+    # pushed in reverse so the first item is popped first
+    if indent is None:
+        newline = inner_newline = ''
+    else:
+        newline = '\n' + ' ' * (indent * depth)
+        inner_newline = '\n' + ' ' * (indent * (depth + 1))
+    stack.append(newline + close)
+    for i in range(len(items) - 1, -1, -1):
+        key, item = items[i]
+        stack.append((item, depth + 1))
+        prefix = inner_newline if i == 0 else item_separator + inner_newline
+        if key is not None:
+            prefix += encode_basestring_ascii(key) + ': '
+        stack.append(prefix)
+
+
+def json_float(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return 'Infinity' if value > 0 else '-Infinity'
+    return float.__repr__(value)
@@ -1,9 +1,9 @@
 from __future__ import annotations
-from typing import List as ListType, TypeAlias
 
 
 class BaseNode:
-    pass
+    # source line of statements, set by the front ends
+    line: int | None = None
 
 
 class Expr(BaseNode):
@@ -17,7 +17,7 @@ class Program(BaseNode):
 
 class Block(BaseNode):
     def __init__(self, statements):
-        self.statements: ListType[BaseNode] = statements
+        self.statements: list[BaseNode] = statements
 
 
 class Module(BaseNode):
@@ -65,7 +65,7 @@ class NotEq:
         return left != right
 
 
-ComparisonOperator: TypeAlias = Gt | GtE | Lt | LtE | Eq | NotEq
+ComparisonOperator = Gt | GtE | Lt | LtE | Eq | NotEq
 
 
 class Add:
@@ -88,7 +88,7 @@ class Divide:
         return left / right
 
 
-Operator: TypeAlias = Add | Subtract | Multiply | Divide | ComparisonOperator
+Operator = Add | Subtract | Multiply | Divide | ComparisonOperator
 
 
 class String(Expr):
@@ -155,14 +155,14 @@ class And(Expr):
 
 class Compare(Expr):
     def __init__(self, left, ops, comparators):
-        self.left: ListType[BaseNode] = left
-        self.ops: ListType[ComparisonOperator] = ops
-        self.comparators: ListType[BaseNode] = comparators
+        self.left: list[BaseNode] = left
+        self.ops: list[ComparisonOperator] = ops
+        self.comparators: list[BaseNode] = comparators
 
 
 class List(Expr):
     def __init__(self, items):
-        self.items: ListType[BaseNode] = items
+        self.items: list[BaseNode] = items
 
 
 class Dictionary(Expr):
@@ -255,10 +255,20 @@ class Return(BaseNode):
         self.value: Expr | None = value
 
 
+class Yield(BaseNode):
+    def __init__(self, value):
+        self.value: Expr | None = value
+
+
 class AssertStatement(BaseNode):
     def __init__(self, test):
         self.test: Expr = test
 
+
+class Import(BaseNode):
+    def __init__(self, name: str):
+        self.name = name
+
 class Null(Expr):
     pass
 
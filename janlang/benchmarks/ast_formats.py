@@ -0,0 +1,37 @@
+"""
+size and speed of the AST serialization formats
+
+    python -m benchmarks.ast_formats --lines 20000
+"""
+import argparse
+import io
+import time
+import ast_binary
+import ast_json
+import frontend
+from benchmarks.parsers import best_of, build_input, sample_sources
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark AST serialization")
+    arg_parser.add_argument("--lines", type=int, default=20_000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+    program = frontend.parse_native(build_input(sample_sources(), args.lines))
+    data = ast_binary.dumps(program)
+    formats = {
+        "json dumps": (lambda: ast_json.dumps(program), None),
+        "json stream": (lambda: ast_json.dump(program, io.StringIO()), None),
+        "binary": (lambda: ast_binary.dumps(program), lambda: ast_binary.loads(data)),
+    }
+    json_size = len(ast_json.dumps(program))
+    print(f"{'format':<12} {'size':>12} {'write':>9} {'read':>9}")
+    for name, (write, read) in formats.items():
+        size = len(data) if name == "binary" else json_size
+        write_time = best_of(write, args.repeat)
+        read_time = f"{best_of(read, args.repeat):>8.3f}s" if read else f"{'-':>9}"
+        print(f"{name:<12} {size:>12} {write_time:>8.3f}s {read_time}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+scaling of the parallel build over worker counts on a generated corpus
+
+    python -m benchmarks.build --files 400 --lines 200 --jobs 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+import build
+from benchmarks.parsers import build_input, sample_sources
+
+
+def write_corpus(directory: str, file_count: int, line_count: int) -> list[str]:
+    text = build_input(sample_sources(), line_count)
+    paths = []
+    for i in range(file_count):
+        path = os.path.join(directory, f"module_{i:04}.jan")
+        with open(path, "w") as f:
+            # vary each file so no two share a cache key
+            f.write(f"var module_id = {i}\n{text}")
+        paths.append(path)
+    return paths
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the parallel build")
+    arg_parser.add_argument("--files", type=int, default=400)
+    arg_parser.add_argument("--lines", type=int, default=200)
+    arg_parser.add_argument("--jobs", type=int, nargs="+",
+                            default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(directory, args.files, args.lines)
+        print(f"{args.files} files of ~{args.lines} lines, {os.cpu_count()} cpus")
+        print(f"{'jobs':>5} {'time':>9} {'speedup':>8}")
+        serial = None
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            results = build.compile_sources(paths, jobs, force=True)
+            elapsed = time.perf_counter() - start
+            assert not build.merge_diagnostics(results)
+            serial = serial or elapsed
+            print(f"{jobs:>5} {elapsed:>8.3f}s {serial / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+time and memory of lexing, parsing and executing generated programs as they grow
+
+    python -m benchmarks.frontend_scaling --lines 1000 10000 100000 1000000
+
+Each stage is timed in one pass and its peak traced memory measured in a
+second pass, since tracemalloc slows allocation heavy code down several times.
+The "exp" columns are the growth exponent against the previous size, about 1.0
+for linear behavior; anything clearly above that is superlinear.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import math
+import time
+import tracemalloc
+import interpreter
+import lexer
+import _parser as parser
+from benchmarks.generate import Shape, generate
+
+
+def stages(text: str, execute: bool):
+    tokens = []
+    program = []
+
+    def tokenize():
+        tokens[:] = [list(lexer.RuleLexer(text).tokenize())]
+
+    def parse():
+        program[:] = [parser.Parser(tokens[0]).parse_root()]
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.Interpreter().execute(program[0])
+
+    result = {"tokenize": tokenize, "parse": parse}
+    if execute:
+        result["execute"] = run
+    return result
+
+
+def measure(text: str, execute: bool) -> dict[str, tuple[float, int]]:
+    timings = {}
+    for name, fn in stages(text, execute).items():
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings[name] = time.perf_counter() - start
+    peaks = {}
+    for name, fn in stages(text, execute).items():
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {name: (timings[name], peaks[name]) for name in timings}
+
+
+def exponent(size, previous_size, value, previous_value):
+    if not previous_size or not previous_value or not value:
+        return float("nan")
+    return math.log(value / previous_value) / math.log(size / previous_size)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark front end scaling on generated programs")
+    arg_parser.add_argument("--lines", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    arg_parser.add_argument("--execute-max-lines", type=int, default=100_000,
+                            help="skip execution for larger programs")
+    arg_parser.add_argument("--nesting", type=int, default=8)
+    arg_parser.add_argument("--expression", type=int, default=20)
+    arg_parser.add_argument("--list-size", type=int, default=50)
+    arg_parser.add_argument("--string-length", type=int, default=80)
+    args = arg_parser.parse_args()
+    shape = Shape(args.nesting, args.expression, list_size=args.list_size, string_length=args.string_length)
+
+    print(f"{'lines':>9} {'stage':<9} {'time':>9} {'us/line':>8} {'exp':>5} {'peak MB':>9} {'exp':>5}")
+    previous: dict[str, tuple[int, float, int]] = {}
+    for line_count in args.lines:
+        text = generate(line_count, shape)
+        results = measure(text, line_count <= args.execute_max_lines)
+        for stage, (elapsed, peak) in results.items():
+            previous_lines, previous_time, previous_peak = previous.get(stage, (0, 0.0, 0))
+            print(
+                f"{line_count:>9} {stage:<9} {elapsed:>8.3f}s {elapsed / line_count * 1e6:>8.2f}"
+                f" {exponent(line_count, previous_lines, elapsed, previous_time):>5.2f}"
+                f" {peak / (1 << 20):>9.1f} {exponent(line_count, previous_lines, peak, previous_peak):>5.2f}"
+            )
+            previous[stage] = (line_count, elapsed, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+generate large, valid jan programs of a configurable shape
+
+    python -m benchmarks.generate --lines 100000 --nesting 40 > big.jan
+
+The program is built from repeated units: function definitions with a call,
+nested if blocks, long arithmetic chains, list literals and string literals.
+Every unit runs to completion, so the output can be executed as well as parsed.
+"""
+import argparse
+import random
+import sys
+
+UNITS = ("function", "nesting", "expression", "list", "string")
+
+
+class Shape:
+    def __init__(
+        self,
+        nesting_depth=8,
+        expression_length=20,
+        function_statements=4,
+        list_size=50,
+        string_length=80,
+        units=UNITS,
+    ):
+        self.nesting_depth = nesting_depth
+        self.expression_length = expression_length
+        self.function_statements = function_statements
+        self.list_size = list_size
+        self.string_length = string_length
+        self.units = units
+
+
+class Generator:
+    def __init__(self, shape: Shape, seed=0):
+        self.shape = shape
+        self.random = random.Random(seed)
+        self.count = 0
+
+    def name(self, prefix: str) -> str:
+        self.count += 1
+        return f"{prefix}_{self.count}"
+
+    def expression(self, length: int, operand="1") -> str:
+        parts = [operand]
+        for _ in range(length - 1):
+            parts.append(self.random.choice("+-*"))
+            parts.append(str(self.random.randrange(1, 10)))
+        return " ".join(parts)
+
+    def function(self) -> list[str]:
+        name = self.name("fn")
+        lines = [f"def {name}(a, b):", "    var mut total = a"]
+        for _ in range(self.shape.function_statements):
+            lines.append(f"    total = total + {self.expression(4, 'b')}")
+        lines += ["    return total", f"var {self.name('result')} = {name}(1, 2)"]
+        return lines
+
+    def nesting(self) -> list[str]:
+        name = self.name("depth")
+        lines = [f"var mut {name} = 0"]
+        for level in range(self.shape.nesting_depth):
+            indent = "    " * level
+            lines.append(f"{indent}if {level} < {level + 1}:")
+            lines.append(f"{indent}    {name} = {name} + 1")
+        return lines
+
+    def expression_unit(self) -> list[str]:
+        return [f"var {self.name('expr')} = {self.expression(self.shape.expression_length)}"]
+
+    def list_unit(self) -> list[str]:
+        items = ", ".join(str(self.random.randrange(1000)) for _ in range(self.shape.list_size))
+        return [f"var {self.name('items')} = [{items}]"]
+
+    def string_unit(self) -> list[str]:
+        letters = "abcdefghijklmnopqrstuvwxyz "
+        text = "".join(self.random.choice(letters) for _ in range(self.shape.string_length))
+        return [f"var {self.name('text')} = \"{text}\""]
+
+    def unit(self, kind: str) -> list[str]:
+        return {
+            "function": self.function,
+            "nesting": self.nesting,
+            "expression": self.expression_unit,
+            "list": self.list_unit,
+            "string": self.string_unit,
+        }[kind]()
+
+    def lines(self, line_count: int):
+        produced = 0
+        while produced < line_count:
+            for kind in self.shape.units:
+                for line in self.unit(kind):
+                    yield line
+                    produced += 1
+                if produced >= line_count:
+                    return
+
+
+def generate(line_count: int, shape: Shape | None = None, seed=0) -> str:
+    """a program of at least line_count lines, stopping at the end of a unit"""
+    generator = Generator(shape or Shape(), seed)
+    return "\n".join(generator.lines(line_count)) + "\n"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Generate a large jan program")
+    arg_parser.add_argument("--lines", type=int, default=10_000)
+    arg_parser.add_argument("--nesting", type=int, default=8, help="depth of nested if blocks")
+    arg_parser.add_argument("--expression", type=int, default=20, help="operands per arithmetic chain")
+    arg_parser.add_argument("--function-statements", type=int, default=4)
+    arg_parser.add_argument("--list-size", type=int, default=50)
+    arg_parser.add_argument("--string-length", type=int, default=80)
+    arg_parser.add_argument("--units", nargs="+", choices=UNITS, default=list(UNITS))
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+    shape = Shape(args.nesting, args.expression, args.function_statements, args.list_size,
+                  args.string_length, tuple(args.units))
+    generator = Generator(shape, args.seed)
+    for line in generator.lines(args.lines):
+        sys.stdout.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+startup budget of `python main.py hello.jan`, measured in fresh processes
+
+    python -m benchmarks.importtime --runs 10 --budget 60
+
+Runs main.py on a one line program with bytecode caching enabled (in a
+temporary PYTHONPYCACHEPREFIX, so the tree is left alone) and a warm program
+cache, the way scripts are usually run. Reports the median wall time of the
+whole process, then the slowest imports from -X importtime, and exits with
+status 1 when the median wall time is over --budget milliseconds.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+JANLANG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def run_main(program: str, env: dict, importtime=False) -> tuple[float, str]:
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "main.py", program]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=JANLANG_DIR, env=env, check=True, capture_output=True, text=True)
+    return time.perf_counter() - start, result.stderr
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int, int]]:
+    """module: (self us, cumulative us, nesting level) from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        if not self_time.strip().isdigit():
+            continue  # the header line
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(self_time), int(cumulative), level)
+    return modules
+
+
+def measure(runs: int) -> tuple[list[float], dict[str, tuple[int, int, int]]]:
+    directory = tempfile.mkdtemp()
+    try:
+        program = os.path.join(directory, "hello.jan")
+        with open(program, "w") as f:
+            f.write('print("hello")\n')
+        env = {**os.environ, "PYTHONPYCACHEPREFIX": os.path.join(directory, "pycache")}
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        run_main(program, env)  # write bytecode and the program cache
+        wall = [run_main(program, env)[0] for _ in range(runs)]
+        # fastest run of each module, the least disturbed by noise
+        imports: dict[str, tuple[int, int, int]] = {}
+        for _ in range(runs):
+            for name, timing in parse_importtime(run_main(program, env, importtime=True)[1]).items():
+                if name not in imports or timing[1] < imports[name][1]:
+                    imports[name] = timing
+        return wall, imports
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark main.py startup and its imports")
+    arg_parser.add_argument("--runs", type=int, default=5)
+    arg_parser.add_argument("--top", type=int, default=15, help="number of imports to list")
+    arg_parser.add_argument("--budget", type=float, metavar="MS",
+                            help="fail when the median wall time exceeds MS milliseconds")
+    args = arg_parser.parse_args()
+    wall, imports = measure(args.runs)
+    median = statistics.median(wall) * 1000
+    top_level = sum(cumulative for _, cumulative, level in imports.values() if level == 0)
+    print(f"main.py hello.jan: {median:.1f}ms median, {min(wall) * 1000:.1f}ms fastest of {args.runs}")
+    print(f"{len(imports)} modules imported, {top_level / 1000:.1f}ms in top-level imports\n")
+    print(f"{'self':>9} {'cumulative':>11}  module")
+    by_cumulative = sorted(imports.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (self_time, cumulative, level) in by_cumulative[:args.top]:
+        print(f"{self_time / 1000:>7.2f}ms {cumulative / 1000:>9.2f}ms  {'  ' * level}{name}")
+    if args.budget is not None and median > args.budget:
+        print(f"\nover budget: {median:.1f}ms > {args.budget:.1f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
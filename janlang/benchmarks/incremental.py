@@ -0,0 +1,66 @@
+"""
+latency of a one line edit with the incremental front end against a full re-parse
+
+    python -m benchmarks.incremental --lines 1000 10000 100000
+
+Measures an in-place edit of one line and inserting a line near the top of the
+file, which moves every later statement. "insert+read" also reads the program,
+which brings the line numbers of the moved statements up to date.
+"""
+import argparse
+import random
+import frontend
+import incremental
+from benchmarks.parsers import sample_sources, build_input, best_of
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark incremental re-parsing")
+    arg_parser.add_argument("--lines", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    arg_parser.add_argument("--edits", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    sources = sample_sources()
+    rng = random.Random(0)
+    print(
+        f"{'lines':>10} {'full parse':>11} {'edit mean':>10} {'edit max':>10} {'reparsed':>9}"
+        f" {'insert':>10} {'insert+read':>12}"
+    )
+    for line_count in args.lines:
+        text = build_input(sources, line_count)
+        full_time = best_of(lambda: frontend.parse_native(text), 1)
+        doc = incremental.IncrementalDocument(text)
+        # rewrite one top-level statement line in place, e.g. tweak a literal
+        candidates = [i for i, line in enumerate(doc.lines) if line.startswith("print(")]
+        times = []
+        reparsed = 0
+        for _ in range(args.edits):
+            line = rng.choice(candidates)
+            new_line = doc.lines[line]
+            times.append(best_of(lambda: doc.replace_lines(line, line + 1, [new_line + " "]), 1))
+            reparsed += doc.reparsed_chunks
+            doc.replace_lines(line, line + 1, [new_line])
+        # insert a statement at the top, then delete it again
+        insert_times, read_times = [], []
+        for _ in range(args.edits):
+            doc.program
+            insert_times.append(best_of(lambda: doc.replace_lines(0, 0, ["print(0)"]), 1))
+            doc.replace_lines(0, 1, [])
+            doc.program
+
+            def insert_and_read():
+                doc.replace_lines(0, 0, ["print(0)"])
+                doc.program
+
+            read_times.append(best_of(insert_and_read, 1))
+            doc.replace_lines(0, 1, [])
+        print(
+            f"{line_count:>10} {full_time:>10.4f}s {sum(times) / len(times) * 1e3:>8.3f}ms"
+            f" {max(times) * 1e3:>8.3f}ms {reparsed / args.edits:>9.1f}"
+            f" {sum(insert_times) / len(insert_times) * 1e3:>8.3f}ms"
+            f" {sum(read_times) / len(read_times) * 1e3:>10.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
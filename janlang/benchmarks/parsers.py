@@ -0,0 +1,79 @@
+"""
+compare the native and lark front ends on large inputs
+
+    python -m benchmarks.parsers --lines 1000 10000 100000
+"""
+import argparse
+import glob
+import os.path
+import time
+import frontend
+import lexer
+import _parser as parser
+
+TESTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "tests")
+
+
+def sample_sources() -> list[str]:
+    sources = []
+    for path in sorted(glob.glob(os.path.join(TESTS_DIR, "**", "*.jan"), recursive=True)):
+        with open(path) as f:
+            text = f.read()
+        try:
+            frontend.parse_native(text)
+            frontend.parse_lark(text)
+        except Exception:
+            continue
+        sources.append(text.rstrip("\n") + "\n\n")
+    return sources
+
+
+def build_input(sources: list[str], line_count: int) -> str:
+    chunks = []
+    lines = 0
+    while lines < line_count:
+        for text in sources:
+            chunks.append(text)
+            lines += text.count("\n")
+            if lines >= line_count:
+                break
+    return "".join(chunks)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the jan front ends")
+    arg_parser.add_argument("--lines", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    frontend.parse_lark("")
+    print(f"lark grammar construction: {time.perf_counter() - start:.3f}s")
+
+    sources = sample_sources()
+    print(f"{'lines':>10} {'native lex':>11} {'native parse':>13} {'native':>9} {'lark':>9}  faster")
+    for line_count in args.lines:
+        text = build_input(sources, line_count)
+        tokens = list(lexer.RuleLexer(text).tokenize())
+        lex_time = best_of(lambda: list(lexer.RuleLexer(text).tokenize()), args.repeat)
+        parse_time = best_of(lambda: parser.Parser(tokens).parse_root(), args.repeat)
+        lark_time = best_of(lambda: frontend.parse_lark(text), args.repeat)
+        native_time = lex_time + parse_time
+        faster = "native" if native_time < lark_time else "lark"
+        print(
+            f"{line_count:>10} {lex_time:>10.3f}s {parse_time:>12.3f}s"
+            f" {native_time:>8.3f}s {lark_time:>8.3f}s  {faster}"
+        )
+
+
+if __name__ == "__main__":
+    main()
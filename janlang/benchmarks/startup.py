@@ -0,0 +1,87 @@
+"""
+cold-start latency of the lark front ends, measured in fresh processes
+
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+JANLANG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+WORKLOADS = {
+    "jan": ("lark_parser.jan_parser()", "lark_parser.parse_jan('var x = 1 + 2\\n')"),
+    "osspeak": (
+        "lark_parser.osspeak_parser('utterance')",
+        "lark_parser.parse_utterance('hello (world | there) [again]')",
+    ),
+}
+CHILD = """
+import time
+start = time.perf_counter()
+import lark_parser
+imported = time.perf_counter()
+{construct}
+constructed = time.perf_counter()
+{parse}
+parsed = time.perf_counter()
+print(imported - start, constructed - imported, parsed - constructed)
+"""
+PHASES = ("import", "construct", "parse", "process")
+
+
+def run_once(workload: tuple[str, str], cache_dir: str) -> list[float]:
+    construct, parse = workload
+    code = CHILD.format(construct=construct, parse=parse)
+    env = {**os.environ, "JAN_GRAMMAR_CACHE_DIR": cache_dir}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        cwd=JANLANG_DIR, env=env, check=True, capture_output=True, text=True,
+    )
+    total = time.perf_counter() - start
+    return [float(x) for x in result.stdout.split()] + [total]
+
+
+def median_phases(samples: list[list[float]]) -> list[float]:
+    return [statistics.median(phase) for phase in zip(*samples)]
+
+
+def measure(workload: tuple[str, str], runs: int) -> dict[str, list[float]]:
+    results = {}
+    results["no cache"] = median_phases([run_once(workload, "") for _ in range(runs)])
+    cold = []
+    for _ in range(runs):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cold.append(run_once(workload, cache_dir))
+        finally:
+            shutil.rmtree(cache_dir)
+    results["cache miss"] = median_phases(cold)
+    cache_dir = tempfile.mkdtemp()
+    try:
+        run_once(workload, cache_dir)
+        results["cache hit"] = median_phases([run_once(workload, cache_dir) for _ in range(runs)])
+    finally:
+        shutil.rmtree(cache_dir)
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark lark grammar startup")
+    arg_parser.add_argument("--runs", type=int, default=5)
+    args = arg_parser.parse_args()
+    print(f"{'grammar':<10} {'mode':<12}" + "".join(f"{phase:>11}" for phase in PHASES))
+    for name, workload in WORKLOADS.items():
+        for mode, timings in measure(workload, args.runs).items():
+            row = "".join(f"{t * 1000:>9.1f}ms" for t in timings)
+            print(f"{name:<10} {mode:<12}{row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+interpreter benchmark suite with baseline comparison
+
+    python -m benchmarks.suite --save-baseline
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+
+Macro benchmarks run the programs in benchmarks/programs, micro benchmarks
+execute a single node of each type in a tight loop. Each benchmark collects
+several samples; runs are compared by their fastest samples, and a change only
+counts as a regression when it exceeds the threshold and a Mann-Whitney U test
+finds the two runs' samples significantly different, so a busy machine doesn't
+fail the comparison.
+"""
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import glob
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import frontend
+import interpreter
+
+PROGRAMS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "programs")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# fewer samples per run can't show a significant difference at all
+MIN_COMPARE_REPEAT = 7
+
+# node type: (setup statements, statement executed in the loop)
+MICRO = {
+    "Integer": ("", "1"),
+    "Float": ("", "1.5"),
+    "String": ("", "'text'"),
+    "Name": ("var x = 1", "x"),
+    "BinOp": ("var x = 1", "x + 2"),
+    "Exponent": ("var x = 3", "x ** 2"),
+    "Negative": ("var x = 3", "-x"),
+    "Compare": ("var x = 1", "x < 2"),
+    "And": ("var x = 1", "x and 2"),
+    "Or": ("var x = 0", "x or 2"),
+    "List": ("var x = 1", "[x, x, x]"),
+    "Index": ("var l = [1, 2, 3]", "l[1]"),
+    "Call": ("def f():\n    return 1", "f()"),
+    "NativeCall": ("var l = [1]", "l.pop()\nl.push(1)"),
+    "Assignment": ("var mut x = 1", "x = 2"),
+    "IfStatement": ("var x = 1", "if x:\n    pass"),
+    "WhileStatement": ("var x = 0", "while x:\n    pass"),
+    "ForStatement": ("var l = [1, 2]", "for var n in l:\n    pass"),
+    "ForRange": ("var r = range(2)", "for var n in r:\n    pass"),
+}
+
+
+def program_benchmarks() -> dict:
+    benchmarks = {}
+    for path in sorted(glob.glob(os.path.join(PROGRAMS_DIR, "*.jan"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path) as f:
+            program = frontend.parse_native(f.read())
+        benchmarks[f"program/{name}"] = (lambda program=program: interpreter.Interpreter().execute(program), 1)
+    return benchmarks
+
+
+def micro_benchmarks(number: int) -> dict:
+    benchmarks = {}
+    for node_type, (setup, statement) in MICRO.items():
+        setup_body = frontend.parse_native(setup + "\n").main.body if setup else []
+        nodes = frontend.parse_native(statement + "\n").main.body
+        jan = interpreter.Interpreter()
+        for stmt in setup_body:
+            jan.execute(stmt)
+
+        def run(jan=jan, nodes=nodes):
+            execute = jan.execute
+            for _ in range(number):
+                for node in nodes:
+                    execute(node)
+
+        benchmarks[f"node/{node_type}"] = (run, number)
+    return benchmarks
+
+
+def measure(fn, operations: int, repeat: int, warmup: int = 1) -> list[float]:
+    """seconds per operation for each of repeat runs"""
+    samples = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(warmup + repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            if i >= warmup:
+                samples.append(elapsed / operations)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict:
+    median = statistics.median(samples)
+    return {
+        "samples": samples,
+        "median": median,
+        "mad": statistics.median(abs(s - median) for s in samples),
+        "min": min(samples),
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float, alpha: float = 0.01) -> list[tuple[str, float, str]]:
+    rows = []
+    for name, result in current.items():
+        old = baseline.get(name)
+        if old is None:
+            rows.append((name, float("nan"), "new"))
+            continue
+        # the fastest sample is the least disturbed by the rest of the machine,
+        # but a change only counts when the two runs' samples really differ
+        ratio = result["min"] / old["min"]
+        if abs(ratio - 1) <= threshold or mann_whitney(old["samples"], result["samples"]) >= alpha:
+            verdict = "same"
+        else:
+            verdict = "slower" if ratio > 1 else "faster"
+        rows.append((name, ratio, verdict))
+    return rows
+
+
+def mann_whitney(xs: list[float], ys: list[float]) -> float:
+    """two-sided p-value of the Mann-Whitney U test, by the normal approximation with ties"""
+    n, m = len(xs), len(ys)
+    if not n or not m:
+        return 1.0
+    ranked = sorted([(x, 0) for x in xs] + [(y, 1) for y in ys])
+    rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j < len(ranked) and ranked[j][0] == ranked[i][0]:
+            j += 1
+        # tied samples share the mean of their ranks
+        rank_sum += (i + j + 1) / 2 * sum(1 for _, group in ranked[i:j] if group == 0)
+        tie_term += (j - i) ** 3 - (j - i)
+        i = j
+    u = rank_sum - n * (n + 1) / 2
+    mean = n * m / 2
+    variance = n * m / 12 * ((n + m + 1) - tie_term / ((n + m) * (n + m - 1)))
+    if variance <= 0:
+        return 1.0
+    z = max(abs(u - mean) - 0.5, 0) / math.sqrt(variance)
+    return math.erfc(z / math.sqrt(2))
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run the interpreter benchmarks")
+    arg_parser.add_argument("-k", dest="pattern", default="*", help="only run benchmarks matching this glob")
+    arg_parser.add_argument("--repeat", type=int, default=7)
+    arg_parser.add_argument("--number", type=int, default=20_000, help="loop count for node benchmarks")
+    arg_parser.add_argument("--output", help="write results to this JSON file")
+    arg_parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE,
+                            help="compare against a results file (default: benchmarks/baseline.json)")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    arg_parser.add_argument("--threshold", type=float, default=0.05,
+                            help="relative change ignored even when it is significant")
+    args = arg_parser.parse_args()
+    if args.compare and args.repeat < MIN_COMPARE_REPEAT:
+        arg_parser.error(f"--compare needs --repeat {MIN_COMPARE_REPEAT} or more")
+
+    benchmarks = {**program_benchmarks(), **micro_benchmarks(args.number)}
+    results = {}
+    for name, (fn, operations) in benchmarks.items():
+        if not fnmatch.fnmatch(name, args.pattern):
+            continue
+        results[name] = summarize(measure(fn, operations, args.repeat))
+        result = results[name]
+        print(f"{name:<28} {format_time(result['median']):>10} ± {format_time(result['mad']):>9}")
+
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "benchmarks": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline and DEFAULT_BASELINE)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["benchmarks"]
+        print(f"\ncompared with {args.compare}")
+        rows = compare(baseline, results, args.threshold)
+        for name, ratio, verdict in rows:
+            print(f"{name:<28} {ratio:>7.3f}x  {verdict}")
+        if any(verdict == "slower" for _, _, verdict in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
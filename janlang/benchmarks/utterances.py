@@ -0,0 +1,117 @@
+"""
+recognition latency of utterances.UtteranceMatcher with thousands of commands
+
+    python -m benchmarks.utterances --commands 5000
+"""
+import argparse
+import random
+import statistics
+import time
+import lark_parser
+import utterances as u
+
+DIGITS = ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+
+
+def random_command(rng: random.Random, vocabulary: list[str]) -> u.UtteranceNode:
+    pieces: list[u.UtteranceNode] = [u.Word(rng.choice(vocabulary))]
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.random()
+        if kind < 0.4:
+            pieces.append(u.Word(rng.choice(vocabulary)))
+        elif kind < 0.6:
+            pieces.append(u.Choice([u.Word(w) for w in rng.sample(vocabulary, 3)]))
+        elif kind < 0.75:
+            pieces.append(u.optional(u.Word(rng.choice(vocabulary))))
+        elif kind < 0.9:
+            pieces.append(u.Repeat(u.Reference("digit"), 1, 3))
+        else:
+            pieces.append(u.Substitute(u.Word(rng.choice(vocabulary)), "action"))
+    return u.Sequence(pieces)
+
+
+def speak(rng: random.Random, node: u.UtteranceNode, named) -> list[str]:
+    """a random word sequence accepted by node"""
+    if isinstance(node, u.Word):
+        return [node.word]
+    if isinstance(node, u.Sequence):
+        return [w for item in node.items for w in speak(rng, item, named)]
+    if isinstance(node, u.Choice):
+        return speak(rng, rng.choice(node.alternatives), named)
+    if isinstance(node, u.Repeat):
+        count = rng.randint(node.low, node.high if node.high is not None else node.low + 2)
+        return [w for _ in range(count) for w in speak(rng, node.item, named)]
+    if isinstance(node, u.Reference):
+        return speak(rng, named[node.name], named)
+    if isinstance(node, u.Substitute):
+        return speak(rng, node.item, named)
+    raise TypeError(node)
+
+
+def naive_match(matcher: u.UtteranceMatcher, words: list[str]):
+    """try every command in turn, as matching against each parsed pattern would"""
+    automaton = matcher.automaton
+    for command in matcher.commands:
+        for end, _ in automaton.walk(command.utterance, words, 0, (), {}, []):
+            if end == len(words):
+                return command
+    return None
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark utterance recognition")
+    arg_parser.add_argument("--commands", type=int, default=5000)
+    arg_parser.add_argument("--phrases", type=int, default=2000)
+    arg_parser.add_argument("--vocabulary", type=int, default=300)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--eager", action="store_true", help="build the full dfa up front")
+    args = arg_parser.parse_args()
+    rng = random.Random(args.seed)
+    vocabulary = [f"word{i}" for i in range(args.vocabulary)]
+
+    start = time.perf_counter()
+    lark_parser.parse_utterance("open (window | tab) [quickly] <digit>_1-3")
+    print(f"parse one utterance (incl. parser load): {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    matcher = u.UtteranceMatcher()
+    matcher.define("digit", u.Choice([u.Word(d) for d in DIGITS]))
+    for _ in range(args.commands):
+        matcher.add_command(random_command(rng, vocabulary))
+    start = time.perf_counter()
+    automaton = matcher.compile(eager=args.eager)
+    print(
+        f"compile {args.commands} commands{' (eager)' if args.eager else ''}: {(time.perf_counter() - start) * 1000:.1f}ms"
+        f" ({len(automaton.transitions)} nfa states)"
+    )
+
+    phrases = [
+        speak(rng, rng.choice(matcher.commands).utterance, matcher.named_utterances)
+        for _ in range(args.phrases)
+    ]
+    for label in ("cold", "warm"):
+        timings = []
+        for words in phrases:
+            start = time.perf_counter()
+            assert matcher.match(words) is not None
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{label} match: median {statistics.median(timings) * 1e6:.1f}us,"
+            f" p99 {percentile(timings, 0.99) * 1e6:.1f}us,"
+            f" max {max(timings) * 1e6:.1f}us ({len(automaton.dfa_sets)} dfa states)"
+        )
+
+    sample = phrases[:50]
+    start = time.perf_counter()
+    for words in sample:
+        naive_match(matcher, words)
+    naive = (time.perf_counter() - start) / len(sample)
+    print(f"naive per-command matching: {naive * 1e6:.1f}us per phrase")
+
+
+if __name__ == "__main__":
+    main()
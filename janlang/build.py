@@ -0,0 +1,136 @@
+"""
+compile or check many jan files at once
+
+    python build.py ../tests --jobs 8
+    python build.py src/ --check
+
+Independent files are lexed and parsed in a process pool. Workers send the
+programs back in the binary AST format and the parent writes the __jancache__
+entries, so later runs and imports load them without parsing. Diagnostics are
+sorted by file and line so the output doesn't depend on scheduling.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import ast_binary
+import compile_cache
+import frontend
+import _parser as parser
+
+FRONTEND_ERRORS = (parser.ParseError, parser.HardParseError, RuntimeError, AssertionError, UnicodeDecodeError)
+
+
+class Diagnostic:
+    def __init__(self, path: str, line: int | None, message: str):
+        self.path = path
+        self.line = line
+        self.message = message
+
+    @property
+    def sort_key(self):
+        return (self.path, self.line or 0, self.message)
+
+    def __str__(self) -> str:
+        location = self.path if self.line is None else f"{self.path}:{self.line}"
+        return f"{location}: {self.message}"
+
+
+class CompileResult:
+    def __init__(self, path: str, cached_path: str, data: bytes | None, diagnostics: list[Diagnostic]):
+        self.path = path
+        self.cached_path = cached_path
+        # None when the cache entry is already up to date or the file has errors
+        self.data = data
+        self.diagnostics = diagnostics
+
+    def program(self):
+        if self.data is not None:
+            return ast_binary.loads(self.data)
+        return compile_cache.read_entry(self.cached_path)
+
+
+def find_sources(paths: list[str]) -> list[str]:
+    sources = []
+    for path in paths:
+        if not os.path.isdir(path):
+            sources.append(path)
+            continue
+        for root, dir_names, file_names in os.walk(path):
+            if compile_cache.CACHE_DIR_NAME in dir_names:
+                dir_names.remove(compile_cache.CACHE_DIR_NAME)
+            sources.extend(os.path.join(root, name) for name in file_names if name.endswith(".jan"))
+    return sorted(set(sources))
+
+
+def compile_file(path: str, parser_name="native", force=False) -> CompileResult:
+    try:
+        with open(path, "rb") as f:
+            source = f.read()
+    except OSError as e:
+        return CompileResult(path, "", None, [Diagnostic(path, None, e.strerror or str(e))])
+    cached_path = compile_cache.cache_path(path, source, parser_name)
+    if not force and os.path.exists(cached_path):
+        return CompileResult(path, cached_path, None, [])
+    try:
+        program = frontend.parse(source.decode(), parser_name)
+        # serializing can fail too, e.g. RecursionError on a very deep tree
+        data = ast_binary.dumps(program)
+    except (*FRONTEND_ERRORS, ast_binary.FormatError) as e:
+        message = " ".join(part.strip() for part in str(e).splitlines() if part.strip())
+        diagnostic = Diagnostic(path, getattr(e, "line", None), message or type(e).__name__)
+        return CompileResult(path, cached_path, None, [diagnostic])
+    return CompileResult(path, cached_path, data, [])
+
+
+def compile_file_args(args) -> CompileResult:
+    return compile_file(*args)
+
+
+def compile_sources(paths: list[str], jobs: int | None = None, parser_name="native", force=False) -> list[CompileResult]:
+    """compile every file, in the order given, using up to jobs processes"""
+    jobs = jobs or os.cpu_count() or 1
+    work = [(path, parser_name, force) for path in paths]
+    if jobs == 1 or len(work) < 2:
+        return [compile_file_args(args) for args in work]
+    chunk_size = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as pool:
+        return list(pool.map(compile_file_args, work, chunksize=chunk_size))
+
+
+def merge_diagnostics(results: list[CompileResult]) -> list[Diagnostic]:
+    diagnostics = [d for result in results for d in result.diagnostics]
+    return sorted(diagnostics, key=lambda d: d.sort_key)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compile jan files in parallel")
+    arg_parser.add_argument("paths", nargs="+", help="files or directories to compile")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="worker processes (default: one per cpu)")
+    arg_parser.add_argument("--parser", choices=tuple(frontend.PARSERS), default="native")
+    arg_parser.add_argument("--check", action="store_true", help="report diagnostics without writing __jancache__")
+    arg_parser.add_argument("--force", action="store_true", help="recompile files with up to date cache entries")
+    args = arg_parser.parse_args()
+
+    sources = find_sources(args.paths)
+    results = compile_sources(sources, args.jobs, args.parser, args.force or args.check)
+    compiled = 0
+    for result in results:
+        if result.data is None:
+            continue
+        compiled += 1
+        if not args.check:
+            try:
+                compile_cache.write_serialized_entry(result.cached_path, result.data)
+            except OSError as e:
+                print(f"{result.path}: cannot write cache entry: {e}", file=sys.stderr)
+    diagnostics = merge_diagnostics(results)
+    for diagnostic in diagnostics:
+        print(diagnostic, file=sys.stderr)
+    print(f"{len(sources)} files, {compiled} compiled, {len(diagnostics)} errors")
+    sys.exit(1 if diagnostics else 0)
+
+
+if __name__ == "__main__":
+    main()
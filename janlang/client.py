@@ -0,0 +1,89 @@
+"""
+thin client for server.py: runs a jan script in a warm server process
+
+    python client.py script.jan
+
+The client uses the _socket extension rather than socket and no json, whose
+imports alone would cost more than running a small script in the server, so
+it starts about as fast as Python itself. Stdout and stderr of the script are streamed back
+and the client exits with the script's exit status.
+
+Messages are frames of a one byte kind, a four byte big-endian length and the
+payload. The client sends one REQUEST frame with the script path, working
+directory and JANPATH separated by NUL bytes; the server answers with STDOUT and STDERR
+frames and finishes with an EXIT frame holding the status.
+"""
+import _socket
+import os
+import sys
+
+REQUEST, STDOUT, STDERR, EXIT = b"r", b"o", b"e", b"x"
+
+
+def default_socket_path() -> str:
+    return os.environ.get("JAN_SOCKET") or f"/tmp/jan-{os.getuid()}.sock"
+
+
+def write_frame(sock, kind: bytes, payload: bytes):
+    sock.sendall(kind + len(payload).to_bytes(4, "big") + payload)
+
+
+def read_exact(sock, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed in the middle of a frame")
+        data += chunk
+    return data
+
+
+def read_frame(sock) -> tuple[bytes, bytes]:
+    header = read_exact(sock, 5)
+    return header[:1], read_exact(sock, int.from_bytes(header[1:], "big"))
+
+
+def encode_request(path: str, cwd: str, janpath: str) -> bytes:
+    return "\0".join((path, cwd, janpath)).encode()
+
+
+def decode_request(payload: bytes) -> tuple[str, str, str]:
+    path, cwd, janpath = payload.decode().split("\0")
+    return path, cwd, janpath
+
+
+def run(path: str, socket_path: str | None = None, stdout=None, stderr=None) -> int:
+    stdout = stdout or sys.stdout.buffer
+    stderr = stderr or sys.stderr.buffer
+    request = encode_request(os.path.abspath(path), os.getcwd(), os.environ.get("JANPATH", ""))
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or default_socket_path())
+        write_frame(sock, REQUEST, request)
+        while True:
+            kind, payload = read_frame(sock)
+            if kind == EXIT:
+                return int(payload)
+            out = stdout if kind == STDOUT else stderr
+            out.write(payload)
+            out.flush()
+    finally:
+        sock.close()
+
+
+def main():
+    args = sys.argv[1:]
+    socket_path = None
+    if len(args) == 3 and args[0] == "--socket":
+        socket_path, args = args[1], args[2:]
+    if len(args) != 1:
+        sys.exit("usage: client.py [--socket PATH] script.jan")
+    try:
+        status = run(args[0], socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        sys.exit(f"no jan server listening on {socket_path or default_socket_path()}, start one with server.py serve")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+on-disk cache of parsed programs. Entries live in a __jancache__ directory
+next to the source file and are keyed by a hash of the source text, the front
+end used and the front end's own source, so editing either the program or the
+interpreter invalidates them. Entries are written to a temporary file and
+renamed into place so concurrent writers never expose a partial file.
+"""
+import hashlib
+import os
+import sys
+import astree as ast
+import ast_binary
+import frontend
+
+CACHE_DIR_NAME = "__jancache__"
+FRONTEND_MODULES = (
+    "astree", "tokens", "lexer", "_parser", "lark_parser", "frontend", "ast_binary", "compile_cache"
+)
+
+
+def frontend_version() -> str:
+    digest = hashlib.sha256(sys.version.encode())
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in FRONTEND_MODULES:
+        with open(os.path.join(base_dir, f"{name}.py"), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+FRONTEND_VERSION = frontend_version()
+
+
+def cache_path(path: str, source: bytes, parser_name: str) -> str:
+    digest = hashlib.sha256(source)
+    digest.update(parser_name.encode())
+    digest.update(FRONTEND_VERSION.encode())
+    directory, file_name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIR_NAME, f"{file_name}.{parser_name}.{digest.hexdigest()[:20]}.janc")
+
+
+def load_program(path: str, parser_name="native") -> ast.Program:
+    with open(path, "rb") as f:
+        source = f.read()
+    cached_path = cache_path(path, source, parser_name)
+    program = read_entry(cached_path)
+    if program is not None:
+        return program
+    program = frontend.parse(source.decode(), parser_name)
+    try:
+        write_entry(cached_path, program)
+    except OSError:
+        pass  # read-only location, run uncached
+    except (RecursionError, ast_binary.FormatError):
+        pass  # can't be serialized, run uncached
+    return program
+
+
+def read_entry(cached_path: str) -> ast.Program | None:
+    try:
+        with open(cached_path, "rb") as f:
+            return ast_binary.loads(f.read())
+    except (OSError, ast_binary.FormatError):
+        return None
+
+
+def write_entry(cached_path: str, program: ast.Program):
+    write_serialized_entry(cached_path, ast_binary.dumps(program))
+
+
+def write_serialized_entry(cached_path: str, data: bytes):
+    import tempfile
+
+    directory = os.path.dirname(cached_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, cached_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    remove_stale_entries(cached_path)
+
+
+def remove_stale_entries(cached_path: str):
+    """remove older entries for the same source and parser, other parsers keep theirs"""
+    directory, entry_name = os.path.split(cached_path)
+    # <source file>.<parser>.<digest>.janc
+    prefix = entry_name.rsplit(".", 2)[0] + "."
+    for file_name in os.listdir(directory):
+        is_entry = file_name.startswith(prefix) and file_name.endswith(".janc")
+        if is_entry and file_name != entry_name and "." not in file_name[len(prefix):-len(".janc")]:
+            try:
+                os.unlink(os.path.join(directory, file_name))
+            except OSError:
+                pass  # already removed by another writer
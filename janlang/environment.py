@@ -1,15 +1,20 @@
 from __future__ import annotations
 from values import base, Void
-from typing import Literal
 
+# typing is only imported by type checkers, it is slow to import at startup
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Literal
 
-DECLARATION_TYPE = Literal["function", "native_function", "parameter", "immutable_variable", "variable", "class_definition"]
+    DECLARATION_TYPE = Literal["function", "native_function", "builtin", "parameter", "immutable_variable", "variable", "class_definition", "module"]
 
 class Environment:
 
-    def __init__(self, parent: Environment | None) -> None:
+    def __init__(self, parent: Environment | None, fallback: Environment | None = None) -> None:
         self.values: dict[str, Symbol] = {}
         self.parent = parent
+        # looked up when a name is not in the root environment, for builtins
+        self.fallback = fallback
 
     @property
     def is_root(self):
@@ -29,6 +34,8 @@ class Environment:
         symbol = self.get(name)
         if symbol.type == "immutable_variable" and symbol.value_initialized:
             raise RuntimeError(f'Cannot reassign to immutable variable {name}')
+        if symbol.type == "builtin" and symbol.value_initialized:
+            raise RuntimeError(f'Cannot reassign builtin {name}')
         symbol.value = value
         symbol.value_initialized = True
         return symbol
@@ -36,6 +43,8 @@ class Environment:
     def get(self, name: str) -> Symbol:
         if name not in self.values:
             if self.parent is None:
+                if self.fallback is not None:
+                    return self.fallback.get(name)
                 raise RuntimeError(f'{name} not in environment')
             return self.parent.get(name)
         return self.values[name]
@@ -2,4 +2,13 @@ class JanRuntimeException(Exception):
     pass
 
 class JanAssertionError(JanRuntimeException):
-    pass
\ No newline at end of file
+    pass
+
+class JanImportError(JanRuntimeException):
+    pass
+
+class JanResourceLimitError(JanRuntimeException):
+    pass
+
+class JanSnapshotError(JanRuntimeException):
+    pass
@@ -0,0 +1,31 @@
+import astree as ast
+
+
+def parse_native(text: str) -> ast.Program:
+    # imported here so loading a cached program never imports the front end
+    import lexer
+    import _parser as parser
+
+    tokens = list(lexer.RuleLexer(text).tokenize())
+    return parser.Parser(tokens).parse_root()
+
+
+def parse_lark(text: str) -> ast.Program:
+    import lark_parser
+
+    return lark_parser.parse_jan(text)
+
+
+PARSERS = {
+    "native": parse_native,
+    "lark": parse_lark,
+}
+
+
+def parse(text: str, parser_name="native") -> ast.Program:
+    return PARSERS[parser_name](text)
+
+
+def parse_path(path: str, parser_name="native") -> ast.Program:
+    with open(path) as f:
+        return parse(f.read(), parser_name)
@@ -0,0 +1,130 @@
+"""
+generator functions: functions whose body contains a yield statement
+
+Calling one returns a values.Generator without running the body, and every
+next element resumes the body where the previous yield suspended it. The
+statements on the way to a yield (the yield itself and the blocks, ifs and
+loops around it) are run by the Python generators below, which mirror the
+interpreter's execute methods; every other statement goes through
+Interpreter.execute as usual, so code that cannot yield runs at full speed.
+"""
+import weakref
+import astree as ast
+import interpreter
+import values
+from values.function import Return
+
+COMPOUND_STATEMENTS = (ast.Block, ast.IfStatement, ast.WhileStatement, ast.ForStatement)
+
+_contains_yield: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def contains_yield(node) -> bool:
+    """whether running node can reach a yield, not counting nested definitions"""
+    if isinstance(node, ast.Yield):
+        return True
+    if not isinstance(node, COMPOUND_STATEMENTS):
+        return False
+    result = _contains_yield.get(node)
+    if result is None:
+        result = _contains_yield[node] = any(contains_yield(child) for child in children(node))
+    return result
+
+
+def children(node):
+    if isinstance(node, ast.Block):
+        return node.statements
+    if isinstance(node, ast.IfStatement):
+        bodies = [node.body, *(body for _, body in node.else_ifs)]
+        if node.else_body:
+            bodies.append(node.else_body)
+        return bodies
+    return [node.body]
+
+
+def run(jan: "interpreter.Interpreter", body: ast.Block, env):
+    """the values body yields, running it in env one step at a time"""
+    steps = Frame(jan).block(body, env)
+    # the generator's current scope while it is suspended
+    scope = env
+    while True:
+        caller = jan.environment
+        jan.environment = scope
+        try:
+            value = next(steps)
+        except (StopIteration, Return):
+            return
+        finally:
+            scope = jan.environment
+            jan.environment = caller
+        yield value
+
+
+class Frame:
+    def __init__(self, jan: "interpreter.Interpreter"):
+        self.jan = jan
+
+    def statement(self, stmt):
+        if isinstance(stmt, ast.Yield):
+            yield values.Null() if stmt.value is None else self.jan.execute(stmt.value)
+        elif isinstance(stmt, ast.Block):
+            yield from self.block(stmt)
+        elif isinstance(stmt, ast.IfStatement):
+            yield from self.if_statement(stmt)
+        elif isinstance(stmt, ast.WhileStatement):
+            yield from self.while_statement(stmt)
+        else:
+            yield from self.for_statement(stmt)
+
+    def block(self, block: ast.Block, env=None):
+        jan = self.jan
+        previous = jan.environment
+        jan.environment = previous.add_child() if env is None else env
+        try:
+            for stmt in block.statements:
+                if contains_yield(stmt):
+                    yield from self.statement(stmt)
+                else:
+                    jan.execute(stmt)
+        except (interpreter.Break, interpreter.Continue):
+            jan.environment = previous
+            raise
+        jan.environment = previous
+
+    def if_statement(self, if_statement: ast.IfStatement):
+        jan = self.jan
+        if jan.execute(if_statement.test):
+            yield from self.statement(if_statement.body)
+            return
+        for test, body in if_statement.else_ifs:
+            if jan.execute(test):
+                yield from self.statement(body)
+                return
+        if if_statement.else_body:
+            yield from self.statement(if_statement.else_body)
+
+    def while_statement(self, while_statement: ast.WhileStatement):
+        jan = self.jan
+        while jan.execute(while_statement.test):
+            if jan.budget <= 0:
+                jan.check_limits()
+            jan.budget -= 1
+            try:
+                yield from self.block(while_statement.body)
+            except interpreter.Continue:
+                pass
+            except interpreter.Break:
+                return
+
+    def for_statement(self, for_statement: ast.ForStatement):
+        jan = self.jan
+        for obj in jan.execute(for_statement.iter):
+            if jan.budget <= 0:
+                jan.check_limits()
+            jan.budget -= 1
+            try:
+                yield from self.block(for_statement.body, jan.for_loop_scope(for_statement, obj))
+            except interpreter.Continue:
+                pass
+            except interpreter.Break:
+                return
@@ -0,0 +1,86 @@
+"""
+on-disk cache of constructed Lark parsers, keyed by a hash of the grammar,
+the parser options and the lark version so a stale entry is never loaded.
+LALR parsers go through lark's own save/load, other parsers are pickled.
+"""
+import hashlib
+import importlib
+import os
+import pickle
+import tempfile
+import types
+import lark
+from lark import Lark
+from lark.lark import LarkOptions
+
+CACHE_DIR = os.environ.get(
+    "JAN_GRAMMAR_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "__jancache__")
+)
+# options holding objects rather than settings, keyed by their type
+OBJECT_OPTIONS = ("transformer", "postlex", "lexer_callbacks", "edit_terminals")
+
+
+def cache_path(grammar: str, options: dict) -> str:
+    key = hashlib.sha256()
+    key.update(grammar.encode())
+    for name, value in sorted(options.items()):
+        if name in OBJECT_OPTIONS:
+            value = type(value).__qualname__
+        key.update(f"{name}={value!r};".encode())
+    key.update(lark.__version__.encode())
+    return os.path.join(CACHE_DIR, f"lark-{key.hexdigest()[:24]}.cache")
+
+
+def load_lark(grammar: str, **options) -> Lark:
+    if not CACHE_DIR:
+        return Lark(grammar, **options)
+    path = cache_path(grammar, options)
+    is_lalr = options.get("parser") == "lalr"
+    if os.path.exists(path):
+        try:
+            if is_lalr:
+                return Lark(grammar, cache=path, **options)
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass  # unreadable entry, rebuild and overwrite it
+    parser = Lark(grammar, **options)
+    try:
+        write_atomic(path, parser, is_lalr)
+    except OSError:
+        pass
+    return parser
+
+
+def write_atomic(path: str, parser: Lark, is_lalr: bool):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if is_lalr:
+                parser.save(f)
+            else:
+                LarkPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(parser)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class LarkPickler(pickle.Pickler):
+    # earley parsers keep a reference to the regex module and LarkOptions
+    # recurses in __getattr__ while being unpickled
+    def reducer_override(self, obj):
+        if isinstance(obj, types.ModuleType):
+            return importlib.import_module, (obj.__name__,)
+        if isinstance(obj, LarkOptions):
+            return LarkOptions, (obj.options,)
+        return NotImplemented
+
+
+def clear():
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for file_name in os.listdir(CACHE_DIR):
+        if file_name.startswith("lark-") and file_name.endswith(".cache"):
+            os.unlink(os.path.join(CACHE_DIR, file_name))
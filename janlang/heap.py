@@ -0,0 +1,118 @@
+"""
+heap introspection for jan values, used by main.py --heap-report and the
+heap_report native function
+
+Live values are found with gc and sized with sys.getsizeof: a value's size is
+its object, attribute dicts and proxy container, not the values it refers to,
+which are counted as values of their own. Every function closure is a chain of
+environments copied by deep_copy, so the environments and symbols reachable
+from a closure (short of the shared global scope) are attributed to it. When
+tracemalloc is tracing, its totals and largest allocation sites are added.
+"""
+import collections
+import gc
+import io
+import sys
+import tracemalloc
+import environment
+import values
+from values.base import NoProxy
+
+
+class TypeStats:
+    def __init__(self):
+        self.count = 0
+        self.size = 0
+
+
+class ClosureStats:
+    def __init__(self, names: list[str], environments: int, symbols: int, size: int):
+        self.names = names
+        self.environments = environments
+        self.symbols = symbols
+        self.size = size
+
+
+class HeapReport:
+    def __init__(self):
+        self.types: dict[type, TypeStats] = collections.defaultdict(TypeStats)
+        self.closures: list[ClosureStats] = []
+        self.environments = 0
+        self.symbols = 0
+        self.traced: tuple[int, int] | None = None
+        self.top_allocations: list[tracemalloc.Statistic] = []
+
+    def format(self, limit=10) -> str:
+        out = io.StringIO()
+        total = sum(s.size for s in self.types.values())
+        out.write(f"jan heap, {sum(s.count for s in self.types.values())} values, {total / 1024:.1f} KiB\n\n")
+        out.write(f"{'count':>10} {'KiB':>10}  type\n")
+        by_size = sorted(self.types.items(), key=lambda item: item[1].size, reverse=True)
+        for value_type, s in by_size:
+            out.write(f"{s.count:>10} {s.size / 1024:>10.1f}  {value_type.__name__}\n")
+        out.write(f"\n{self.environments} environments, {self.symbols} symbols alive\n")
+        if self.closures:
+            out.write(f"\n{'envs':>10} {'symbols':>10} {'KiB':>10}  closure of\n")
+            for c in sorted(self.closures, key=lambda c: c.size, reverse=True)[:limit]:
+                out.write(f"{c.environments:>10} {c.symbols:>10} {c.size / 1024:>10.1f}  {', '.join(c.names)}\n")
+        if self.traced is not None:
+            current, peak = self.traced
+            out.write(f"\ntracemalloc: {current / 1024:.1f} KiB current, {peak / 1024:.1f} KiB peak\n")
+            for stat in self.top_allocations[:limit]:
+                frame = stat.traceback[0]
+                out.write(f"{stat.size / 1024:>10.1f} KiB {stat.count:>8}  {frame.filename}:{frame.lineno}\n")
+        return out.getvalue()
+
+
+def value_size(value: values.BaseValue) -> int:
+    size = sys.getsizeof(value) + sys.getsizeof(vars(value)) + sys.getsizeof(value.attributes)
+    if value.proxy is not NoProxy:
+        size += sys.getsizeof(value.proxy)
+    return size
+
+
+def environment_size(env: environment.Environment) -> int:
+    size = sys.getsizeof(env) + sys.getsizeof(vars(env)) + sys.getsizeof(env.values)
+    for symbol in env.values.values():
+        size += sys.getsizeof(symbol) + sys.getsizeof(vars(symbol))
+    return size
+
+
+def closure_stats(names: list[str], closure: environment.Environment) -> ClosureStats:
+    environments = symbols = size = 0
+    env = closure
+    while env.parent is not None:
+        environments += 1
+        symbols += len(env.values)
+        size += environment_size(env)
+        env = env.parent
+    return ClosureStats(names, environments, symbols, size)
+
+
+def snapshot() -> HeapReport:
+    gc.collect()
+    report = HeapReport()
+    # functions and classes sharing a closure: class methods, or a function and
+    # the class it is defined next to
+    closures: dict[int, tuple[list[str], environment.Environment]] = {}
+    for obj in gc.get_objects():
+        if isinstance(obj, values.BaseValue):
+            stats = report.types[type(obj)]
+            stats.count += 1
+            stats.size += value_size(obj)
+            if isinstance(obj, (values.Function, values.ClassDefinition)):
+                names, _ = closures.setdefault(id(obj.closure), ([], obj.closure))
+                names.append(obj.name)
+        elif isinstance(obj, environment.Environment):
+            report.environments += 1
+        elif isinstance(obj, environment.Symbol):
+            report.symbols += 1
+    report.closures = [closure_stats(names, closure) for names, closure in closures.values()]
+    if tracemalloc.is_tracing():
+        report.traced = tracemalloc.get_traced_memory()
+        report.top_allocations = tracemalloc.take_snapshot().statistics("lineno")
+    return report
+
+
+def report(limit=10) -> str:
+    return snapshot().format(limit)
@@ -0,0 +1,142 @@
+"""
+instrumentation hooks for the interpreter
+
+Subclass Hooks, override the events you want and register an instance with
+Interpreter.add_hook. Only overridden events are instrumented: an interpreter
+without hooks runs its plain methods, and values and environments are only
+watched while some registered hook listens to their events.
+
+Allocation and environment events come from the value and environment
+classes, so they are process wide: they also fire for objects created by
+other interpreters, native functions and operators.
+"""
+import environment
+import values
+
+EVENTS = (
+    "function_enter",
+    "function_exit",
+    "statement_enter",
+    "statement_exit",
+    "allocation",
+    "environment_created",
+    "environment_copied",
+    "node",
+)
+
+
+class Hooks:
+    def function_enter(self, fn, args, kwargs):
+        """before a jan or native function is called"""
+
+    def function_exit(self, fn, result):
+        """after a call returns; result is None when it raised"""
+
+    def node(self, node):
+        """before any node, statement or expression, is executed"""
+
+    def statement_enter(self, node):
+        """before a statement with a source line runs"""
+
+    def statement_exit(self, node):
+        """after the statement finished, normally or not"""
+
+    def allocation(self, value):
+        """a value was created; it is still being initialized, so only its type and identity are reliable"""
+
+    def environment_created(self, env):
+        """a scope was created for a block, call, closure or module"""
+
+    def environment_copied(self, env):
+        """env.deep_copy() was called, once for every scope it copies"""
+
+
+def overrides(hook: Hooks, *events: str) -> bool:
+    return any(getattr(type(hook), event) is not getattr(Hooks, event) for event in events)
+
+
+# events fired by runtime classes rather than the interpreter, with the method
+# that is wrapped to fire them while some hook listens
+PATCHED_EVENTS = {
+    "allocation": (values.BaseValue, "__init__"),
+    "environment_created": (environment.Environment, "__init__"),
+    "environment_copied": (environment.Environment, "deep_copy"),
+}
+_originals = {event: vars(cls)[name] for event, (cls, name) in PATCHED_EVENTS.items()}
+_listeners: dict[str, list[Hooks]] = {event: [] for event in PATCHED_EVENTS}
+
+
+def patched(event: str):
+    original = _originals[event]
+    listeners = _listeners[event]
+
+    def method(self, *args, **kwargs):
+        result = original(self, *args, **kwargs)
+        for hook in listeners:
+            getattr(hook, event)(self)
+        return result
+
+    return method
+
+
+def register(hook: Hooks):
+    for event, (cls, name) in PATCHED_EVENTS.items():
+        if overrides(hook, event):
+            if not _listeners[event]:
+                setattr(cls, name, patched(event))
+            _listeners[event].append(hook)
+
+
+def unregister(hook: Hooks):
+    for event, (cls, name) in PATCHED_EVENTS.items():
+        if hook in _listeners[event]:
+            _listeners[event].remove(hook)
+            if not _listeners[event]:
+                setattr(cls, name, _originals[event])
+
+
+def instrument(jan):
+    """install hooked execute and call_function on jan, or remove them"""
+    node_hooks = [h for h in jan.hooks if overrides(h, "node")]
+    statement_hooks = [h for h in jan.hooks if overrides(h, "statement_enter", "statement_exit")]
+    call_hooks = [h for h in jan.hooks if overrides(h, "function_enter", "function_exit")]
+    if node_hooks or statement_hooks:
+        jan.execute = hooked_execute(type(jan).execute.__get__(jan), node_hooks, statement_hooks)
+    else:
+        jan.__dict__.pop("execute", None)
+    if call_hooks:
+        jan.call_function = hooked_call_function(type(jan).call_function.__get__(jan), call_hooks)
+    else:
+        jan.__dict__.pop("call_function", None)
+
+
+def hooked_execute(execute, node_hooks: list[Hooks], statement_hooks: list[Hooks]):
+    def execute_with_hooks(node):
+        for hook in node_hooks:
+            hook.node(node)
+        if node.line is None or not statement_hooks:
+            return execute(node)
+        for hook in statement_hooks:
+            hook.statement_enter(node)
+        try:
+            return execute(node)
+        finally:
+            for hook in statement_hooks:
+                hook.statement_exit(node)
+
+    return execute_with_hooks
+
+
+def hooked_call_function(call_function, hooks: list[Hooks]):
+    def call_function_with_hooks(fn, args, kwargs):
+        for hook in hooks:
+            hook.function_enter(fn, args, kwargs)
+        result = None
+        try:
+            result = call_function(fn, args, kwargs)
+            return result
+        finally:
+            for hook in hooks:
+                hook.function_exit(fn, result)
+
+    return call_function_with_hooks
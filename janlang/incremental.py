@@ -0,0 +1,172 @@
+"""
+incremental front end for editors and watch mode
+
+The document is split into chunks, one per top-level statement: a chunk starts
+at a non-blank line with no indentation that isn't an else continuation. Each
+chunk is lexed and parsed on its own from indentation level zero, so an edit
+only re-lexes and re-parses the top-level statements whose lines it touches and
+every other FunctionDefinition, ClassDefinition or statement subtree is reused.
+"""
+import re
+from bisect import bisect_right
+from itertools import accumulate
+import astree as ast
+import frontend
+import lexer
+import _parser as parser
+
+CONTINUATION = re.compile(r"else\b")
+FRONTEND_ERRORS = (parser.ParseError, parser.HardParseError, RuntimeError, AssertionError)
+
+
+def starts_chunk(line: str) -> bool:
+    return bool(line) and not line[0].isspace() and not CONTINUATION.match(line)
+
+
+class Chunk:
+    def __init__(self, lines: list[str], first_line: int):
+        self.lines = lines
+        self.text = "\n".join(lines) + "\n"
+        # zero based line the statements' line numbers are relative to
+        self.first_line = first_line
+        self.statements: list[ast.BaseNode] = []
+        self.error: Exception | None = None
+        try:
+            rule_lexer = lexer.RuleLexer(self.text)
+            rule_lexer.line = first_line + 1
+            tokens = list(rule_lexer.tokenize())
+            self.statements = parser.Parser(tokens).parse_module().body
+        except FRONTEND_ERRORS as e:
+            self.error = e
+
+
+class IncrementalDocument:
+    def __init__(self, text: str):
+        self.lines: list[str] = []
+        self.chunks: list[Chunk] = []
+        # per chunk line and statement counts, kept in flat lists so locating
+        # an edit and splicing the module body stay cheap on very large files
+        self.line_counts: list[int] = []
+        self.statement_counts: list[int] = []
+        self.body: list[ast.BaseNode] = []
+        self.broken_chunks = 0
+        self.reparsed_chunks = 0
+        # chunks from this index on may have moved since they were parsed
+        self.moved_from = 0
+        self._program: ast.Program | None = None
+        self.reset(text.split("\n"))
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def program(self) -> ast.Program:
+        if self._program is None:
+            if self.broken_chunks:
+                # either a real syntax error or a construct that spans chunks,
+                # such as a multiline string, the full parse settles which
+                self._program = frontend.parse_native(self.text)
+            else:
+                self.update_lines()
+                self._program = ast.Program(ast.Module(list(self.body)))
+        return self._program
+
+    def update_lines(self):
+        line = sum(self.line_counts[:self.moved_from])
+        for chunk in self.chunks[self.moved_from:]:
+            if chunk.first_line != line:
+                shift_lines(chunk.statements, line - chunk.first_line)
+                chunk.first_line = line
+            line += len(chunk.lines)
+        self.moved_from = len(self.chunks)
+
+    def reset(self, lines: list[str]):
+        self.lines = lines
+        self.chunks = []
+        self.line_counts = []
+        self.statement_counts = []
+        self.body = []
+        self.broken_chunks = 0
+        self.moved_from = 0
+        self.splice(0, 0, make_chunks(lines))
+        self.reparsed_chunks = len(self.chunks)
+
+    def replace_lines(self, start_line: int, end_line: int, new_lines: list[str]):
+        """
+        replace lines [start_line, end_line) (zero based) with new_lines; the
+        line numbers of chunks after the edit are only updated when program is
+        read, so edits that add or remove lines don't walk the rest of the file
+        """
+        if not self.chunks:
+            self.reset(new_lines)
+            return
+        starts = list(accumulate(self.line_counts, initial=0))
+        first = min(bisect_right(starts, start_line), len(self.chunks)) - 1
+        last = max(first, min(bisect_right(starts, end_line - 1), len(self.chunks)) - 1)
+        # a chunk whose first line no longer starts a statement continues the chunk before it
+        new_first_line = (new_lines or self.lines[end_line:end_line + 1] or [""])[0]
+        if first > 0 and start_line == starts[first] and not starts_chunk(new_first_line):
+            first -= 1
+        first_line = starts[first]
+        old_chunks = self.chunks[first:last + 1]
+        region = [line for chunk in old_chunks for line in chunk.lines]
+        region[start_line - first_line:end_line - first_line] = new_lines
+        self.lines[start_line:end_line] = new_lines
+        reusable: dict[str, list[Chunk]] = {}
+        for chunk in old_chunks:
+            reusable.setdefault(chunk.text, []).append(chunk)
+        new_chunks = make_chunks(region, first_line, reusable)
+        self.reparsed_chunks = sum(1 for chunk in new_chunks if chunk not in old_chunks)
+        # reused chunks may have moved within the region, and everything after
+        # it moves when the edit changes the line count
+        if len(new_lines) != end_line - start_line or self.reparsed_chunks < len(new_chunks):
+            self.moved_from = min(self.moved_from, first)
+        self.splice(first, last + 1, new_chunks)
+
+    def splice(self, first: int, end: int, new_chunks: list[Chunk]):
+        body_start = sum(self.statement_counts[:first])
+        body_end = body_start + sum(self.statement_counts[first:end])
+        self.broken_chunks -= sum(1 for chunk in self.chunks[first:end] if chunk.error)
+        self.broken_chunks += sum(1 for chunk in new_chunks if chunk.error)
+        self.chunks[first:end] = new_chunks
+        self.line_counts[first:end] = [len(chunk.lines) for chunk in new_chunks]
+        self.statement_counts[first:end] = [len(chunk.statements) for chunk in new_chunks]
+        self.body[body_start:body_end] = [stmt for chunk in new_chunks for stmt in chunk.statements]
+        self._program = None
+
+    def edit(self, start: tuple[int, int], end: tuple[int, int], text: str):
+        """replace the text between two zero based (line, column) positions"""
+        (start_line, start_col), (end_line, end_col) = start, end
+        prefix = self.lines[start_line][:start_col]
+        suffix = self.lines[end_line][end_col:]
+        self.replace_lines(start_line, end_line + 1, (prefix + text + suffix).split("\n"))
+
+
+def make_chunks(lines: list[str], first_line=0, reusable: dict[str, list[Chunk]] | None = None) -> list[Chunk]:
+    """chunks of lines, taking each unchanged chunk from reusable at most once"""
+    groups: list[list[str]] = []
+    for line in lines:
+        if starts_chunk(line) or not groups:
+            groups.append([line])
+        else:
+            groups[-1].append(line)
+    chunks = []
+    for group in groups:
+        candidates = reusable.get("\n".join(group) + "\n") if reusable else None
+        chunks.append(candidates.pop(0) if candidates else Chunk(group, first_line))
+        first_line += len(group)
+    return chunks
+
+
+def shift_lines(nodes: list[ast.BaseNode], delta: int):
+    stack: list = list(nodes)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, ast.BaseNode):
+            fields = value.__dict__
+            if fields.get("line") is not None:
+                value.line += delta
+            stack.extend(fields.values())
@@ -1,51 +1,159 @@
-from xmlrpc.client import Boolean
+import copy
+import functools
+import os
+import sys
 import native_functions
 import astree as ast
 import environment, values, errors
+import generators
+import hooks
+import limits as limits_
 from values.function import Return
-from typing import Final
+
+
+MODULE_SUFFIX = ".jan"
+
+
+def default_search_paths() -> list[str]:
+    paths = [os.getcwd()]
+    paths.extend(p for p in os.environ.get("JANPATH", "").split(os.pathsep) if p)
+    return paths
+
+
+# the method executing each node type, looked up once per Interpreter class
+EXECUTE_METHODS = {
+    ast.AssertStatement: "execute_assert_statement",
+    ast.Assignment: "execute_assignment",
+    ast.Attribute: "execute_attribute",
+    ast.BinOp: "execute_bin_op",
+    ast.Block: "execute_block",
+    ast.BreakStatement: "execute_break_statement",
+    ast.Call: "execute_call",
+    ast.ClassDefinition: "execute_class_definition",
+    ast.Compare: "execute_compare",
+    ast.ContinueStatement: "execute_continue_statement",
+    ast.And: "execute_and",
+    ast.Dictionary: "execute_dictionary",
+    ast.Exponent: "execute_exponent",
+    ast.FalseNode: "execute_false",
+    ast.Float: "execute_float",
+    ast.ForStatement: "execute_for_statement",
+    ast.FunctionDefinition: "execute_function_definition",
+    ast.IfStatement: "execute_if_statement",
+    ast.Import: "execute_import",
+    ast.Index: "execute_index",
+    ast.Integer: "execute_integer",
+    ast.List: "execute_list",
+    ast.Module: "execute_module",
+    ast.Name: "execute_name",
+    ast.Negative: "execute_negative",
+    ast.Not: "execute_not",
+    ast.Null: "execute_null",
+    ast.Or: "execute_or",
+    ast.Program: "execute_program",
+    ast.Return: "execute_return",
+    ast.String: "execute_string",
+    ast.TrueNode: "execute_true",
+    ast.VariableDeclaration: "execute_variable_declaration",
+    ast.WhileStatement: "execute_while_statement",
+    ast.Yield: "execute_yield",
+}
+
+
+def dispatch_table(cls) -> dict:
+    return {node_type: getattr(cls, name) for node_type, name in EXECUTE_METHODS.items()}
+
+
+@functools.cache
+def builtins() -> environment.Environment:
+    """the native functions, shared by the global environments of every interpreter"""
+    env = environment.Environment(parent=None)
+    for name, native_fn in native_functions.FUNCTIONS.items():
+        env.declare(name, "builtin")
+        env.assign(name, values.NativeFunction(name, native_fn))
+    return env
 
 
 class Interpreter:
-    def __init__(self):
-        self.execute_map = {
-            ast.AssertStatement: self.execute_assert_statement,
-            ast.Assignment: self.execute_assignment,
-            ast.Attribute: self.execute_attribute,
-            ast.BinOp: self.execute_bin_op,
-            ast.Block: self.execute_block,
-            ast.BreakStatement: self.execute_break_statement,
-            ast.Call: self.execute_call,
-            ast.ClassDefinition: self.execute_class_definition,
-            ast.Compare: self.execute_compare,
-            ast.ContinueStatement: self.execute_continue_statement,
-            ast.Dictionary: self.execute_dictionary,
-            ast.FalseNode: self.execute_false,
-            ast.Float: self.execute_float,
-            ast.ForStatement: self.execute_for_statement,
-            ast.FunctionDefinition: self.execute_function_definition,
-            ast.IfStatement: self.execute_if_statement,
-            ast.Index: self.execute_index,
-            ast.Integer: self.execute_integer,
-            ast.List: self.execute_list,
-            ast.Module: self.execute_module,
-            ast.Name: self.execute_name,
-            ast.Negative: self.execute_negative,
-            ast.Not: self.execute_not,
-            ast.Null: self.execute_null,
-            ast.Program: self.execute_program,
-            ast.Return: self.execute_return,
-            ast.String: self.execute_string,
-            ast.TrueNode: self.execute_true,
-            ast.VariableDeclaration: self.execute_variable_declaration,
-            ast.WhileStatement: self.execute_while_statement,
-        }
-        self.environment: environment.Environment = environment.Environment(parent=None)
-        self.setup_globals()
+    """
+    Keep a configured interpreter as a template and clone() it for every
+    script: a clone shares the template's settings and parsed modules and
+    starts with empty globals. Parsed programs are not changed by execution, so
+    one Program can be run by any number of interpreters.
+    """
+
+    execute_map: dict = {}  # filled in below the class
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.execute_map = dispatch_table(cls)
+
+    def __init__(self, search_paths: list[str] | None = None, parser_name="native", limits: limits_.Limits | None = None):
+        self.search_paths = default_search_paths() if search_paths is None else search_paths
+        self.parser_name = parser_name
+        self.limits = limits
+        # parsed module programs by path, shared with clones
+        self.programs: dict[str, ast.Program] = {}
+        self.reset()
+
+    def reset(self):
+        """forget globals, imported modules and hooks"""
+        self.modules: dict[str, values.Module] = {}
+        self.hooks: list[hooks.Hooks] = []
+        # steps left before limits are checked, and the current call depth.
+        # With limits the budget starts used up, so the first loop iteration
+        # or call starts them however execution was entered
+        self.budget = sys.maxsize if self.limits is None else 0
+        self.limits_started = False
+        self.depth = 0
+        self.max_depth = sys.maxsize
+        self.running_programs = 0
+        self.environment: environment.Environment = self.create_global_environment()
+
+    def clone(self) -> "Interpreter":
+        """an interpreter with these settings and parsed modules but its own globals"""
+        jan = type(self).__new__(type(self))
+        self._copy_state(jan)
+        jan.reset()
+        return jan
+
+    def _copy_state(self, jan: "Interpreter"):
+        """
+        set up the settings of a clone in place of __init__; subclasses with
+        state of their own extend this
+        """
+        jan.search_paths = self.search_paths
+        jan.parser_name = self.parser_name
+        jan.limits = copy.copy(self.limits)
+        jan.programs = self.programs
+
+    def add_hook(self, hook: hooks.Hooks):
+        self.hooks.append(hook)
+        hooks.register(hook)
+        hooks.instrument(self)
+
+    def remove_hook(self, hook: hooks.Hooks):
+        self.hooks.remove(hook)
+        hooks.unregister(hook)
+        hooks.instrument(self)
+
+    def start_limits(self):
+        if self.limits is not None:
+            self.budget = self.limits.start()
+            self.max_depth = self.limits.depth or sys.maxsize
+            self.limits_started = True
+
+    def check_limits(self):
+        if self.limits is None:
+            self.budget = sys.maxsize
+        elif not self.limits_started:
+            self.start_limits()
+        else:
+            self.budget = self.limits.check()
 
     def execute(self, node) -> values.BaseValue | None:
         fn = self.execute_map[type(node)]
-        result = fn(node)
+        result = fn(self, node)
         assert result is None or isinstance(result, values.BaseValue)
         return result
 
@@ -72,6 +180,9 @@ class Interpreter:
 
     def execute_while_statement(self, while_statement: ast.WhileStatement):
         while self.execute(while_statement.test):
+            if self.budget <= 0:
+                self.check_limits()
+            self.budget -= 1
             try:
                 self.execute(while_statement.body)
             except Continue:
@@ -81,27 +192,68 @@ class Interpreter:
 
     def execute_for_statement(self, for_statement: ast.ForStatement):
         iter_obj = self.execute(for_statement.iter)
+        if type(iter_obj) is values.Range:
+            return self.execute_range_loop(for_statement, iter_obj.range)
         for obj in iter_obj:
-            env = self.environment.add_child()
-            if isinstance(for_statement.left, ast.VariableDeclaration):
-                decl_type = (
-                    "variable"
-                    if for_statement.left.is_mutable
-                    else "immutable_variable"
-                )
-                name = for_statement.left.name
-                env.declare(name.value, decl_type)
+            if self.budget <= 0:
+                self.check_limits()
+            self.budget -= 1
+            try:
+                self.execute_block(for_statement.body, self.for_loop_scope(for_statement, obj))
+            except Continue:
+                pass
+            except Break:
+                return
+
+    def execute_range_loop(self, for_statement: ast.ForStatement, range_: range):
+        """
+        for over a range: the enclosing scopes are copied once instead of once
+        per iteration, and each iteration's scope gets its loop variable directly
+        """
+        parent = self.environment.deep_copy()
+        left = for_statement.left
+        if isinstance(left, ast.VariableDeclaration):
+            name = left.name.value
+            decl_type = "variable" if left.is_mutable else "immutable_variable"
+        else:
+            name, decl_type = left.value, None
+        body = for_statement.body
+        for i in range_:
+            if self.budget <= 0:
+                self.check_limits()
+            self.budget -= 1
+            env = environment.Environment(parent)
+            if decl_type is None:
+                env.assign(name, values.Integer(i))
             else:
-                name = for_statement.left
-            assert isinstance(name, ast.Name)
-            env.assign(name.value, obj)
+                # a new symbol every iteration, closures keep the value they saw
+                symbol = env.values[name] = environment.Symbol(name, decl_type)
+                symbol.value = values.Integer(i)
+                symbol.value_initialized = True
             try:
-                self.execute_block(for_statement.body, env)
+                self.execute_block(body, env)
             except Continue:
                 pass
             except Break:
                 return
 
+    def for_loop_scope(self, for_statement: ast.ForStatement, obj) -> environment.Environment:
+        """the scope of one iteration, with the loop variable bound to obj"""
+        env = self.environment.add_child()
+        if isinstance(for_statement.left, ast.VariableDeclaration):
+            decl_type = (
+                "variable"
+                if for_statement.left.is_mutable
+                else "immutable_variable"
+            )
+            name = for_statement.left.name
+            env.declare(name.value, decl_type)
+        else:
+            name = for_statement.left
+        assert isinstance(name, ast.Name)
+        env.assign(name.value, obj)
+        return env
+
     def execute_break_statement(self, break_statement: ast.BreakStatement):
         raise Break()
 
@@ -134,9 +286,7 @@ class Interpreter:
         
     def execute_attribute(self, attr: ast.Attribute):
         attribute_of_value = self.execute(attr.attribute_of)
-        attr = attribute_of_value.getattr(attr.name)
-        print('attr', attr)
-        return attr
+        return attribute_of_value.getattr(attr.name)
     
 
     def execute_name(self, name: ast.Name):
@@ -166,10 +316,23 @@ class Interpreter:
             )
         args = [self.execute(arg) for arg in call.args]
         kwargs = {k: self.execute(v) for k, v in call.kwargs.items()}
-        if isinstance(object_to_call, values.NativeFunction):
-            return object_to_call.call(args, kwargs)
-        else:
-            return object_to_call.call(self, args, kwargs)
+        return self.call_function(object_to_call, args, kwargs)
+
+    def call_function(self, fn: values.Function | values.NativeFunction, args, kwargs):
+        if self.budget <= 0:
+            self.check_limits()
+        self.budget -= 1
+        if self.depth >= self.max_depth:
+            raise errors.JanResourceLimitError(f"maximum call depth of {self.max_depth} exceeded")
+        self.depth += 1
+        try:
+            if isinstance(fn, values.NativeFunction):
+                return fn.call(args, kwargs)
+            return fn.call(self, args, kwargs)
+        except RecursionError:
+            raise errors.JanResourceLimitError("maximum recursion depth exceeded") from None
+        finally:
+            self.depth -= 1
 
     def execute_integer(self, int_: ast.Integer) -> values.Integer:
         return values.Integer(int_.value)
@@ -198,7 +361,7 @@ class Interpreter:
 
     def execute_not(self, not_expr: ast.Not):
         expr_result = self.execute(not_expr.expr)
-        return Boolean(expr_result)
+        return values.Boolean(not expr_result)
 
     def execute_negative(self, negative_expr: ast.Negative):
         expr_result = self.execute(negative_expr.value)
@@ -212,6 +375,7 @@ class Interpreter:
             definition.defaults,
             definition.body,
             closure,
+            generators.contains_yield(definition.body),
         )
         self.environment.declare(definition.name, "function")
         self.environment.assign(definition.name, fn)
@@ -224,7 +388,8 @@ class Interpreter:
         closure = self.environment.deep_copy()
         methods: list[values.Function] = []
         for method_ast in definition.methods:
-            method = values.Function.from_ast(method_ast, closure)
+            is_generator = generators.contains_yield(method_ast.body)
+            method = values.Function.from_ast(method_ast, closure, is_generator)
             methods.append(method)
         cls_def = values.ClassDefinition(definition.name, methods, closure)
         self.environment.declare(definition.name, "class_definition")
@@ -256,23 +421,88 @@ class Interpreter:
             result = self.execute(ret.value)
         raise Return(result)
 
+    def execute_yield(self, yield_statement: ast.Yield):
+        # yields inside generator functions are run by generators.Frame
+        raise errors.JanRuntimeException("yield outside of a generator function")
+
+    def start_generator(self, fn: values.Function, env: environment.Environment) -> values.Generator:
+        """the generator returned by calling fn, whose body will run in env"""
+        return values.Generator(fn.name, generators.run(self, fn.body, env))
+
     def execute_bin_op(self, bin_op: ast.BinOp):
         left, right = self.execute(bin_op.left), self.execute(bin_op.right)
         return bin_op.op.evaluate(left, right)
 
+    def execute_exponent(self, exponent: ast.Exponent):
+        left, right = self.execute(exponent.left), self.execute(exponent.right)
+        return left ** right
+
+    def execute_or(self, or_: ast.Or):
+        left = self.execute(or_.left)
+        if left:
+            return left
+        return self.execute(or_.right)
+
+    def execute_and(self, and_: ast.And):
+        left = self.execute(and_.left)
+        if not left:
+            return left
+        return self.execute(and_.right)
+
     def execute_program(self, program: ast.Program):
-        return self.execute(program.main)
+        # modules are programs too, run inside the one that imports them
+        if not self.running_programs:
+            self.start_limits()
+        self.running_programs += 1
+        try:
+            return self.execute(program.main)
+        finally:
+            self.running_programs -= 1
     
     def execute_null(self, null: ast.Null):
         return values.Null()
 
-    def setup_globals(self):
-        closure = self.environment
-        for name, native_fn in native_functions.FUNCTIONS.items():
-            fn = values.NativeFunction(name, native_fn)
-            # fn = values.Function(name, [], [], native_fn, closure)
-            self.environment.declare(name, "native_function")
-            self.environment.assign(name, fn)
+    def create_global_environment(self) -> environment.Environment:
+        return environment.Environment(parent=None, fallback=builtins())
+
+    def execute_import(self, import_: ast.Import):
+        module = self.modules.get(import_.name)
+        if module is None:
+            module = values.Module(import_.name, self.find_module(import_.name), self)
+            self.modules[import_.name] = module
+        symbol = self.environment.values.get(import_.name)
+        if symbol is not None and symbol.value is module:
+            return  # already imported in this scope
+        self.environment.declare(import_.name, "module")
+        self.environment.assign(import_.name, module)
+
+    def find_module(self, name: str) -> str:
+        for directory in self.search_paths:
+            path = os.path.join(directory, name + MODULE_SUFFIX)
+            if os.path.isfile(path):
+                return path
+        raise errors.JanImportError(f"No module named {name}")
+
+    def load_module(self, module: values.Module):
+        import compile_cache
+
+        program = self.programs.get(module.path)
+        if program is None:
+            program = self.programs[module.path] = compile_cache.load_program(module.path, self.parser_name)
+        # set before executing so circular imports see the partially run module
+        module.environment = self.create_global_environment()
+        previous = self.environment
+        self.environment = module.environment
+        try:
+            self.execute(program)
+        except BaseException:
+            module.environment = None
+            raise
+        finally:
+            self.environment = previous
+
+
+Interpreter.execute_map = dispatch_table(Interpreter)
 
 
 class Continue(BaseException):
@@ -1,4 +1,10 @@
+import functools
 from lark import Lark, Transformer, v_args, Token, Tree
+from lark.exceptions import UnexpectedInput
+from lark.indenter import Indenter
+import astree as ast
+import _parser
+import grammar_cache
 
 UTTERANCE_CHOICES = 'utterance_choices'
 UTTERANCE_CHOICES_OPTIONAL = 'utterance_choices_optional'
@@ -23,79 +29,307 @@ UNARY_OPERATOR = 'UNARY_OPERATOR'
 ARGUMENT_REFERENCE = 'argument_reference'
 SLICE = 'slice'
 
-grammar = """
-    COMPARE_OPERATOR: ("==" | "!=" | "<=" | ">=" | "<"  | ">")
-    ADDITIVE_OPERATOR: ("+" | "-")
-    MULTIPLICATIVE_OPERATOR: ("*" | "/" | "//" | "%")
-    UNARY_OPERATOR: ("+" | "-")
-    NOT_OPERATOR: "not"
-
-    _WS: /[ \t]/
-    WS: /[ \t]/
-    NO_WS_AHEAD: /(?![ \t])/
-    NO_WS_BEHIND: /(?<![ \t])/
-    NO_EQUALS_AHEAD: /(?![ \t]*=)./
-    ARG_NAME: /[a-zA-Z0-9_]+(?![ \t]*=)/ 
-
-    module: _NL* statements
-    statements: _statement+
-    _statement: if_statement | assignment | _simple_statement | function_definition
-    if_statement: "if" NAME ":" _block
-    assignment: "var" NAME "=" expr _NL
-    _simple_statement: expr _NL
-    _block: _NL _INDENT statements _DEDENT
-    expr: _atom_entry
-    _atom_entry: compare
-    ?compare: or (COMPARE_OPERATOR or)*
-    ?or: and ("||" and)*
-    ?and: not ("&&" not)*
-    ?not: [NOT_OPERATOR] additive
-    ?additive: multiplicative (ADDITIVE_OPERATOR multiplicative)*
-    ?multiplicative: unary (MULTIPLICATIVE_OPERATOR unary)*
-    ?unary: [UNARY_OPERATOR] exponent
-    ?exponent: _atom ("**" _atom)*
-    _aatom: (STRING_SINGLE | STRING_DOUBLE | ZERO_OR_POSITIVE_INTEGER | ZERO_OR_POSITIVE_FLOAT | NAME)
-    _atom: (index | slice | _grouping | attribute | literal | list | STRING_SINGLE | STRING_DOUBLE | ZERO_OR_POSITIVE_INTEGER | ZERO_OR_POSITIVE_FLOAT | call | NAME)
-    _chainable: (NAME | attribute | call | list | index | slice | STRING_SINGLE | STRING_DOUBLE | _grouping | ZERO_OR_POSITIVE_INTEGER | ZERO_OR_POSITIVE_FLOAT)
-    _ATTR_SEPARATOR: NO_WS_BEHIND "." NO_WS_AHEAD
-    _SUBSCRIPT_PREFIX: NO_WS_BEHIND "["
-    SLICE_SEPARATOR: ":"
-    _CALL_START: NO_WS_BEHIND "("
-    ZERO_OR_POSITIVE_FLOAT: /([0-9]*[.])+[0-9]+/
-    ZERO_OR_POSITIVE_INTEGER: /[0-9]+/
-    INTEGER: /-?[0-9]+/
-    LITERAL_PIECE: /[a-zA-Z0-9_]+/ 
-    literal.-100: LITERAL_PIECE (WS+ LITERAL_PIECE)*
-
-    _grouping: "(" expr ")"
-    list: "[" [expr ("," expr)*] "]"
-    index: _chainable _SUBSCRIPT_PREFIX expr "]"
-    slice: _chainable _SUBSCRIPT_PREFIX [expr] SLICE_SEPARATOR [expr] [SLICE_SEPARATOR [expr]] "]"
-    attribute: _chainable  _ATTR_SEPARATOR NAME
-    call: _ch
-    chainable _CALL_START ((arg_list ["," kwarg_list]) | [kwarg_list]) ")"
-    arg_list: expr ("," expr)*
-    kwarg_list: kwarg ("," kwarg)* 
-    kwarg: NAME "=" expr
-
-    function_definition: "def" NAME "(" [positional_parameters] [[","] default_parameters] ")" ":" _block
-    positional_parameters: ARG_NAME ("," ARG_NAME)*
-    default_parameters: default_parameter ("," default_parameter)*
-    default_parameter: NAME "=" expr
-    _STRING_INNER: /.*?/
-    _STRING_ESC_INNER: _STRING_INNER /(?<!\\\\)(\\\\\\\\)*?/ 
-    STRING_SINGLE: "'" _STRING_ESC_INNER "'"
-    STRING_DOUBLE: "\\"" _STRING_ESC_INNER "\\""
-
-
-    %declare _INDENT _DEDENT
-    %import common.CNAME -> NAME
-    %import common.WS_INLINE
-    %ignore WS_INLINE
-
-    _NL: /(\\r?\\n[\\t ]*)+/
+grammar = r"""
+    module: _NL? _statement*
+
+    _statement: LINE? (_simple_statement _NL | _compound_statement)
+    _simple_statement: return_statement
+        | yield_statement
+        | continue_statement
+        | break_statement
+        | assert_statement
+        | import_statement
+        | pass_statement
+        | declaration
+        | assignment
+        | expr
+    _compound_statement: function_definition
+        | class_definition
+        | if_statement
+        | while_statement
+        | for_statement
+
+    return_statement: "return" [expr]
+    yield_statement: "yield" [expr]
+    continue_statement: "continue"
+    break_statement: "break"
+    assert_statement: "assert" expr
+    import_statement: "import" NAME
+    pass_statement: "pass"
+    declaration: "var" [MUT] NAME ["=" expr]
+    assignment: primary "=" expr
+
+    function_definition: "def" NAME "(" [parameters] ")" ":" block
+    parameters: NAME ("," NAME)* [","]
+    class_definition: "class" NAME ":" _NL _INDENT _class_member+ _DEDENT
+    _class_member: LINE? (method | pass_statement _NL)
+    method: NAME "(" [parameters] ")" ":" block
+    if_statement: "if" expr ":" block else_if* [else_clause]
+    else_if: "else" "if" expr ":" block
+    else_clause: "else" ":" block
+    while_statement: "while" expr ":" block
+    for_statement: "for" for_target "in" expr ":" block
+    for_target: NAME -> name
+        | "var" [MUT] NAME -> declaration_target
+    block: _NL _INDENT _statement+ _DEDENT
+
+    ?expr: or_expr
+    ?or_expr: and_expr | or_expr "or" and_expr -> or_
+    ?and_expr: comparison | and_expr "and" comparison -> and_
+    ?comparison: arith (COMPARE_OPERATOR arith)*
+    ?arith: term | arith (PLUS | MINUS) term -> binop
+    ?term: factor | term (STAR | SLASH) factor -> binop
+    ?factor: MINUS factor -> negative
+        | "not" factor -> not_
+        | power
+    ?power: primary | primary "**" factor -> exponent
+    ?primary: atom
+        | primary "(" [arguments] ")" -> call
+        | primary "." NAME -> attribute
+        | primary "[" expr "]" -> index
+    ?atom: NAME -> name
+        | INT -> integer
+        | FLOAT -> float
+        | STRING -> string
+        | "true" -> true
+        | "false" -> false
+        | "null" -> null
+        | "[" [arguments] "]" -> list
+        | "{" "}" -> dictionary
+        | "(" expr ")"
+    arguments: expr ("," expr)* [","]
+
+    MUT: "mut"
+    COMPARE_OPERATOR: "==" | "!=" | "<=" | ">=" | "<" | ">"
+    PLUS: "+"
+    MINUS: "-"
+    STAR: "*"
+    SLASH: "/"
+    NAME: /[a-zA-Z_][a-zA-Z0-9_]*/
+    FLOAT.2: /(\d*\.\d+|\d+\.\d*)/
+    INT: /\d+/
+    STRING: /"[^"]*"/ | /'[^']*'/
+
+    _NL: /(\r?\n[\t ]*)+/
+    %ignore /[\t ]+/
+    %declare _INDENT _DEDENT LINE
 """
 
+compare_operators = {
+    "==": ast.Eq,
+    "!=": ast.NotEq,
+    "<=": ast.LtE,
+    ">=": ast.GtE,
+    "<": ast.Lt,
+    ">": ast.Gt,
+}
+arithmetic_operators = {
+    "+": ast.Add,
+    "-": ast.Subtract,
+    "*": ast.Multiply,
+    "/": ast.Divide,
+}
+
+
+class JanIndenter(Indenter):
+    NL_type = "_NL"
+    OPEN_PAREN_types = ["LPAR", "LSQB", "LBRACE"]
+    CLOSE_PAREN_types = ["RPAR", "RSQB", "RBRACE"]
+    INDENT_type = "_INDENT"
+    DEDENT_type = "_DEDENT"
+    tab_len = 4
+
+    def process(self, stream):
+        # a LINE token in front of every statement carries its line number to
+        # the transformer, which runs inside the parser and gets no positions.
+        # The grammar makes LINE optional, so the parser state that the
+        # contextual lexer lexes a statement's first token in, before LINE
+        # is shifted, already accepts that token
+        at_line_start = True
+        for token in super().process(stream):
+            if token.type in (self.NL_type, self.INDENT_type, self.DEDENT_type):
+                at_line_start = True
+            else:
+                if at_line_start and token.type != "ELSE":
+                    yield Token.new_borrow_pos("LINE", "", token)
+                at_line_start = False
+            yield token
+
+
+def flatten_statements(children):
+    # statements follow their LINE token, var x = 1 yields a declaration and
+    # an assignment and pass yields nothing
+    flat = []
+    line = None
+    for child in children:
+        if isinstance(child, Token):
+            line = child.line
+            continue
+        for stmt in child if isinstance(child, list) else (child,):
+            stmt.line = line
+            flat.append(stmt)
+    return flat
+
+
+@v_args(inline=True)
+class JanTransformer(Transformer):
+    """
+    builds the same astree nodes as _parser.Parser
+    """
+
+    def module(self, *statements):
+        return ast.Program(ast.Module(flatten_statements(statements)))
+
+    def block(self, *statements):
+        return ast.Block(flatten_statements(statements))
+
+    def return_statement(self, value):
+        return ast.Return(value)
+
+    def yield_statement(self, value):
+        return ast.Yield(value)
+
+    def continue_statement(self):
+        return ast.ContinueStatement()
+
+    def break_statement(self):
+        return ast.BreakStatement()
+
+    def assert_statement(self, test):
+        return ast.AssertStatement(test)
+
+    def import_statement(self, name):
+        return ast.Import(str(name))
+
+    def pass_statement(self):
+        return []
+
+    def declaration(self, mut, name, value):
+        decl = ast.VariableDeclaration(ast.Name(str(name)), mut is not None)
+        if value is None:
+            return decl
+        return [decl, ast.Assignment(ast.Name(str(name)), value)]
+
+    def assignment(self, left, right):
+        if not isinstance(left, (ast.Name, ast.Index)):
+            raise _parser.HardParseError(f"Cannot assign to {type(left).__name__}")
+        return ast.Assignment(left, right)
+
+    def function_definition(self, name, params, body):
+        return ast.FunctionDefinition(str(name), params or [], [], body)
+
+    method = function_definition
+
+    def parameters(self, *names):
+        return [ast.Parameter(str(name)) for name in names if name is not None]
+
+    def class_definition(self, name, *members):
+        methods = [m for m in flatten_statements(members) if isinstance(m, ast.FunctionDefinition)]
+        return ast.ClassDefinition(str(name), methods)
+
+    def if_statement(self, test, body, *rest):
+        *else_ifs, else_body = rest
+        return ast.IfStatement(test, body, list(else_ifs), else_body)
+
+    def else_if(self, test, body):
+        return (test, body)
+
+    def else_clause(self, body):
+        return body
+
+    def while_statement(self, test, body):
+        return ast.WhileStatement(test, body)
+
+    def for_statement(self, target, iter_, body):
+        return ast.ForStatement(target, iter_, body)
+
+    def declaration_target(self, mut, name):
+        return ast.VariableDeclaration(ast.Name(str(name)), mut is not None)
+
+    def or_(self, left, right):
+        return ast.Or(left, right)
+
+    def and_(self, left, right):
+        return ast.And(left, right)
+
+    def comparison(self, left, *rest):
+        ops = [compare_operators[str(op)]() for op in rest[::2]]
+        return ast.Compare(left, ops, list(rest[1::2]))
+
+    def binop(self, left, op, right):
+        return ast.BinOp(left, arithmetic_operators[str(op)](), right)
+
+    def negative(self, _, value):
+        return ast.Negative(value)
+
+    def not_(self, expr):
+        return ast.Not(expr)
+
+    def exponent(self, left, right):
+        return ast.Exponent(left, right)
+
+    def call(self, fn, args):
+        return ast.Call(fn, args or [], {})
+
+    def attribute(self, attribute_of, name):
+        return ast.Attribute(attribute_of, str(name))
+
+    def index(self, index_of, index):
+        return ast.Index(index_of, index)
+
+    def arguments(self, *args):
+        return [arg for arg in args if arg is not None]
+
+    def name(self, tok):
+        return ast.Name(str(tok))
+
+    def integer(self, tok):
+        return ast.Integer(str(tok))
+
+    def float(self, tok):
+        return ast.Float(str(tok))
+
+    def string(self, tok):
+        return ast.String(str(tok)[1:-1])
+
+    def true(self):
+        return ast.TrueNode()
+
+    def false(self):
+        return ast.FalseNode()
+
+    def null(self):
+        return ast.Null()
+
+    def list(self, items):
+        return ast.List(items or [])
+
+    def dictionary(self):
+        return ast.Dictionary([])
+
+
+@functools.lru_cache(maxsize=None)
+def jan_parser() -> Lark:
+    return grammar_cache.load_lark(
+        grammar,
+        parser="lalr",
+        lexer="contextual",
+        postlex=JanIndenter(),
+        start="module",
+        transformer=JanTransformer(),
+        maybe_placeholders=True,
+    )
+
+
+def parse_jan(text: str) -> ast.Program:
+    if not text.endswith("\n"):
+        text += "\n"
+    try:
+        return jan_parser().parse(text)
+    except UnexpectedInput as e:
+        raise _parser.HardParseError(str(e), getattr(e, "line", None)) from e
+
+
 osspeak_grammar = f'''start: ([_block] _NEWLINE)* [_block]
 _block: (command | function_definition | named_utterance | comment)
 comment: /[ \t]*#.*/
@@ -182,21 +416,27 @@ REGEX: "/" _STRING_ESC_INNER "/"
 '''
 
 
-# lark_grammar = Lark(grammar, propagate_positions=True, maybe_placeholders=True, ambiguity='explicit')
-# utterance_grammar = Lark(grammar, start='utterance', propagate_positions=True, maybe_placeholders=True, ambiguity='explicit')
-# action_grammar = Lark(grammar, start='_action', propagate_positions=True, maybe_placeholders=True, ambiguity='explicit')
+@functools.lru_cache(maxsize=None)
+def osspeak_parser(start: str) -> Lark:
+    return grammar_cache.load_lark(
+        osspeak_grammar,
+        start=start,
+        propagate_positions=True,
+        maybe_placeholders=True,
+        ambiguity="explicit",
+    )
 
 
 def parse_command_module(text: str):
-    ir = lark_grammar.parse(text)
+    ir = osspeak_parser("start").parse(text)
     return ResolveAmbiguities().transform(ir)
     
 def parse_utterance(text: str):
-    ir = utterance_grammar.parse(text)
+    ir = osspeak_parser("utterance").parse(text)
     return ResolveAmbiguities().transform(ir)
 
 def parse_action(text: str):
-    ir = action_grammar.parse(text)
+    ir = osspeak_parser("_action").parse(text)
     return ResolveAmbiguities().transform(ir.children[0])
 
 class ResolveAmbiguities(Transformer):
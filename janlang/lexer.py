@@ -1,5 +1,4 @@
 import re
-from inspect import isclass
 import tokens
 
 class RuleLexer:
@@ -20,6 +19,7 @@ class RuleLexer:
             (r'>', tokens.Gt),
             (r'<', tokens.Lt),
             (r'=', tokens.Assign),
+            (r'\*\*', tokens.DoubleStar),
             (r'\*', tokens.Star),
             (r'\/', tokens.Slash),
             (r'-', tokens.Minus),
@@ -30,6 +30,7 @@ class RuleLexer:
             (r'\.', tokens.Period),
         ))
         self.keywords = {
+            'and': tokens.AndToken,
             'assert': tokens.Assert,
             'break': tokens.Break,
             'class': tokens.ClassDef,
@@ -39,16 +40,19 @@ class RuleLexer:
             'false': tokens.FalseToken,
             'for': tokens.For,
             'if': tokens.If,
+            'import': tokens.Import,
             'in': tokens.In,
             'mut': tokens.Mutable,
             'not': tokens.Not,
             'null': tokens.NullToken,
+            'or': tokens.OrToken,
             'pass': tokens.Pass,
             'return': tokens.Return,
             'this': tokens.This,
             'true': tokens.TrueToken,
             'var': tokens.VariableDeclaration,
             'while': tokens.While,
+            'yield': tokens.Yield,
         }
         self.text = text
         self.pos = 0
@@ -72,7 +76,7 @@ class RuleLexer:
             match = pattern.match(self.text, pos=self.pos) 
             if match:
                 matched_text = self.text[self.pos:match.span()[-1]]
-                token = token_creator(matched_text) if isclass(token_creator) else token_creator(matched_text)
+                token = token_creator(matched_text)
                 self.pos = match.span()[-1]
                 return token
         raise RuntimeError(f'Cannot tokenize text: {self.text[self.pos:]}')
@@ -0,0 +1,74 @@
+"""
+resource limits for an Interpreter running untrusted scripts
+
+The interpreter counts a step for every loop iteration and function call
+against a budget handed out by Limits in chunks of check_interval steps; the
+clock and memory are only looked at when a chunk runs out, so the hot paths
+pay one decrement and comparison. Exceeding a limit raises
+errors.JanResourceLimitError.
+"""
+import os
+import sys
+import time
+import errors
+
+
+class Limits:
+    def __init__(self, steps: int | None = None, seconds: float | None = None, depth: int | None = None,
+                 memory: int | None = None, check_interval=1000):
+        """
+        steps: loop iterations plus function calls
+        seconds: wall-clock time from the start of execution
+        depth: nested function calls
+        memory: bytes the process may grow by while the script runs
+        """
+        self.steps = steps
+        self.seconds = seconds
+        self.depth = depth
+        self.memory = memory
+        self.check_interval = check_interval
+        self.steps_taken = 0
+        self.granted = 0
+        self.deadline: float | None = None
+        self.memory_baseline = 0
+
+    def start(self) -> int:
+        """reset the counters and return the first step budget"""
+        self.steps_taken = 0
+        self.deadline = None if self.seconds is None else time.monotonic() + self.seconds
+        self.memory_baseline = current_memory() if self.memory is not None else 0
+        return self.grant()
+
+    def grant(self) -> int:
+        budget = self.check_interval
+        if self.steps is not None:
+            budget = min(budget, self.steps - self.steps_taken)
+        self.granted = budget
+        return budget
+
+    def check(self) -> int:
+        """called when the step budget is used up; returns the next one"""
+        self.steps_taken += self.granted
+        if self.steps is not None and self.steps_taken >= self.steps:
+            raise errors.JanResourceLimitError(f"step limit of {self.steps} exceeded")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise errors.JanResourceLimitError(f"time limit of {self.seconds}s exceeded")
+        if self.memory is not None and current_memory() - self.memory_baseline > self.memory:
+            raise errors.JanResourceLimitError(f"memory limit of {self.memory} bytes exceeded")
+        return self.grant()
+
+
+def current_memory() -> int:
+    """traced Python memory when tracemalloc runs, otherwise resident set size"""
+    import tracemalloc
+
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
@@ -1,19 +1,106 @@
 import argparse
+import os
+import sys
 import interpreter
-import ast_json
-import lexer
-import _parser as parser
+import frontend
+import compile_cache
 
 def main():
     arg_parser = argparse.ArgumentParser(description='Process some integers.')
     arg_parser.add_argument('main', type=str,
                         help='an integer for the accumulator')
+    arg_parser.add_argument('--parser', choices=tuple(frontend.PARSERS), default='native',
+                        help='front end used to parse the program')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                        help='always parse the source instead of using __jancache__')
+    arg_parser.add_argument('--profile', action='store_true',
+                        help='print time spent per jan function and line to stderr')
+    arg_parser.add_argument('--profile-output', metavar='PATH',
+                        help='write function statistics in pstats format to PATH')
+    arg_parser.add_argument('--sample', metavar='PATH',
+                        help='sample the jan call stack and write collapsed stacks, or speedscope JSON for .json paths')
+    arg_parser.add_argument('--sample-interval', type=float, default=5.0, metavar='MS',
+                        help='milliseconds between samples')
+    arg_parser.add_argument('--sample-mode', choices=('thread', 'signal'), default='thread',
+                        help='take samples from a background thread or a SIGPROF timer')
+    arg_parser.add_argument('--trace', metavar='PATH',
+                        help='write a Chrome trace-event JSON timeline of calls and statements to PATH')
+    arg_parser.add_argument('--stats', action='store_true',
+                        help='print counts of executed nodes, created values and environments to stderr')
+    arg_parser.add_argument('--heap-report', action='store_true',
+                        help='trace allocations and print live jan values, environments and closures to stderr at exit')
+    arg_parser.add_argument('--max-steps', type=int, metavar='N',
+                        help='stop after N loop iterations and function calls')
+    arg_parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='stop after SECONDS of wall-clock time')
+    arg_parser.add_argument('--max-depth', type=int, metavar='N',
+                        help='maximum depth of nested function calls')
+    arg_parser.add_argument('--max-memory', type=int, metavar='MB',
+                        help='stop when the process grows by more than MB megabytes')
+    arg_parser.add_argument('--prelude', metavar='PATH',
+                        help='run PATH first in the same globals, restoring them from a heap snapshot in __jancache__ when it is unchanged')
+    arg_parser.add_argument('--dump-ast', action='store_true',
+                        help='print the parsed program as JSON to stderr before running it')
     args = arg_parser.parse_args()
-    tokenizer = lexer.RuleLexer.from_path(args.main)
-    tokens = list(tokenizer.tokenize())
-    program = parser.Parser(tokens).parse_root()
-    print(ast_json.dumps(program))
-    interpreter.Interpreter().execute(program)
+    if args.no_cache:
+        program = frontend.parse_path(args.main, args.parser)
+    else:
+        program = compile_cache.load_program(args.main, args.parser)
+    if args.dump_ast:
+        import ast_json
+        print(ast_json.dumps(program), file=sys.stderr)
+    search_paths = [os.path.dirname(os.path.abspath(args.main)), *interpreter.default_search_paths()]
+    if args.heap_report:
+        import heap
+        import tracemalloc
+        tracemalloc.start()
+    limits = None
+    if any(limit is not None for limit in (args.max_steps, args.timeout, args.max_depth, args.max_memory)):
+        import limits as limits_
+        memory = None if args.max_memory is None else args.max_memory << 20
+        limits = limits_.Limits(args.max_steps, args.timeout, args.max_depth, memory)
+    if args.profile or args.profile_output:
+        import profiler
+        jan = profiler.ProfilingInterpreter(args.main, search_paths, args.parser, limits=limits)
+    else:
+        jan = interpreter.Interpreter(search_paths, args.parser, limits)
+    sampler = writer = counters = None
+    if args.sample:
+        import sampling
+        sampler = sampling.Sampler(jan, args.main, args.sample_interval / 1000, args.sample_mode)
+    if args.trace:
+        import tracing
+        writer = tracing.TraceWriter()
+        jan.add_hook(writer)
+    if args.stats:
+        import stats
+        counters = stats.RuntimeStats()
+        jan.add_hook(counters)
+    try:
+        if args.prelude:
+            import snapshot
+            snapshot.run_prelude(jan, args.prelude, use_cache=not args.no_cache)
+        if sampler is not None:
+            with sampler:
+                jan.execute(program)
+        else:
+            jan.execute(program)
+    finally:
+        for hook in list(jan.hooks):
+            jan.remove_hook(hook)
+        if sampler is not None:
+            sampler.write(args.sample)
+        if writer is not None:
+            writer.write(args.trace)
+        if counters is not None:
+            print(counters.report(), file=sys.stderr)
+        if args.profile_output:
+            jan.dump_stats(args.profile_output)
+        if args.profile:
+            print(jan.report(), file=sys.stderr)
+        if args.heap_report:
+            # taken while jan and its globals are still alive
+            print(heap.report(), file=sys.stderr)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,4 +1,6 @@
-from typing import Callable
+from collections.abc import Callable
+import errors
+import values
 
 def _print(*a):
     print(*a)
@@ -8,9 +10,55 @@ def open_file(path):
     return open(path)
 
 
+def heap_report():
+    import sys
+    import heap
+    print(heap.report(), file=sys.stderr)
+
+
+def _iter(obj):
+    if isinstance(obj, values.Iterator):
+        return obj
+    return values.Iterator(iter(obj))
+
+
+def _next(iterator, default=None):
+    try:
+        return next(iterator)
+    except StopIteration:
+        if default is None:
+            raise errors.JanRuntimeException("next() called on an exhausted iterator") from None
+        return default
+
+
+def _range(start, stop=None, step=None):
+    bounds = [bound for bound in (start, stop, step) if bound is not None]
+    if not all(type(bound) is values.Integer for bound in bounds):
+        raise errors.JanRuntimeException("range() arguments must be integers")
+    bounds = [bound.proxy for bound in bounds]
+    if stop is None:
+        bounds.insert(0, 0)
+    try:
+        return values.Range(*bounds)
+    except ValueError as e:
+        raise errors.JanRuntimeException(f"range(): {e}") from None
+
+
+def _len(obj):
+    try:
+        return values.Integer(len(obj))
+    except (TypeError, NotImplementedError):
+        raise errors.JanRuntimeException(f"{obj!r} has no length") from None
+
+
 FUNCTIONS: dict[str, Callable] = {
     "print": _print,
     "write_file": open_file,
+    "heap_report": heap_report,
+    "iter": _iter,
+    "next": _next,
+    "range": _range,
+    "len": _len,
 }
 
 INVERTED_FUNCTIONS: dict[Callable, str] = {v: k for k, v in FUNCTIONS.items()}
@@ -0,0 +1,197 @@
+"""
+deterministic profiler for jan programs, used by main.py --profile
+
+Time is attributed to jan functions (with cProfile's meaning of self and
+cumulative time and call counts, recursive calls counted once in the
+cumulative time) and to source lines, using the line numbers the front ends
+put on statements. Function statistics can be written in the marshal format
+pstats.Stats reads, so existing pstats tooling works on jan profiles.
+"""
+import io
+import marshal
+import time
+import astree as ast
+import interpreter
+import values
+
+# the key cProfile uses for code that has no source location
+NATIVE_PATH = "~"
+
+
+class FunctionStats:
+    def __init__(self):
+        self.calls = 0
+        self.primitive_calls = 0
+        self.self_time = 0.0
+        self.total_time = 0.0
+        # caller key: [primitive calls, calls, self time, total time]
+        self.callers: dict[tuple, list] = {}
+
+
+class LineStats:
+    def __init__(self):
+        self.hits = 0
+        self.self_time = 0.0
+        self.total_time = 0.0
+
+
+class ProfilingInterpreter(interpreter.Interpreter):
+    def __init__(self, path: str, search_paths=None, parser_name="native", clock=time.perf_counter, limits=None):
+        super().__init__(search_paths, parser_name, limits)
+        self.clock = clock
+        self.path = path
+        self.reset_profile()
+
+    def _copy_state(self, jan: "ProfilingInterpreter"):
+        super()._copy_state(jan)
+        jan.clock = self.clock
+        jan.path = self.path
+        jan.reset_profile()
+
+    def reset_profile(self):
+        self.functions: dict[tuple, FunctionStats] = {}
+        self.lines: dict[tuple[str, int], LineStats] = {}
+        # id of a function body: (function key, path it was defined in)
+        self.definitions: dict[int, tuple[tuple, str]] = {}
+        self.paths = [self.path]
+        self.function_stack: list[list] = []  # [key, time spent in callees]
+        self.line_stack: list[list] = []  # [time spent in nested statements]
+        self.active: dict = {}
+
+    def execute(self, node):
+        line = node.line
+        if line is None:
+            return super().execute(node)
+        key = (self.paths[-1], line)
+        frame = [0.0]
+        self.line_stack.append(frame)
+        depth = self.active.get(key, 0)
+        self.active[key] = depth + 1
+        start = self.clock()
+        try:
+            return super().execute(node)
+        finally:
+            elapsed = self.clock() - start
+            self.line_stack.pop()
+            self.active[key] = depth
+            stats = self.lines.get(key)
+            if stats is None:
+                stats = self.lines[key] = LineStats()
+            stats.hits += 1
+            stats.self_time += elapsed - frame[0]
+            if not depth:
+                stats.total_time += elapsed
+            if self.line_stack:
+                self.line_stack[-1][0] += elapsed
+
+    def execute_program(self, program: ast.Program):
+        return self.profile_call((self.paths[-1], 0, "<module>"), self.paths[-1], super().execute_program, program)
+
+    def load_module(self, module: values.Module):
+        self.paths.append(module.path)
+        try:
+            super().load_module(module)
+        finally:
+            self.paths.pop()
+
+    def execute_function_definition(self, definition: ast.FunctionDefinition):
+        self.define(definition)
+        return super().execute_function_definition(definition)
+
+    def execute_class_definition(self, definition: ast.ClassDefinition):
+        for method in definition.methods:
+            self.define(method, f"{definition.name}.")
+        return super().execute_class_definition(definition)
+
+    def define(self, definition: ast.FunctionDefinition, prefix=""):
+        path = self.paths[-1]
+        key = (path, definition.line or 0, prefix + definition.name)
+        self.definitions[id(definition.body)] = (key, path)
+
+    def call_function(self, fn, args, kwargs):
+        if isinstance(fn, values.NativeFunction):
+            key, path = (NATIVE_PATH, 0, f"<native function {fn.name}>"), self.paths[-1]
+        else:
+            key, path = self.definitions.get(id(fn.body), ((NATIVE_PATH, 0, fn.name), self.paths[-1]))
+        call = super().call_function
+        return self.profile_call(key, path, call, fn, args, kwargs)
+
+    def profile_call(self, key, path, fn, *args):
+        caller = self.function_stack[-1][0] if self.function_stack else None
+        frame = [key, 0.0]
+        self.function_stack.append(frame)
+        self.paths.append(path)
+        depth = self.active.get(key, 0)
+        self.active[key] = depth + 1
+        start = self.clock()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = self.clock() - start
+            self.function_stack.pop()
+            self.paths.pop()
+            self.active[key] = depth
+            self.record_call(key, caller, elapsed, elapsed - frame[1], outermost=not depth)
+            if self.function_stack:
+                self.function_stack[-1][1] += elapsed
+
+    def record_call(self, key, caller, elapsed, self_time, outermost):
+        stats = self.functions.get(key)
+        if stats is None:
+            stats = self.functions[key] = FunctionStats()
+        stats.calls += 1
+        stats.self_time += self_time
+        if outermost:
+            stats.primitive_calls += 1
+            stats.total_time += elapsed
+        if caller is not None:
+            # pstats orders caller entries (calls, primitive calls, ...), the
+            # reverse of the function entries
+            entry = stats.callers.setdefault(caller, [0, 0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += outermost
+            entry[2] += self_time
+            entry[3] += elapsed if outermost else 0.0
+
+    def pstats_dict(self) -> dict:
+        return {
+            key: (
+                s.primitive_calls, s.calls, s.self_time, s.total_time,
+                {caller: tuple(entry) for caller, entry in s.callers.items()},
+            )
+            for key, s in self.functions.items()
+        }
+
+    def dump_stats(self, path: str):
+        """write function statistics readable with pstats.Stats(path)"""
+        with open(path, "wb") as f:
+            marshal.dump(self.pstats_dict(), f)
+
+    def report(self, limit=20) -> str:
+        out = io.StringIO()
+        total = sum(s.total_time for key, s in self.functions.items() if key[2] == "<module>")
+        out.write(f"jan profile, {total:.3f}s total\n\n")
+        out.write(f"{'ncalls':>12} {'tottime':>9} {'cumtime':>9}  function\n")
+        by_cumulative = sorted(self.functions.items(), key=lambda item: item[1].total_time, reverse=True)
+        for (path, line, name), s in by_cumulative[:limit]:
+            calls = str(s.calls) if s.calls == s.primitive_calls else f"{s.calls}/{s.primitive_calls}"
+            location = name if path == NATIVE_PATH else f"{path}:{line}({name})"
+            out.write(f"{calls:>12} {s.self_time:>9.4f} {s.total_time:>9.4f}  {location}\n")
+        out.write(f"\n{'hits':>12} {'tottime':>9} {'cumtime':>9}  line\n")
+        sources: dict[str, list[str]] = {}
+        by_self = sorted(self.lines.items(), key=lambda item: item[1].self_time, reverse=True)
+        for (path, line), s in by_self[:limit]:
+            source = sources.get(path)
+            if source is None:
+                source = sources[path] = read_lines(path)
+            text = source[line - 1].strip() if 0 < line <= len(source) else ""
+            out.write(f"{s.hits:>12} {s.self_time:>9.4f} {s.total_time:>9.4f}  {path}:{line}  {text}\n")
+        return out.getvalue()
+
+
+def read_lines(path: str) -> list[str]:
+    try:
+        with open(path) as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
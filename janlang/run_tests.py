@@ -2,41 +2,166 @@ import os
 import fnmatch
 import os.path
 import argparse
-import interpreter
-import ast_json
-import lexer
-import errors
-import _parser as parser
-import ast_json
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+import interpreter
+import compile_cache
 
-def main():
-    arg_parser = argparse.ArgumentParser(description='Process some integers.')
-    arg_parser.add_argument("-i", type=str)
-    args = arg_parser.parse_args()
-    print(args.i)
-    passed = []
-    parse_errors = []
-    failed = []
-    for root, _, file_names in os.walk('../tests'):
+TESTS_DIR = '../tests'
+
+
+class TestResult:
+    def __init__(self, path, status, wall_time, peak_memory=None, output='', error=''):
+        self.path = path
+        # passed, failed, timeout or crashed
+        self.status = status
+        self.wall_time = wall_time
+        self.peak_memory = peak_memory
+        self.output = output
+        self.error = error
+
+    def to_json(self):
+        return dict(self.__dict__)
+
+
+def find_tests(pattern=None):
+    paths = []
+    for root, dir_names, file_names in os.walk(TESTS_DIR):
+        if compile_cache.CACHE_DIR_NAME in dir_names:
+            dir_names.remove(compile_cache.CACHE_DIR_NAME)
+        dir_names.sort()
         for file_name in sorted(file_names):
             path = os.path.join(root, file_name)
-            if args.i and not fnmatch.fnmatch(path, args.i):
+            if pattern and not fnmatch.fnmatch(path, pattern):
                 continue
-            try:
-                tokenizer = lexer.RuleLexer.from_path(path)
-                tokens = list(tokenizer.tokenize())
-                program = parser.Parser(tokens).parse_root()
-                # print(ast_json.dumps(program))
-                interpreter.Interpreter().execute(program)
-            except Exception as e:
-                failed.append((path, e))
-            else:
-                passed.append(path)
-    for path, e in failed:
-        print(f'Exception in {path}')
-        print("".join(traceback.format_exception(e)))
-    print(f'{len(passed)} tests passed, {len(failed)} tests had errors')
+            paths.append(path)
+    return paths
+
+
+def run_one(path, result_file):
+    """child process entry point, runs a single test and writes its outcome to result_file"""
+    status, error = 'passed', ''
+    try:
+        program = compile_cache.load_program(path)
+        search_paths = [os.path.dirname(path), *interpreter.default_search_paths()]
+        interpreter.Interpreter(search_paths).execute(program)
+    except Exception as e:
+        status, error = 'failed', ''.join(traceback.format_exception(e))
+    sys.stdout.flush()
+    # ru_maxrss is in kilobytes on linux and bytes on macos
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_memory = peak if sys.platform == 'darwin' else peak * 1024
+    with open(result_file, 'w') as f:
+        json.dump({'status': status, 'error': error, 'peak_memory': peak_memory}, f)
+
+
+def run_isolated(path, timeout):
+    fd, result_file = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        return run_child(path, timeout, result_file)
+    finally:
+        os.unlink(result_file)
+
+
+def run_child(path, timeout, result_file):
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run-one', path, '--result-file', result_file],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout, text=True,
+        )
+    except subprocess.TimeoutExpired as e:
+        output = e.stdout.decode(errors='replace') if isinstance(e.stdout, bytes) else e.stdout or ''
+        return TestResult(path, 'timeout', time.perf_counter() - start, output=output,
+                          error=f'Timed out after {timeout}s')
+    wall_time = time.perf_counter() - start
+    try:
+        with open(result_file) as f:
+            outcome = json.load(f)
+    except (OSError, ValueError):
+        return TestResult(path, 'crashed', wall_time, output=proc.stdout,
+                          error=f'Test process exited with code {proc.returncode}')
+    return TestResult(path, outcome['status'], wall_time, outcome['peak_memory'], proc.stdout, outcome['error'])
+
+
+def write_json_report(results, path, wall_time):
+    report = {
+        'wall_time': wall_time,
+        'summary': {status: sum(r.status == status for r in results)
+                    for status in ('passed', 'failed', 'timeout', 'crashed')},
+        'tests': [r.to_json() for r in results],
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=4)
+
+
+def write_junit_report(results, path, wall_time):
+    suite = ElementTree.Element(
+        'testsuite', name='jan', tests=str(len(results)), time=f'{wall_time:.3f}',
+        failures=str(sum(r.status == 'failed' for r in results)),
+        errors=str(sum(r.status in ('timeout', 'crashed') for r in results)),
+    )
+    for r in results:
+        directory, file_name = os.path.split(os.path.relpath(r.path, TESTS_DIR))
+        case = ElementTree.SubElement(
+            suite, 'testcase', classname=directory.replace(os.sep, '.') or 'tests',
+            name=file_name, time=f'{r.wall_time:.3f}',
+        )
+        if r.status == 'failed':
+            ElementTree.SubElement(case, 'failure', message=r.error.strip().splitlines()[-1]).text = r.error
+        elif r.status != 'passed':
+            ElementTree.SubElement(case, 'error', message=r.error).text = r.error
+        if r.output:
+            ElementTree.SubElement(case, 'system-out').text = r.output
+    ElementTree.ElementTree(suite).write(path, encoding='utf-8', xml_declaration=True)
+
+
+def format_memory(size):
+    return '-' if size is None else f'{size / (1 << 20):.1f}MB'
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Run the jan test programs in parallel worker processes')
+    arg_parser.add_argument("-i", type=str, help='only run tests whose path matches this glob')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument('--timeout', type=float, default=10.0, help='seconds before a test is killed')
+    arg_parser.add_argument('--slowest', type=int, default=5, help='number of slowest tests to list')
+    arg_parser.add_argument('--json', help='write a JSON report to this path')
+    arg_parser.add_argument('--junit', help='write a JUnit XML report to this path')
+    arg_parser.add_argument('--run-one', help=argparse.SUPPRESS)
+    arg_parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    if args.run_one:
+        run_one(args.run_one, args.result_file)
+        return
+    print(args.i)
+    paths = find_tests(args.i)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        results = list(pool.map(lambda path: run_isolated(path, args.timeout), paths))
+    wall_time = time.perf_counter() - start
+    failed = [r for r in results if r.status != 'passed']
+    for r in failed:
+        print(f'Exception in {r.path} ({r.status})')
+        print(r.error)
+    if args.slowest:
+        print(f'slowest {min(args.slowest, len(results))} tests:')
+        for r in sorted(results, key=lambda r: r.wall_time, reverse=True)[:args.slowest]:
+            print(f'  {r.wall_time:7.3f}s {format_memory(r.peak_memory):>9}  {r.path}')
+    if args.json:
+        write_json_report(results, args.json, wall_time)
+    if args.junit:
+        write_junit_report(results, args.junit, wall_time)
+    print(f'{len(results) - len(failed)} tests passed, {len(failed)} tests had errors ({wall_time:.2f}s)')
+    sys.exit(1 if failed else 0)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,181 @@
+"""
+sampling profiler for jan programs, used by main.py --sample
+
+A background thread (or a SIGPROF timer) periodically looks at the Python
+stack of the thread running the interpreter and rebuilds the jan call stack
+from it: every values.Function.call frame is a jan function and the innermost
+Interpreter.execute frame running a statement gives its current line. The
+interpreter itself is not instrumented, so the program runs at full speed
+between samples.
+
+Samples are written as collapsed stacks (flamegraph.pl, speedscope, inferno)
+or in speedscope's JSON format.
+"""
+import collections
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import interpreter
+import values
+
+EXECUTE_CODE = interpreter.Interpreter.execute.__code__
+LOAD_MODULE_CODE = interpreter.Interpreter.load_module.__code__
+CALL_CODE = values.Function.call.__code__
+
+
+class Sampler:
+    def __init__(self, jan: interpreter.Interpreter, path: str, interval=0.005, mode="thread"):
+        self.jan = jan
+        self.path = path
+        self.interval = interval
+        self.mode = mode
+        # (name, path, line) frames, outermost first: sample count and the
+        # wall time the samples stand for
+        self.stacks: collections.Counter = collections.Counter()
+        self.times: collections.Counter = collections.Counter()
+        self.duration = 0.0
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._start_time = 0.0
+        self._last_sample = 0.0
+        self._switch_interval = None
+        self._root_environment = jan.environment
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        # taken now rather than in __init__, a prelude replaces the globals in between
+        self._root_environment = self.jan.environment
+        self._thread_id = threading.get_ident()
+        self._start_time = self._last_sample = time.perf_counter()
+        if self.mode == "signal":
+            signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            # the sampler thread can only run when the interpreter thread drops
+            # the GIL, which it otherwise does every 5ms at most
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="jan-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self.mode == "signal":
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+        elif self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            sys.setswitchinterval(self._switch_interval)
+        self.duration += time.perf_counter() - self._start_time
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.sample(frame)
+            del frame
+
+    def _on_signal(self, signum, frame):
+        self.sample(frame)
+
+    def sample(self, frame):
+        now = time.perf_counter()
+        stack = self.jan_stack(frame)
+        if stack:
+            self.stacks[stack] += 1
+            self.times[stack] += now - self._last_sample
+        self._last_sample = now
+
+    def jan_stack(self, frame) -> tuple:
+        """jan frames for the python stack ending at frame, outermost first"""
+        frames = []
+        line = None
+        while frame is not None:
+            code = frame.f_code
+            if code is EXECUTE_CODE:
+                if line is None:
+                    line = frame.f_locals["node"].line
+            elif code is CALL_CODE:
+                fn = frame.f_locals["self"]
+                frames.append((fn.name, self.function_path(fn), line or 0))
+                line = None
+            elif code is LOAD_MODULE_CODE:
+                module = frame.f_locals["module"]
+                frames.append((f"<module {module.name}>", module.path, line or 0))
+                line = None
+            frame = frame.f_back
+        if frames or line is not None:
+            frames.append(("<module>", self.path, line or 0))
+        frames.reverse()
+        return tuple(frames)
+
+    def function_path(self, fn: values.Function) -> str:
+        env = fn.closure
+        while env.parent is not None:
+            env = env.parent
+        if env is self._root_environment:
+            return self.path
+        for module in self.jan.modules.values():
+            if module.environment is env:
+                return module.path
+        return "?"
+
+    def write_collapsed(self, path: str, line_numbers=True):
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                names = [frame_label(frame, line_numbers) for frame in stack]
+                f.write(f"{';'.join(names)} {count}\n")
+
+    def write_speedscope(self, path: str):
+        frame_index: dict[tuple, int] = {}
+        samples = []
+        weights = []
+        for stack, elapsed in sorted(self.times.items()):
+            samples.append([frame_index.setdefault(frame, len(frame_index)) for frame in stack])
+            weights.append(elapsed)
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {
+                "frames": [
+                    {"name": name, "file": file, "line": line}
+                    for name, file, line in frame_index
+                ],
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": os.path.basename(self.path),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "exporter": "janlang sampling profiler",
+        }
+        with open(path, "w") as f:
+            json.dump(document, f)
+
+    def write(self, path: str):
+        if path.endswith(".json"):
+            self.write_speedscope(path)
+        else:
+            self.write_collapsed(path)
+
+
+def frame_label(frame: tuple, line_numbers=True) -> str:
+    name, path, line = frame
+    if not line_numbers:
+        return f"{name} ({os.path.basename(path)})"
+    return f"{name} ({os.path.basename(path)}:{line})"
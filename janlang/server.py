@@ -0,0 +1,104 @@
+"""
+a server keeping jan interpreters warm, so running a script does not pay for
+Python startup, imports and front end setup every time
+
+    python server.py serve [--socket PATH] [--parser lark]
+    python client.py script.jan
+
+Every request runs in a process forked from the server, which already has the
+interpreter imported, the front end initialized and a template interpreter
+built. Scripts cannot affect each other or the server, and whatever they
+allocate goes away with their process.
+"""
+import argparse
+import io
+import os
+import socketserver
+import sys
+import traceback
+import client
+import compile_cache
+import frontend
+import interpreter
+
+
+class FrameWriter(io.RawIOBase):
+    def __init__(self, sock, kind: bytes):
+        self.sock = sock
+        self.kind = kind
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        client.write_frame(self.sock, self.kind, bytes(data))
+        return len(data)
+
+
+def frame_stream(sock, kind: bytes) -> io.TextIOWrapper:
+    """a text stream sending every line as a frame as soon as it is written"""
+    return io.TextIOWrapper(io.BufferedWriter(FrameWriter(sock, kind)), encoding="utf-8", line_buffering=True)
+
+
+class RunHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        kind, payload = client.read_frame(self.request)
+        if kind != client.REQUEST:
+            return
+        stdout, stderr = frame_stream(self.request, client.STDOUT), frame_stream(self.request, client.STDERR)
+        # this is the forked child, so replacing the streams only affects the script
+        sys.stdout, sys.stderr = stdout, stderr
+        try:
+            status = self.server.run_script(*client.decode_request(payload))
+        finally:
+            stdout.flush()
+            stderr.flush()
+            sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        client.write_frame(self.request, client.EXIT, str(status).encode())
+
+
+class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def __init__(self, socket_path: str, parser_name="native"):
+        self.parser_name = parser_name
+        self.template = interpreter.Interpreter([], parser_name)
+        # build the front end (and the lark grammar) before any fork
+        frontend.parse("pass\n", parser_name)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, RunHandler)
+
+    def run_script(self, path: str, cwd: str, janpath: str) -> int:
+        os.chdir(cwd)
+        jan = self.template.clone()
+        jan.search_paths = [os.path.dirname(path), cwd, *(p for p in janpath.split(os.pathsep) if p)]
+        try:
+            jan.execute(compile_cache.load_program(path, self.parser_name))
+        except Exception:
+            traceback.print_exc()
+            return 1
+        return 0
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run jan scripts sent by client.py in warm processes")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="listen for scripts on a unix socket")
+    serve.add_argument("--socket", default=client.default_socket_path(),
+                       help="socket path, JAN_SOCKET or /tmp/jan-<uid>.sock by default")
+    serve.add_argument("--parser", choices=tuple(frontend.PARSERS), default="native")
+    args = arg_parser.parse_args()
+    with Server(args.socket, args.parser) as server:
+        print(f"jan server listening on {args.socket}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+heap snapshots of an interpreter's globals, used by main.py --prelude
+
+A snapshot is the global environment with every value, closure and class
+reachable from it, plus the modules imported so far, written with pickle,
+which keeps shared and cyclic references intact (a function's closure holds
+the function itself). The interpreter, the shared builtins environment and the
+native functions in it are stored by reference and resolved against the
+interpreter restoring the snapshot.
+
+A snapshot records the runtime version and the sources it was built from and
+is only restored while all of them are unchanged. Snapshots sit next to the
+scripts, so like the compile cache, loading one only instantiates classes from
+the runtime modules listed in LOADABLE_MODULES, never arbitrary callables.
+"""
+import hashlib
+import io
+import json
+import os
+import pickle
+import sys
+import compile_cache
+import errors
+import frontend
+import interpreter
+import values
+
+LOADABLE_MODULES = ("astree", "environment", "values")
+RUNTIME_MODULES = ("interpreter", "environment", "native_functions", "generators", "hooks", "limits", "snapshot")
+
+
+def runtime_version() -> str:
+    digest = hashlib.sha256(compile_cache.FRONTEND_VERSION.encode())
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.join(base_dir, f"{name}.py") for name in RUNTIME_MODULES]
+    values_dir = os.path.join(base_dir, "values")
+    paths += sorted(os.path.join(values_dir, name) for name in os.listdir(values_dir) if name.endswith(".py"))
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+RUNTIME_VERSION = runtime_version()
+
+
+class Pickler(pickle.Pickler):
+    def __init__(self, file, jan: interpreter.Interpreter):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.jan = jan
+        self.builtins = interpreter.builtins()
+
+    def persistent_id(self, obj):
+        if obj is self.jan:
+            return ("interpreter",)
+        if obj is self.builtins:
+            return ("builtins",)
+        if isinstance(obj, values.NativeFunction):
+            symbol = self.builtins.values.get(obj.name)
+            if symbol is not None and symbol.value is obj:
+                return ("builtin", obj.name)
+            owner = getattr(obj.fn, "__self__", None)
+            if isinstance(owner, values.BaseValue):
+                # a method exposed by a value, such as list.push
+                return ("method", owner, obj.name)
+        return None
+
+
+class Unpickler(pickle.Unpickler):
+    def __init__(self, file, jan: interpreter.Interpreter):
+        super().__init__(file)
+        self.jan = jan
+
+    def persistent_load(self, pid):
+        kind, *args = pid
+        if kind == "interpreter":
+            return self.jan
+        if kind == "builtins":
+            return interpreter.builtins()
+        if kind == "builtin":
+            return interpreter.builtins().get(args[0]).value
+        if kind == "method":
+            owner, name = args
+            method = getattr(type(owner), name, None)
+            if isinstance(owner, values.BaseValue) and not name.startswith("_") and callable(method):
+                return values.NativeFunction(name, method.__get__(owner))
+        raise pickle.UnpicklingError(f"unknown persistent id {pid!r}")
+
+    def find_class(self, module, name):
+        if module.partition(".")[0] in LOADABLE_MODULES and "." not in name:
+            cls = getattr(sys.modules.get(module), name, None)
+            if isinstance(cls, type) and cls.__module__ == module:
+                return cls
+        raise pickle.UnpicklingError(f"snapshot refers to {module}.{name}, which is not a runtime class")
+
+
+def source_digest(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def dumps(jan: interpreter.Interpreter, sources: list[str] = ()) -> bytes:
+    """the globals and modules of jan, valid while the sources are unchanged"""
+    header = {
+        "version": RUNTIME_VERSION,
+        "sources": {path: source_digest(path) for path in sources},
+    }
+    out = io.BytesIO()
+    # a JSON line rather than pickle, so checking staleness can't run code
+    out.write(json.dumps(header).encode() + b"\n")
+    try:
+        Pickler(out, jan).dump((jan.environment, jan.modules))
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise errors.JanSnapshotError(f"Cannot snapshot globals: {e}") from e
+    except RecursionError:
+        raise errors.JanSnapshotError("Cannot snapshot globals: values are nested too deeply") from None
+    return out.getvalue()
+
+
+def split_header(data: bytes) -> tuple[dict, bytes]:
+    header_line, newline, body = data.partition(b"\n")
+    try:
+        header = json.loads(header_line) if newline else None
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or not isinstance(header.get("sources"), dict):
+        raise errors.JanSnapshotError("Not a jan heap snapshot")
+    return header, body
+
+
+def is_current(data: bytes) -> bool:
+    try:
+        header, _ = split_header(data)
+    except errors.JanSnapshotError:
+        return False
+    if header.get("version") != RUNTIME_VERSION:
+        return False
+    return all(source_digest(path) == digest for path, digest in header["sources"].items())
+
+
+def loads(jan: interpreter.Interpreter, data: bytes):
+    """replace the globals and modules of jan with the snapshot's"""
+    _, body = split_header(data)
+    try:
+        environment, modules = Unpickler(io.BytesIO(body), jan).load()
+    except Exception as e:
+        raise errors.JanSnapshotError(f"Cannot restore snapshot: {e}") from e
+    jan.environment = environment
+    jan.modules.update(modules)
+
+
+def save(jan: interpreter.Interpreter, path: str, sources: list[str] = ()):
+    compile_cache.write_serialized_entry(path, dumps(jan, sources))
+
+
+def load(jan: interpreter.Interpreter, path: str) -> bool:
+    """restore a snapshot if it exists and is current"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return False
+    if not is_current(data):
+        return False
+    try:
+        loads(jan, data)
+    except errors.JanSnapshotError:
+        return False  # corrupt or tampered with, run the prelude again
+    return True
+
+
+def snapshot_path(path: str) -> str:
+    directory, file_name = os.path.split(os.path.abspath(path))
+    # not named like compile cache entries, which would remove it as stale
+    return os.path.join(directory, compile_cache.CACHE_DIR_NAME, f"{file_name}-heap.{RUNTIME_VERSION[:20]}.heap")
+
+
+def run_prelude(jan: interpreter.Interpreter, path: str, use_cache=True) -> bool:
+    """
+    run the program at path in jan's global scope, or restore its globals from
+    the snapshot taken the last time it ran; returns whether it was restored
+    """
+    cached_path = snapshot_path(path)
+    if use_cache and load(jan, cached_path):
+        return True
+    if use_cache:
+        jan.execute(compile_cache.load_program(path, jan.parser_name))
+    else:
+        jan.execute(frontend.parse_path(path, jan.parser_name))
+    if use_cache:
+        sources = [os.path.abspath(path), *(module.path for module in jan.modules.values())]
+        try:
+            save(jan, cached_path, sources)
+        except OSError:
+            pass  # read-only location, run without a snapshot
+        except errors.JanSnapshotError as e:
+            print(f"warning: {e}", file=sys.stderr)
+    return False
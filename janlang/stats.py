@@ -0,0 +1,62 @@
+"""
+runtime counters for jan programs, used by main.py --stats
+
+Counts the executed nodes per astree type, the values created per type, the
+environments created and deep_copy calls, and the Return, Break and Continue
+exceptions raised. Every return, break and continue statement raises exactly
+one of them, so those are counted from the statements executed.
+"""
+import collections
+import io
+import astree as ast
+import hooks
+
+CONTROL_FLOW = {ast.Return: "Return", ast.BreakStatement: "Break", ast.ContinueStatement: "Continue"}
+
+
+class RuntimeStats(hooks.Hooks):
+    def __init__(self):
+        self.nodes: collections.Counter = collections.Counter()
+        self.values: collections.Counter = collections.Counter()
+        self.environments = 0
+        self.deep_copies = 0
+
+    def node(self, node):
+        self.nodes[type(node)] += 1
+
+    def allocation(self, value):
+        self.values[type(value)] += 1
+
+    def environment_created(self, env):
+        self.environments += 1
+
+    def environment_copied(self, env):
+        self.deep_copies += 1
+
+    @property
+    def exceptions(self) -> dict[str, int]:
+        return {name: self.nodes[node_type] for node_type, name in CONTROL_FLOW.items()}
+
+    def as_dict(self) -> dict:
+        return {
+            "nodes": {t.__name__: n for t, n in self.nodes.most_common()},
+            "values": {t.__name__: n for t, n in self.values.most_common()},
+            "environments": self.environments,
+            "deep_copies": self.deep_copies,
+            "exceptions": self.exceptions,
+        }
+
+    def report(self) -> str:
+        out = io.StringIO()
+        counts = self.as_dict()
+        out.write(f"jan runtime stats\n\n{sum(self.nodes.values()):>12}  nodes executed\n")
+        for name, n in counts["nodes"].items():
+            out.write(f"{n:>12}    {name}\n")
+        out.write(f"{sum(self.values.values()):>12}  values created\n")
+        for name, n in counts["values"].items():
+            out.write(f"{n:>12}    {name}\n")
+        out.write(f"{self.environments:>12}  environments created\n")
+        out.write(f"{self.deep_copies:>12}  deep_copy calls\n")
+        for name, n in counts["exceptions"].items():
+            out.write(f"{n:>12}  {name} raised\n")
+        return out.getvalue()
@@ -0,0 +1,68 @@
+import glob
+import io
+import os.path
+import pytest
+import ast_binary
+import ast_json
+import astree as ast
+import frontend
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+PROGRAMS = sorted(glob.glob(os.path.join(ROOT, "tests", "**", "*.jan"), recursive=True))
+
+
+@pytest.mark.parametrize("path", PROGRAMS, ids=os.path.basename)
+def test_round_trip(path):
+    program = frontend.parse_path(path)
+    data = ast_binary.dumps(program)
+    assert ast_json.dumps(ast_binary.loads(data)) == ast_json.dumps(program)
+    assert len(data) < len(ast_json.dumps(program))
+
+
+def test_round_trip_of_field_values():
+    node = ast.Call(ast.Name("f"), [ast.Float(-1.5), ast.Integer(-(2 ** 70))], {"k": (None, True)})
+    loaded = ast_binary.loads(ast_binary.dumps(node))
+    assert loaded.args[0].value == -1.5
+    assert loaded.args[1].value == -(2 ** 70)
+    assert loaded.kwargs == {"k": (None, True)}
+
+
+def test_rejects_foreign_objects_and_corrupt_data():
+    with pytest.raises(ast_binary.FormatError):
+        ast_binary.dumps(ast.List([object()]))
+    data = ast_binary.dumps(frontend.parse("print(1)\n"))
+    with pytest.raises(ast_binary.FormatError):
+        ast_binary.loads(data[:-3])
+    with pytest.raises(ast_binary.FormatError):
+        ast_binary.loads(b"garbage")
+
+
+def test_rejects_truncation_at_every_offset():
+    data = ast_binary.dumps(frontend.parse('var x = 1.5\nprint("text", [x, -2])\n'))
+    for end in range(len(data)):
+        with pytest.raises(ast_binary.FormatError):
+            ast_binary.loads(data[:end])
+
+
+def test_round_trip_of_deep_trees():
+    program = frontend.parse_native("x = " + " + ".join(["1"] * 3000) + "\n")
+    # ast_json.dumps recurses too, iter_json walks with a stack like ast_binary
+    restored = ast_binary.loads(ast_binary.dumps(program))
+    assert "".join(ast_json.iter_json(restored)) == "".join(ast_json.iter_json(program))
+    nested = ast.List([])
+    for _ in range(20_000):
+        nested = ast.List([nested, (1, {"k": -2.5})])
+    restored = ast_binary.loads(ast_binary.dumps(nested))
+    depth = 0
+    while restored.items:
+        assert restored.items[1] == (1, {"k": -2.5})
+        restored = restored.items[0]
+        depth += 1
+    assert depth == 20_000
+
+
+def test_streaming_json_matches_dumps():
+    program = frontend.parse_path(PROGRAMS[0])
+    out = io.StringIO()
+    ast_json.dump(program, out, chunk_size=16)
+    assert out.getvalue() == ast_json.dumps(program)
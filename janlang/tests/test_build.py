@@ -0,0 +1,49 @@
+import ast_json
+import build
+import frontend
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+    return str(path)
+
+
+def test_parallel_build_matches_serial_parse(tmp_path):
+    sources = {f"m{i}.jan": f"var x = {i} + 2 * 3\nprint(x)\n" for i in range(6)}
+    paths = [write(tmp_path / name, text) for name, text in sources.items()]
+    results = build.compile_sources(paths, jobs=2, force=True)
+    assert [result.path for result in results] == paths
+    for result, text in zip(results, sources.values()):
+        assert ast_json.dumps(result.program()) == ast_json.dumps(frontend.parse_native(text))
+
+
+def test_diagnostics_are_sorted_by_path_and_line(tmp_path):
+    paths = [
+        write(tmp_path / "b.jan", "print(1)\nvar = 2\n"),
+        write(tmp_path / "a.jan", "def f(:\n    pass\n"),
+        write(tmp_path / "ok.jan", "print(1)\n"),
+    ]
+    results = build.compile_sources(paths, jobs=2, force=True)
+    diagnostics = build.merge_diagnostics(results)
+    assert [(d.path, d.line) for d in diagnostics] == [(paths[1], 1), (paths[0], 2)]
+
+
+def test_serialization_errors_are_diagnostics(tmp_path, monkeypatch):
+    def too_deep(program):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr(build.ast_binary, "dumps", too_deep)
+    paths = [write(tmp_path / "deep.jan", "print(1)\n"), write(tmp_path / "other.jan", "print(2)\n")]
+    results = build.compile_sources(paths, jobs=1, force=True)
+    diagnostics = build.merge_diagnostics(results)
+    assert [(d.path, d.message) for d in diagnostics] == [(path, "maximum recursion depth exceeded") for path in paths]
+
+
+def test_find_sources_skips_cache_directories(tmp_path):
+    (tmp_path / "pkg" / "__jancache__").mkdir(parents=True)
+    write(tmp_path / "pkg" / "__jancache__" / "stale.jan", "")
+    main = write(tmp_path / "main.jan", "")
+    lib = write(tmp_path / "pkg" / "lib.jan", "")
+    write(tmp_path / "notes.txt", "")
+    assert build.find_sources([str(tmp_path)]) == [main, lib]
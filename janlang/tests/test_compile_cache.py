@@ -0,0 +1,71 @@
+import os
+import ast_json
+import compile_cache
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def cache_entries(tmp_path):
+    return os.listdir(tmp_path / compile_cache.CACHE_DIR_NAME)
+
+
+def test_second_load_is_served_from_cache(tmp_path, monkeypatch):
+    source = tmp_path / "prog.jan"
+    write(source, "var x = 1 + 2\nprint(x)\n")
+    first = compile_cache.load_program(str(source))
+    assert len(cache_entries(tmp_path)) == 1
+    monkeypatch.setattr(compile_cache.frontend, "parse", None)
+    second = compile_cache.load_program(str(source))
+    assert ast_json.dumps(first) == ast_json.dumps(second)
+
+
+def test_editing_the_source_replaces_the_entry(tmp_path):
+    source = tmp_path / "prog.jan"
+    write(source, "print(1)\n")
+    compile_cache.load_program(str(source))
+    [old_entry] = cache_entries(tmp_path)
+    write(source, "print(2)\n")
+    program = compile_cache.load_program(str(source))
+    assert program.main.body[0].args[0].value == 2
+    assert cache_entries(tmp_path) != [old_entry]
+    assert len(cache_entries(tmp_path)) == 1
+
+
+def test_corrupt_entry_is_reparsed(tmp_path):
+    source = tmp_path / "prog.jan"
+    write(source, "print(1)\n")
+    compile_cache.load_program(str(source))
+    [entry] = cache_entries(tmp_path)
+    write(tmp_path / compile_cache.CACHE_DIR_NAME / entry, "garbage")
+    program = compile_cache.load_program(str(source))
+    assert program.main.body[0].args[0].value == 1
+
+
+def test_parsers_keep_their_own_entries(tmp_path, monkeypatch):
+    source = tmp_path / "prog.jan"
+    write(source, "print(1)\n")
+    compile_cache.load_program(str(source), "native")
+    compile_cache.load_program(str(source), "lark")
+    assert len(cache_entries(tmp_path)) == 2
+    monkeypatch.setattr(compile_cache.frontend, "parse", None)
+    compile_cache.load_program(str(source), "native")
+    compile_cache.load_program(str(source), "lark")
+    # a changed source still replaces the entry of its parser only
+    monkeypatch.undo()
+    write(source, "print(2)\n")
+    compile_cache.load_program(str(source), "native")
+    assert sorted(name.split(".")[2] for name in cache_entries(tmp_path)) == ["lark", "native"]
+
+
+def test_unserializable_program_runs_uncached(tmp_path, monkeypatch):
+    def too_deep(program):
+        raise RecursionError("maximum recursion depth exceeded")
+
+    monkeypatch.setattr(compile_cache.ast_binary, "dumps", too_deep)
+    source = tmp_path / "prog.jan"
+    write(source, "print(1)\n")
+    program = compile_cache.load_program(str(source))
+    assert program.main.body[0].args[0].value == 1
@@ -0,0 +1,57 @@
+import pytest
+import frontend
+import interpreter
+import limits
+import stats
+
+
+def test_clones_have_isolated_globals(capsys):
+    template = interpreter.Interpreter([])
+    program = frontend.parse_native("var x = 1\nprint(x)\n")
+    first, second = template.clone(), template.clone()
+    first.execute(program)
+    # the same parsed program runs again in a fresh global scope
+    second.execute(program)
+    assert capsys.readouterr().out == "1\n1\n"
+    assert "x" not in template.environment.values
+    assert first.environment is not second.environment
+
+
+def test_builtins_are_shared_but_not_assignable(capsys):
+    jan = interpreter.Interpreter([])
+    assert jan.environment.get("print") is interpreter.builtins().get("print")
+    with pytest.raises(RuntimeError, match="Cannot reassign builtin print"):
+        jan.execute(frontend.parse_native("print = 1\n"))
+    # a global of the same name shadows the builtin in this interpreter only
+    jan.clone().execute(frontend.parse_native("def print(x):\n    return x\n\nprint(1)\n"))
+    jan.execute(frontend.parse_native("print(2)\n"))
+    assert capsys.readouterr().out == "2\n"
+
+
+def test_clone_shares_settings_and_parsed_modules(tmp_path, capsys):
+    (tmp_path / "shapes.jan").write_text("var sides = 4\n")
+    template = interpreter.Interpreter([str(tmp_path)], limits=limits.Limits(steps=100))
+    template.add_hook(stats.RuntimeStats())
+    program = frontend.parse_native("import shapes\nprint(shapes.sides)\n")
+    first = template.clone()
+    first.execute(program)
+    second = template.clone()
+    assert second.programs is template.programs and len(template.programs) == 1
+    assert second.limits is not template.limits and second.limits.steps == 100
+    assert second.hooks == [] and "execute" not in vars(second)
+    second.execute(program)
+    assert capsys.readouterr().out.splitlines().count("4") == 2
+    assert first.modules["shapes"] is not second.modules["shapes"]
+    template.remove_hook(template.hooks[0])
+
+
+def test_subclasses_are_cloned_with_their_own_state(tmp_path, capsys):
+    import profiler
+
+    path = str(tmp_path / "prog.jan")
+    template = profiler.ProfilingInterpreter(path, [])
+    clone = template.clone()
+    assert type(clone) is profiler.ProfilingInterpreter
+    clone.execute(frontend.parse_native("def f():\n    return 1\n\nf()\n"))
+    assert clone.functions[(path, 1, "f")].calls == 1
+    assert template.functions == {} and clone.paths == [path]
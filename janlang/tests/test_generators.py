@@ -0,0 +1,101 @@
+import pytest
+import errors
+import frontend
+import generators
+import interpreter
+import values
+
+COUNT = """\
+def count(n):
+    var mut i = 0
+    while i < n:
+        yield i
+        i = i + 1
+"""
+
+
+def run(text, parser_name="native"):
+    jan = interpreter.Interpreter([], parser_name)
+    jan.execute(frontend.parse(text, parser_name))
+    return jan
+
+
+@pytest.mark.parametrize("parser_name", ["native", "lark"])
+def test_generator(parser_name, capsys):
+    run(COUNT + "for var x in count(3):\n    print(x)\n", parser_name)
+    assert capsys.readouterr().out.split() == ["0", "1", "2"]
+
+
+def test_calling_returns_generator_without_running_body(capsys):
+    jan = run("def g():\n    print(\"started\")\n    yield 1\n\nvar gen = g()\n")
+    assert isinstance(jan.environment.get("gen").value, values.Generator)
+    assert capsys.readouterr().out == ""
+
+
+def test_generator_is_lazy(capsys):
+    # would never finish if the generator ran ahead of the loop
+    run(COUNT + "for var x in count(1000000000):\n    if x == 2:\n        break\n    print(x)\n")
+    assert capsys.readouterr().out.split() == ["0", "1"]
+
+
+def test_resumes_after_break(capsys):
+    run(COUNT + """\
+var g = count(5)
+for var x in g:
+    if x == 1:
+        break
+print(next(g))
+""")
+    assert capsys.readouterr().out.split() == ["2"]
+
+
+def test_return_ends_generator(capsys):
+    run("""\
+def small(items):
+    for var item in items:
+        if item > 6:
+            return
+        if item > 1:
+            yield item
+        else:
+            continue
+
+for var x in small([1, 2, 7, 3]):
+    print(x)
+""")
+    assert capsys.readouterr().out.split() == ["2"]
+
+
+def test_generator_scope(capsys):
+    # the loop variable stays bound while suspended, and the caller's scope is untouched
+    run(COUNT + """\
+def pairs(n):
+    for var x in count(n):
+        var y = x + 10
+        yield y
+
+var x = "outer"
+for var p in pairs(2):
+    assert x == "outer"
+    print(p)
+""")
+    assert capsys.readouterr().out.split() == ["10", "11"]
+
+
+def test_yield_outside_function():
+    with pytest.raises(errors.JanRuntimeException, match="yield outside"):
+        run("yield 1\n")
+
+
+def test_iter_and_next(capsys):
+    run("var it = iter([1, 2])\nprint(next(it))\nprint(next(it))\nprint(next(it, 0))\n")
+    assert capsys.readouterr().out.split() == ["1", "2", "0"]
+    with pytest.raises(errors.JanRuntimeException, match="exhausted"):
+        run("next(iter([]))\n")
+
+
+def test_contains_yield():
+    program = frontend.parse_native(COUNT + "def f():\n    def inner():\n        yield 1\n    return inner\n")
+    count, f = program.main.body
+    assert generators.contains_yield(count.body)
+    assert not generators.contains_yield(f.body)
@@ -0,0 +1,33 @@
+import os
+import grammar_cache
+import lark_parser
+
+GRAMMAR = """
+    start: WORD+
+    %import common.WORD
+    %ignore " "
+"""
+
+
+def test_lalr_parser_is_loaded_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(grammar_cache, "CACHE_DIR", str(tmp_path))
+    built = grammar_cache.load_lark(GRAMMAR, parser="lalr")
+    [cache_file] = os.listdir(tmp_path)
+    loaded = grammar_cache.load_lark(GRAMMAR, parser="lalr")
+    assert os.listdir(tmp_path) == [cache_file]
+    assert loaded.parse("hello world") == built.parse("hello world")
+
+
+def test_earley_parser_is_loaded_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(grammar_cache, "CACHE_DIR", str(tmp_path))
+    options = dict(start="utterance", maybe_placeholders=True, ambiguity="explicit")
+    built = grammar_cache.load_lark(lark_parser.osspeak_grammar, **options)
+    loaded = grammar_cache.load_lark(lark_parser.osspeak_grammar, **options)
+    text = "hello (world | there) [again]"
+    assert loaded.parse(text) == built.parse(text)
+
+
+def test_cache_key_changes_with_grammar_and_options():
+    path = grammar_cache.cache_path(GRAMMAR, {"parser": "lalr"})
+    assert path != grammar_cache.cache_path(GRAMMAR + "\n", {"parser": "lalr"})
+    assert path != grammar_cache.cache_path(GRAMMAR, {"parser": "earley"})
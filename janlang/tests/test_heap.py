@@ -0,0 +1,37 @@
+import frontend
+import heap
+import interpreter
+import values
+
+PROGRAM = """\
+def make_adder(n):
+    var big = [1, 2, 3]
+    def add(x):
+        return x + n
+    return add
+
+var adders = [make_adder(1), make_adder(2)]
+"""
+
+
+def test_snapshot_counts_live_values_and_closures():
+    jan = interpreter.Interpreter()
+    jan.execute(frontend.parse_native(PROGRAM))
+    report = heap.snapshot()
+    assert report.types[values.List].count >= 3
+    assert report.types[values.List].size > 0
+    adders = [c for c in report.closures if c.names == ["add"]]
+    assert len(adders) >= 2
+    # the call scope holding n, big and add is kept alive by each closure
+    assert all((c.environments, c.symbols) == (1, 3) for c in adders)
+    assert report.environments >= 2
+    assert "closure of" in report.format()
+    del jan
+
+
+def test_heap_report_native(capsys):
+    jan = interpreter.Interpreter()
+    jan.execute(frontend.parse_native(PROGRAM + "heap_report()\n"))
+    err = capsys.readouterr().err
+    assert err.startswith("jan heap,")
+    assert "List" in err
@@ -0,0 +1,106 @@
+import json
+import environment
+import frontend
+import hooks
+import interpreter
+import tracing
+import values
+
+PROGRAM = """\
+def double(x):
+    return x * 2
+
+var y = double(3)
+print(y)
+"""
+
+
+class Recorder(hooks.Hooks):
+    def __init__(self):
+        self.events = []
+
+    def function_enter(self, fn, args, kwargs):
+        self.events.append(("enter", fn.name))
+
+    def function_exit(self, fn, result):
+        self.events.append(("exit", fn.name, result.proxy if result is not None else None))
+
+    def statement_enter(self, node):
+        self.events.append(("statement", node.line))
+
+
+class Counter(hooks.Hooks):
+    def __init__(self):
+        self.values = []
+        self.environments = 0
+
+    def allocation(self, value):
+        self.values.append(type(value))
+
+    def environment_created(self, env):
+        self.environments += 1
+
+
+def run(hook):
+    jan = interpreter.Interpreter()
+    jan.add_hook(hook)
+    try:
+        jan.execute(frontend.parse_native(PROGRAM))
+    finally:
+        jan.remove_hook(hook)
+    return jan
+
+
+def test_call_and_statement_events(capsys):
+    recorder = Recorder()
+    run(recorder)
+    assert recorder.events == [
+        ("statement", 1),
+        ("statement", 4),
+        ("statement", 4),
+        ("enter", "double"),
+        ("statement", 2),
+        ("exit", "double", 6),
+        ("statement", 5),
+        ("enter", "print"),
+        ("exit", "print", None),
+    ]
+
+
+def test_allocation_and_environment_events(capsys):
+    counter = Counter()
+    run(counter)
+    assert values.Integer in counter.values
+    assert counter.environments > 0
+    # nothing is reported once the hook is removed
+    seen = len(counter.values)
+    values.Integer(1)
+    environment.Environment(None)
+    assert len(counter.values) == seen
+
+
+def test_no_instrumentation_without_hooks(capsys):
+    jan = run(Recorder())
+    run(Counter())
+    assert "execute" not in vars(jan) and "call_function" not in vars(jan)
+    assert vars(values.BaseValue)["__init__"] is hooks._originals["allocation"]
+    assert vars(environment.Environment)["__init__"] is hooks._originals["environment_created"]
+
+
+def test_only_overridden_events_are_instrumented():
+    jan = interpreter.Interpreter()
+    jan.add_hook(Counter())
+    assert "execute" not in vars(jan) and "call_function" not in vars(jan)
+    jan.remove_hook(jan.hooks[0])
+
+
+def test_chrome_trace(tmp_path, capsys):
+    writer = tracing.TraceWriter()
+    run(writer)
+    writer.write(str(tmp_path / "trace.json"))
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    durations = [e for e in events if e["ph"] in "BE"]
+    assert sum(e["ph"] == "B" for e in durations) == sum(e["ph"] == "E" for e in durations)
+    assert [e["name"] for e in durations if e["cat"] == "function"] == ["double", "double"]
+    assert [e["ts"] for e in events] == sorted(e["ts"] for e in events)
+    assert events[-1]["ph"] == "C" and events[-1]["args"]["values"] > 0
@@ -0,0 +1,113 @@
+import random
+import pytest
+import _parser as parser
+import ast_json
+import frontend
+import incremental
+
+SOURCE = """\
+var total = 0
+
+def add(a, b):
+    return a + b
+
+class Point:
+    init(x):
+        print(x)
+
+if total == 0:
+    total = add(total, 1)
+else:
+    total = 2
+
+for x in [1, 2, 3]:
+    total = total + x
+print(total)
+"""
+
+
+def assert_matches_full_parse(doc):
+    assert ast_json.dumps(doc.program) == ast_json.dumps(frontend.parse_native(doc.text))
+
+
+def test_initial_parse_matches_full_parse():
+    assert_matches_full_parse(incremental.IncrementalDocument(SOURCE))
+
+
+def test_edit_reparses_only_the_enclosing_statement():
+    doc = incremental.IncrementalDocument(SOURCE)
+    function_def, class_def = doc.program.main.body[2:4]
+    doc.edit((10, 12), (10, 25), "add(total, 5)")
+    assert doc.reparsed_chunks == 1
+    assert doc.program.main.body[2] is function_def
+    assert doc.program.main.body[3] is class_def
+    assert_matches_full_parse(doc)
+
+
+def test_indenting_a_statement_joins_the_previous_block():
+    doc = incremental.IncrementalDocument(SOURCE)
+    doc.replace_lines(16, 17, ["    print(total)"])
+    assert_matches_full_parse(doc)
+    assert len(doc.program.main.body) == 6
+
+
+def test_inserting_and_deleting_lines():
+    doc = incremental.IncrementalDocument(SOURCE)
+    doc.replace_lines(1, 1, ["var y = 2", "def f():", "    return y"])
+    assert_matches_full_parse(doc)
+    doc.replace_lines(0, 4, [])
+    assert_matches_full_parse(doc)
+
+
+def test_identical_chunks_are_reused_once():
+    doc = incremental.IncrementalDocument("print(1)\nprint(1)\nx\n")
+    doc.replace_lines(0, 2, ["print(1)", "print(1)"])
+    body = doc.program.main.body
+    assert body[0] is not body[1]
+    assert_matches_full_parse(doc)
+
+
+def test_inserting_lines_defers_shifting_later_chunks():
+    doc = incremental.IncrementalDocument(SOURCE)
+    last = doc.program.main.body[-1]
+    doc.replace_lines(0, 0, ["", ""])
+    assert last.line == 17
+    assert doc.program.main.body[-1] is last and last.line == 19
+    assert_matches_full_parse(doc)
+
+
+def test_syntax_errors_recover_after_the_fix():
+    doc = incremental.IncrementalDocument(SOURCE)
+    doc.edit((0, 12), (0, 13), "(")
+    # reported when the program is read, by the full parse of the broken text
+    with pytest.raises(parser.HardParseError):
+        doc.program
+    doc.edit((0, 12), (0, 13), "1")
+    assert_matches_full_parse(doc)
+
+
+def test_random_line_edits_match_full_parse():
+    rng = random.Random(7)
+    pieces = [
+        ["var a = 1"],
+        ["def g(n):", "    if n:", "        return n", "    else:", "        return 0"],
+        ["print(g(3))"],
+        ["    pass"],
+        ["else:", "    pass"],
+        [""],
+    ]
+    doc = incremental.IncrementalDocument(SOURCE)
+    for _ in range(200):
+        start = rng.randrange(len(doc.lines) + 1)
+        end = min(len(doc.lines), start + rng.randrange(3))
+        lines = rng.choice(pieces)
+        try:
+            doc.replace_lines(start, end, lines)
+            incremental_result = ast_json.dumps(doc.program)
+        except Exception as e:
+            incremental_result = type(e)
+        try:
+            full_result = ast_json.dumps(frontend.parse_native(doc.text))
+        except Exception as e:
+            full_result = type(e)
+        assert incremental_result == full_result
@@ -0,0 +1,41 @@
+import glob
+import os.path
+import pytest
+import ast_json
+import frontend
+import _parser as parser
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+PROGRAMS = sorted(
+    glob.glob(os.path.join(ROOT, "tests", "**", "*.jan"), recursive=True)
+    + glob.glob(os.path.join(ROOT, "examples", "*.jan"))
+)
+
+
+@pytest.mark.parametrize("path", PROGRAMS, ids=os.path.basename)
+def test_lark_matches_native_parser(path):
+    with open(path) as f:
+        text = f.read()
+    try:
+        expected = ast_json.dumps(frontend.parse_native(text))
+    except parser.HardParseError:
+        with pytest.raises(parser.HardParseError):
+            frontend.parse_lark(text)
+        return
+    assert ast_json.dumps(frontend.parse_lark(text)) == expected
+
+
+def test_lark_operator_precedence():
+    text = "x = not a or -2 ** 3 * 4 < 5 and b\n"
+    assert ast_json.dumps(frontend.parse_lark(text)) == ast_json.dumps(
+        frontend.parse_native(text)
+    )
+
+
+def test_lark_statement_lines_with_contextual_lexer():
+    # mut is a keyword only after var, the contextual lexer reads it as a name here
+    text = "\n\ndef f(mut):\n    if mut:\n        return mut\n    else:\n        pass\n\nf(1)\n"
+    program = frontend.parse_lark(text)
+    function_def, call = program.main.body
+    assert (function_def.line, call.line) == (3, 9)
+    assert function_def.body.statements[0].body.statements[0].line == 5
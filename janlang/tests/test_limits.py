@@ -0,0 +1,78 @@
+import time
+import tracemalloc
+import pytest
+import errors
+import frontend
+import interpreter
+import limits
+
+RECURSE = """\
+def f(n):
+    return f(n + 1)
+
+f(0)
+"""
+
+
+def run(text, **kwargs):
+    jan = interpreter.Interpreter(limits=limits.Limits(**kwargs))
+    jan.execute(frontend.parse_native(text))
+    return jan
+
+
+def test_step_limit():
+    with pytest.raises(errors.JanResourceLimitError, match="step limit of 2500"):
+        run("while true:\n    pass\n", steps=2500, check_interval=100)
+
+
+def test_steps_within_limit(capsys):
+    # three iterations and three calls
+    run("for var x in [1, 2, 3]:\n    print(x)\n", steps=6)
+    assert capsys.readouterr().out.split() == ["1", "2", "3"]
+    with pytest.raises(errors.JanResourceLimitError):
+        run("for var x in [1, 2, 3]:\n    print(x)\n", steps=5)
+
+
+def test_deadline():
+    start = time.monotonic()
+    with pytest.raises(errors.JanResourceLimitError, match="time limit"):
+        run("while true:\n    pass\n", seconds=0.05)
+    assert time.monotonic() - start < 1
+
+
+def test_call_depth():
+    with pytest.raises(errors.JanResourceLimitError, match="call depth of 30"):
+        run(RECURSE, depth=30)
+
+
+def test_python_recursion_is_a_jan_error():
+    with pytest.raises(errors.JanResourceLimitError, match="recursion depth"):
+        interpreter.Interpreter().execute(frontend.parse_native(RECURSE))
+
+
+def test_memory_limit(capsys):
+    text = 'var l = [1]\nwhile true:\n    l.push("some text")\n'
+    tracemalloc.start()
+    try:
+        with pytest.raises(errors.JanResourceLimitError, match="memory limit"):
+            run(text, memory=1_000_000, check_interval=100)
+    finally:
+        tracemalloc.stop()
+
+
+def test_unlimited_interpreter_counts_nothing(capsys):
+    jan = interpreter.Interpreter()
+    jan.execute(frontend.parse_native("for var x in [1, 2, 3]:\n    print(x)\n"))
+    assert jan.limits is None and jan.depth == 0
+
+
+def test_limits_apply_without_a_program_node():
+    # embedders may execute a module or a single statement directly
+    module = frontend.parse_native("while true:\n    pass\n").main
+    jan = interpreter.Interpreter(limits=limits.Limits(steps=500, check_interval=100))
+    with pytest.raises(errors.JanResourceLimitError, match="step limit of 500"):
+        jan.execute(module)
+    jan = interpreter.Interpreter(limits=limits.Limits(depth=30))
+    jan.execute(frontend.parse_native(RECURSE).main.body[0])
+    with pytest.raises(errors.JanResourceLimitError, match="call depth of 30"):
+        jan.execute(frontend.parse_native("f(0)\n").main.body[0])
@@ -0,0 +1,54 @@
+import pytest
+import errors
+import frontend
+import interpreter
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def run(tmp_path, source):
+    jan = interpreter.Interpreter([str(tmp_path)])
+    jan.execute(frontend.parse_native(source))
+    return jan
+
+
+def test_module_is_loaded_on_first_attribute_access(tmp_path):
+    write(tmp_path / "lib.jan", "var answer = 42\n")
+    jan = run(tmp_path, "import lib\n")
+    module = jan.modules["lib"]
+    assert not module.is_loaded
+    assert module.getattr("answer").proxy == 42
+    assert module.is_loaded
+
+
+def test_modules_are_shared_through_the_registry(tmp_path):
+    write(tmp_path / "lib.jan", "var answer = 42\n")
+    jan = run(tmp_path, "import lib\ndef f():\n    import lib\n    return lib\nvar a = f()\n")
+    assert list(jan.modules) == ["lib"]
+    assert jan.environment.get("a").value is jan.environment.get("lib").value
+
+
+def test_importing_twice_in_one_scope(tmp_path):
+    write(tmp_path / "lib.jan", "var answer = 42\n")
+    jan = run(tmp_path, "import lib\nimport lib\nassert lib.answer == 42\n")
+    assert list(jan.modules) == ["lib"]
+    # a name bound to something else still can't be redeclared by an import
+    with pytest.raises(RuntimeError, match="already declared"):
+        run(tmp_path, "var lib = 1\nimport lib\n")
+
+
+def test_search_paths_are_tried_in_order(tmp_path):
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second").mkdir()
+    write(tmp_path / "second" / "lib.jan", "var where = 2\n")
+    jan = interpreter.Interpreter([str(tmp_path / "first"), str(tmp_path / "second")])
+    jan.execute(frontend.parse_native("import lib\nassert lib.where == 2\n"))
+    assert jan.modules["lib"].path == str(tmp_path / "second" / "lib.jan")
+
+
+def test_missing_module(tmp_path):
+    with pytest.raises(errors.JanImportError):
+        run(tmp_path, "import nowhere\n")
@@ -0,0 +1,59 @@
+import json
+import lexer
+import _parser as parser
+import ast_json
+
+
+def parse_expression_json(text: str):
+    tokens = list(lexer.RuleLexer(text).tokenize())
+    program = parser.Parser(tokens).parse_root()
+    [expr] = program.main.body
+    return json.loads(ast_json.dumps(expr))
+
+
+def test_multiplicative_binds_tighter_than_additive():
+    assert parse_expression_json("1 + 2 * 3") == parse_expression_json("1 + (2 * 3)")
+
+
+def test_additive_is_left_associative():
+    assert parse_expression_json("1 - 2 - 3") == parse_expression_json("(1 - 2) - 3")
+
+
+def test_exponent_is_right_associative_and_binds_tighter_than_unary():
+    assert parse_expression_json("2 ** 3 ** 2") == parse_expression_json("2 ** (3 ** 2)")
+    assert parse_expression_json("-2 ** 2") == parse_expression_json("-(2 ** 2)")
+
+
+def test_comparison_chain():
+    expr = parse_expression_json("1 < 2 <= 3")
+    assert expr["_type"] == "Compare"
+    assert [op["_type"] for op in expr["ops"]] == ["Lt", "LtE"]
+    assert len(expr["comparators"]) == 2
+
+
+def test_boolean_operators():
+    assert parse_expression_json("a or b and c == d") == parse_expression_json(
+        "a or (b and (c == d))"
+    )
+    assert parse_expression_json("not a == b")["_type"] == "Compare"
+
+
+def test_memoized_parse_matches_plain_parse():
+    text = "var mut x = [1, 2]\nx[0] = f(a)(b).c + (1 * 2)\nprint(x)\n"
+    plain = parser.Parser(list(lexer.RuleLexer(text).tokenize())).parse_root()
+    memo_parser = parser.Parser(list(lexer.RuleLexer(text).tokenize()), memoize=True)
+    memoized = memo_parser.parse_root()
+    assert ast_json.dumps(plain) == ast_json.dumps(memoized)
+    assert memo_parser.memo_stats.hits > 0
+    assert memo_parser.memo_stats.misses == len(memo_parser.memo)
+
+
+def test_statements_carry_their_source_line():
+    text = "var x = 1\n\nclass A:\n    m():\n        pass\nif x:\n    print(x)\nelse:\n    print(2)\n"
+    program = parser.Parser(list(lexer.RuleLexer(text).tokenize())).parse_root()
+    decl, assign, cls, if_stmt = program.main.body
+    assert (decl.line, assign.line, cls.line, if_stmt.line) == (1, 1, 3, 6)
+    assert cls.methods[0].line == 4
+    assert if_stmt.body.statements[0].line == 7
+    assert if_stmt.else_body.statements[0].line == 9
+    assert if_stmt.test.line is None
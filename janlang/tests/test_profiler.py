@@ -0,0 +1,51 @@
+import io
+import pstats
+import frontend
+import profiler
+
+FIB = """\
+def fib(n):
+    if n <= 1:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+print(fib(6))
+"""
+
+
+def profile(tmp_path, text):
+    path = tmp_path / "prog.jan"
+    path.write_text(text)
+    jan = profiler.ProfilingInterpreter(str(path), [str(tmp_path)])
+    jan.execute(frontend.parse_native(text))
+    return jan, str(path)
+
+
+def test_function_calls_and_recursion(tmp_path, capsys):
+    jan, path = profile(tmp_path, FIB)
+    fib = jan.functions[(path, 1, "fib")]
+    assert (fib.calls, fib.primitive_calls) == (25, 1)
+    assert fib.self_time <= fib.total_time
+    module = jan.functions[(path, 0, "<module>")]
+    assert fib.total_time <= module.total_time
+    assert fib.callers[(path, 0, "<module>")][:2] == [1, 1]
+    assert fib.callers[(path, 1, "fib")][:2] == [24, 0]
+
+
+def test_line_hits(tmp_path, capsys):
+    jan, path = profile(tmp_path, FIB)
+    assert jan.lines[(path, 2)].hits == 25
+    assert jan.lines[(path, 4)].hits == 12
+    assert jan.lines[(path, 6)].hits == 1
+    assert "return fib(n - 1) + fib(n - 2)" in jan.report()
+
+
+def test_pstats_output(tmp_path, capsys):
+    jan, path = profile(tmp_path, FIB)
+    jan.dump_stats(str(tmp_path / "out.prof"))
+    stats = pstats.Stats(str(tmp_path / "out.prof"))
+    assert stats.total_calls == 27
+    assert (path, 1, "fib") in stats.stats
+    out = io.StringIO()
+    pstats.Stats(str(tmp_path / "out.prof"), stream=out).print_callers("fib")
+    assert "24/0" in out.getvalue()
@@ -0,0 +1,83 @@
+import pytest
+import errors
+import frontend
+import interpreter
+import stats
+import values
+
+
+def run(text):
+    jan = interpreter.Interpreter()
+    jan.execute(frontend.parse_native(text))
+    return jan
+
+
+def test_range_is_lazy():
+    r = run("var r = range(1000000000000)\n").environment.get("r").value
+    assert isinstance(r, values.Range)
+    assert len(r) == 1000000000000
+    assert r[values.Integer(-1)].proxy == 999999999999
+
+
+@pytest.mark.parametrize("args, expected", [
+    ("5", [0, 1, 2, 3, 4]),
+    ("2, 5", [2, 3, 4]),
+    ("10, 0, -4", [10, 6, 2]),
+    ("3, 3", []),
+])
+def test_range_loop(args, expected, capsys):
+    run(f"for var i in range({args}):\n    print(i)\n")
+    assert capsys.readouterr().out.split() == [str(i) for i in expected]
+
+
+def test_range_loop_break_and_continue(capsys):
+    run("""\
+for var i in range(10):
+    if i == 1:
+        continue
+    if i == 4:
+        break
+    print(i)
+""")
+    assert capsys.readouterr().out.split() == ["0", "2", "3"]
+
+
+def test_range_loop_assigns_existing_variable(capsys):
+    run("var mut i = 0\nfor i in range(3):\n    pass\nprint(i)\n")
+    assert capsys.readouterr().out.split() == ["2"]
+
+
+def test_range_loop_closures_keep_their_iteration(capsys):
+    run("""\
+var fs = []
+for var i in range(3):
+    var j = i * 10
+    def f():
+        return i + j
+    fs.push(f)
+print(fs[0]())
+print(fs[2]())
+""")
+    assert capsys.readouterr().out.split() == ["0", "22"]
+
+
+def test_range_loop_copies_scopes_once():
+    runtime_stats = stats.RuntimeStats()
+    jan = interpreter.Interpreter()
+    jan.add_hook(runtime_stats)
+    jan.execute(frontend.parse_native("for var i in range(100):\n    pass\n"))
+    assert runtime_stats.deep_copies == 1
+
+
+def test_range_errors():
+    with pytest.raises(errors.JanRuntimeException, match="must be integers"):
+        run("range(1.5)\n")
+    with pytest.raises(errors.JanRuntimeException, match="must not be zero"):
+        run("range(1, 2, 0)\n")
+
+
+def test_len(capsys):
+    run('print(len([1, 2]))\nprint(len("abc"))\nvar d = {}\nd["a"] = 1\nprint(len(d))\nprint(len(range(0, 10, 3)))\n')
+    assert capsys.readouterr().out.split() == ["2", "3", "1", "4"]
+    with pytest.raises(errors.JanRuntimeException, match="has no length"):
+        run("len(1)\n")
@@ -0,0 +1,83 @@
+import json
+import sys
+import frontend
+import sampling
+import snapshot
+import interpreter
+import values
+
+FIB = """\
+def fib(n):
+    if n <= 1:
+        probe()
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+def work():
+    return fib(3)
+
+print(work())
+"""
+
+
+def sample_at_probe(tmp_path):
+    """a sampler that takes one sample every time the program calls probe()"""
+    path = str(tmp_path / "prog.jan")
+    jan = interpreter.Interpreter([str(tmp_path)])
+    sampler = sampling.Sampler(jan, path)
+    jan.environment.declare("probe", "native_function")
+    jan.environment.assign("probe", values.NativeFunction("probe", lambda: sampler.sample(sys._getframe())))
+    jan.execute(frontend.parse_native(FIB))
+    return sampler, path
+
+
+def test_rebuilds_jan_stacks(tmp_path, capsys):
+    sampler, path = sample_at_probe(tmp_path)
+    module, work, fib_3 = ("<module>", path, 10), ("work", path, 8), ("fib", path, 5)
+    assert sampler.stacks == {
+        (module, work, fib_3, ("fib", path, 5), ("fib", path, 3)): 2,
+        (module, work, fib_3, ("fib", path, 3)): 1,
+    }
+
+
+def test_collapsed_output(tmp_path, capsys):
+    sampler, path = sample_at_probe(tmp_path)
+    sampler.write(str(tmp_path / "out.txt"))
+    lines = (tmp_path / "out.txt").read_text().splitlines()
+    assert "<module> (prog.jan:10);work (prog.jan:8);fib (prog.jan:5);fib (prog.jan:3) 1" in lines
+    assert len(lines) == 2
+
+
+def test_speedscope_output(tmp_path, capsys):
+    sampler, path = sample_at_probe(tmp_path)
+    sampler.write(str(tmp_path / "out.json"))
+    document = json.loads((tmp_path / "out.json").read_text())
+    frames = document["shared"]["frames"]
+    profile, = document["profiles"]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"]) == 2
+    names = [[frames[i]["name"] for i in sample] for sample in profile["samples"]]
+    assert ["<module>", "work", "fib", "fib"] in names
+
+
+def test_background_sampling(tmp_path, capsys):
+    text = FIB.replace("        probe()\n", "").replace("fib(3)", "fib(17)")
+    jan = interpreter.Interpreter([str(tmp_path)])
+    with sampling.Sampler(jan, "prog.jan", interval=0.001) as sampler:
+        jan.execute(frontend.parse_native(text))
+    assert sampler.stacks
+    assert all(stack[0][0] == "<module>" for stack in sampler.stacks)
+    assert any(len(stack) > 5 and stack[1][0] == "work" for stack in sampler.stacks)
+
+
+def test_functions_restored_by_prelude(tmp_path, capsys):
+    # main.py builds the sampler before a prelude snapshot replaces the globals
+    prelude = tmp_path / "prelude.jan"
+    prelude.write_text("def f():\n    return 1\n")
+    snapshot.run_prelude(interpreter.Interpreter([str(tmp_path)]), str(prelude))
+    path = str(tmp_path / "prog.jan")
+    jan = interpreter.Interpreter([str(tmp_path)])
+    sampler = sampling.Sampler(jan, path)
+    assert snapshot.run_prelude(jan, str(prelude))
+    with sampler:
+        assert sampler.function_path(jan.environment.get("f").value) == path
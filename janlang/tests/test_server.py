@@ -0,0 +1,65 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import pytest
+import client
+
+JANLANG = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def socket_path():
+    # unix socket paths are limited to about 100 bytes, too short for tmp_path
+    directory = tempfile.mkdtemp(prefix="jan-")
+    path = os.path.join(directory, "jan.sock")
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(JANLANG, "server.py"), "serve", "--socket", path],
+        cwd=JANLANG,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(path):
+            assert server.poll() is None and time.monotonic() < deadline, "server did not start"
+            time.sleep(0.02)
+        yield path
+    finally:
+        server.terminate()
+        server.wait()
+        if os.path.exists(path):
+            os.unlink(path)
+        os.rmdir(directory)
+
+
+def run(socket_path, path):
+    out, err = io.BytesIO(), io.BytesIO()
+    status = client.run(str(path), socket_path, out, err)
+    return status, out.getvalue().decode(), err.getvalue().decode()
+
+
+def test_runs_scripts_in_fresh_interpreters(socket_path, tmp_path):
+    script = tmp_path / "count.jan"
+    script.write_text("var total = 1 + 2\nprint(total)\n")
+    assert run(socket_path, script) == (0, "3\n", "")
+    # a second run does not see the first one's globals
+    assert run(socket_path, script) == (0, "3\n", "")
+
+
+def test_imports_relative_to_the_script(socket_path, tmp_path):
+    (tmp_path / "numbers.jan").write_text("def seven():\n    return 7\n")
+    script = tmp_path / "main.jan"
+    script.write_text("import numbers\nvar seven = numbers.seven\nprint(seven())\n")
+    status, out, err = run(socket_path, script)
+    assert status == 0 and out.splitlines()[-1] == "7"
+
+
+def test_errors_go_to_stderr(socket_path, tmp_path):
+    script = tmp_path / "broken.jan"
+    script.write_text("print(1)\nprint(missing)\n")
+    status, out, err = run(socket_path, script)
+    assert status == 1
+    assert out == "1\n"
+    assert "missing not in environment" in err
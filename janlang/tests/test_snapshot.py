@@ -0,0 +1,111 @@
+import pytest
+import errors
+import frontend
+import interpreter
+import snapshot
+import values
+
+SETUP = """\
+def make_counter(start):
+    def count(n):
+        if n == 0:
+            return start
+        return count(n - 1) + 1
+    return count
+
+class Point:
+    init(x):
+        pass
+
+var count_from_ten = make_counter(10)
+var table = [1, 2, 3]
+"""
+
+
+def run(jan, text):
+    jan.execute(frontend.parse_native(text))
+
+
+def test_restores_cyclic_closures_and_classes(capsys):
+    jan = interpreter.Interpreter([])
+    run(jan, SETUP)
+    data = snapshot.dumps(jan)
+    restored = interpreter.Interpreter([])
+    snapshot.loads(restored, data)
+    count = restored.environment.get("count_from_ten").value
+    # the closure still refers to the function itself
+    assert count.closure.get("count").value is count
+    assert restored.environment.get("Point").value.name == "Point"
+    run(restored, "print(count_from_ten(3))\nprint(table[2])\ntable.push(4)\nprint(table.pop())\n")
+    assert capsys.readouterr().out == "13\n3\n4\n"
+
+
+def test_restores_ranges():
+    jan = interpreter.Interpreter([])
+    run(jan, "var r = range(2, 10, 3)\n")
+    restored = interpreter.Interpreter([])
+    snapshot.loads(restored, snapshot.dumps(jan))
+    assert list(restored.environment.get("r").value.range) == [2, 5, 8]
+
+
+class Exploit:
+    def __reduce__(self):
+        return (print, ("pwned",))
+
+
+def test_refuses_to_construct_foreign_objects(capsys):
+    jan = interpreter.Interpreter([])
+    run(jan, "var x = 1\n")
+    jan.environment.get("x").value = Exploit()
+    data = snapshot.dumps(jan)
+    with pytest.raises(errors.JanSnapshotError, match="builtins.print"):
+        snapshot.loads(interpreter.Interpreter([]), data)
+    assert capsys.readouterr().out == ""
+
+
+def test_refuses_code_in_the_header(tmp_path, capsys):
+    import pickle
+
+    jan = interpreter.Interpreter([])
+    data = snapshot.dumps(jan)
+    _, body = data.split(b"\n", 1)
+    tampered = pickle.dumps(Exploit()) + b"\n" + body
+    assert not snapshot.is_current(tampered)
+    with pytest.raises(errors.JanSnapshotError):
+        snapshot.loads(jan, tampered)
+    path = tmp_path / "tampered.heap"
+    path.write_bytes(tampered)
+    assert not snapshot.load(jan, str(path))
+    assert capsys.readouterr().out == ""
+
+
+def test_builtins_are_restored_by_reference():
+    jan = interpreter.Interpreter([])
+    run(jan, "var p = print\n")
+    restored = interpreter.Interpreter([])
+    snapshot.loads(restored, snapshot.dumps(jan))
+    assert restored.environment.fallback is interpreter.builtins()
+    assert restored.environment.get("p").value is interpreter.builtins().get("print").value
+
+
+def test_unpicklable_values():
+    jan = interpreter.Interpreter([])
+    jan.environment.declare("local", "native_function")
+    jan.environment.assign("local", values.NativeFunction("local", lambda: None))
+    with pytest.raises(errors.JanSnapshotError):
+        snapshot.dumps(jan)
+
+
+def test_prelude_is_restored_until_its_source_changes(tmp_path, capsys):
+    prelude = tmp_path / "setup.jan"
+    prelude.write_text(SETUP)
+    first = interpreter.Interpreter([str(tmp_path)])
+    assert not snapshot.run_prelude(first, str(prelude))
+    second = interpreter.Interpreter([str(tmp_path)])
+    assert snapshot.run_prelude(second, str(prelude))
+    run(second, "print(count_from_ten(1))\n")
+    assert capsys.readouterr().out == "11\n"
+    prelude.write_text(SETUP + "var extra = 1\n")
+    third = interpreter.Interpreter([str(tmp_path)])
+    assert not snapshot.run_prelude(third, str(prelude))
+    assert third.environment.get("extra").value.proxy == 1
@@ -0,0 +1,48 @@
+import astree as ast
+import frontend
+import interpreter
+import stats
+import values
+
+PROGRAM = """\
+def first_even(items):
+    for var x in items:
+        if x > 3:
+            break
+        if x == 1:
+            continue
+        print(x)
+    return 0
+
+first_even([1, 2, 5])
+"""
+
+
+def collect(text):
+    jan = interpreter.Interpreter()
+    counters = stats.RuntimeStats()
+    jan.add_hook(counters)
+    try:
+        jan.execute(frontend.parse_native(text))
+    finally:
+        jan.remove_hook(counters)
+    return counters
+
+
+def test_counts(capsys):
+    counters = collect(PROGRAM)
+    assert counters.nodes[ast.ForStatement] == 1
+    assert counters.nodes[ast.Call] == 2
+    assert counters.exceptions == {"Return": 1, "Break": 1, "Continue": 1}
+    assert counters.values[values.List] == 1
+    assert counters.values[values.Function] == 1
+    assert counters.environments > 0
+    assert counters.deep_copies > 0
+
+
+def test_report(capsys):
+    counters = collect(PROGRAM)
+    report = counters.report()
+    assert "ForStatement" in report
+    assert "1  Break raised" in report
+    assert counters.as_dict()["exceptions"]["Continue"] == 1
@@ -0,0 +1,63 @@
+import pytest
+import utterances
+
+
+@pytest.fixture
+def matcher():
+    m = utterances.UtteranceMatcher()
+    m.define("digit", "(one | two=2 | three)")
+    m.add_command("open (window | tab) [quickly] <digit>_1-3", "open")
+    m.add_command("go (left=1 | right=2)_2", "go")
+    m.add_command("say hello*", "say")
+    m.add_command("open window one", "shadowed")
+    return m
+
+
+@pytest.mark.parametrize(
+    "text, action",
+    [
+        ("open window one", "open"),
+        ("open tab quickly one two three", "open"),
+        ("go left right", "go"),
+        ("say", "say"),
+        ("say hello hello hello", "say"),
+        ("go left", None),
+        ("open window", None),
+        ("open window one two three one", None),
+    ],
+)
+def test_recognition(matcher, text, action):
+    match = matcher.match(text)
+    assert (match and match.command.action) == action
+
+
+@pytest.mark.parametrize("eager", [False, True])
+def test_eager_and_lazy_automata_agree(matcher, eager):
+    matcher.compile(eager=eager)
+    assert matcher.match("open tab two").command.action == "open"
+
+
+def test_substitute_captures(matcher):
+    match = matcher.match("go right left")
+    assert [(c.slot, c.words) for c in match.captures] == [(1, ["right"]), (0, ["left"])]
+    match = matcher.match("open tab three two")
+    assert [c.words for c in match.captures] == [["two"]]
+
+
+def test_undefined_and_recursive_references():
+    m = utterances.UtteranceMatcher()
+    m.add_command("say <missing>")
+    with pytest.raises(utterances.UtteranceError):
+        m.match("say")
+    m = utterances.UtteranceMatcher()
+    m.define("loop", "again <loop>")
+    m.add_command("<loop>")
+    with pytest.raises(utterances.UtteranceError):
+        m.match("again")
+
+
+def test_load_command_module():
+    m = utterances.UtteranceMatcher()
+    m.load_command_module("color := (red | blue)\npaint <color> = print(1)\n")
+    assert m.match("paint blue") is not None
+    assert m.match("paint green") is None
@@ -27,6 +27,10 @@ class OrToken(BaseToken):
     pass
 
 
+class AndToken(BaseToken):
+    pass
+
+
 class OpenParen(BaseToken):
     pass
 
@@ -87,6 +91,10 @@ class Slash(BaseToken):
     pass
 
 
+class DoubleStar(BaseToken):
+    pass
+
+
 class Dot(BaseToken):
     pass
 
@@ -115,6 +123,10 @@ class Return(BaseToken):
     pass
 
 
+class Yield(BaseToken):
+    pass
+
+
 class Whitespace(BaseToken):
     def __init__(self, text):
         self.text = text
@@ -224,5 +236,8 @@ class FinallyToken(BaseToken):
 class Pass(BaseToken):
     pass
 
+class Import(BaseToken):
+    pass
+
 class This(BaseToken):
     pass
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Chrome trace-event output for jan programs, used by main.py --trace
+
+Function calls and statements become duration events, and the number of values
+and environments created so far is written as counters after every call. The
+file loads in chrome://tracing and ui.perfetto.dev. Timestamps come from
+time.perf_counter_ns and events carry the real process and thread ids, so a
+trace of the Python host taken with the same clock lines up with the jan one.
+"""
+import json
+import os
+import threading
+import time
+import hooks
+import values
+
+
+class TraceWriter(hooks.Hooks):
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.events: list[dict] = []
+        self.pid = os.getpid()
+        self.tid = threading.get_native_id()
+        self.allocations = 0
+        self.environments = 0
+
+    def event(self, phase: str, name: str, category: str, args: dict | None = None):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": phase,
+            "ts": self.clock() / 1000,
+            "pid": self.pid,
+            "tid": self.tid,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def function_enter(self, fn, args, kwargs):
+        category = "native" if isinstance(fn, values.NativeFunction) else "function"
+        self.event("B", fn.name, category)
+
+    def function_exit(self, fn, result):
+        category = "native" if isinstance(fn, values.NativeFunction) else "function"
+        self.event("E", fn.name, category)
+        self.counters()
+
+    def statement_enter(self, node):
+        self.event("B", f"line {node.line}", "statement", {"statement": type(node).__name__})
+
+    def statement_exit(self, node):
+        self.event("E", f"line {node.line}", "statement")
+
+    def allocation(self, value):
+        self.allocations += 1
+
+    def environment_created(self, env):
+        self.environments += 1
+
+    def counters(self):
+        self.event("C", "allocations", "memory", {"values": self.allocations, "environments": self.environments})
+
+    def write(self, path: str):
+        self.counters()
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,374 @@
+"""
+compiles osspeak utterances (lark_parser.osspeak_grammar) into one shared
+word-level automaton. Every command is added to a single NFA which is turned
+into a DFA lazily, one state at a time, so recognising spoken input costs one
+dictionary lookup per word no matter how many commands are loaded.
+"""
+from __future__ import annotations
+from lark import Token, Tree
+import lark_parser
+
+
+class UtteranceError(Exception):
+    pass
+
+
+class UtteranceNode:
+    pass
+
+
+class Word(UtteranceNode):
+    def __init__(self, word: str):
+        self.word = word
+
+
+class Sequence(UtteranceNode):
+    def __init__(self, items: list[UtteranceNode]):
+        self.items = items
+
+
+class Choice(UtteranceNode):
+    def __init__(self, alternatives: list[UtteranceNode]):
+        self.alternatives = alternatives
+
+
+class Repeat(UtteranceNode):
+    def __init__(self, item: UtteranceNode, low: int, high: int | None):
+        if high is not None and high < low:
+            raise UtteranceError(f"Invalid repetition range {low}-{high}")
+        self.item = item
+        self.low = low
+        self.high = high
+
+
+class Reference(UtteranceNode):
+    def __init__(self, name: str):
+        self.name = name
+
+
+class Substitute(UtteranceNode):
+    def __init__(self, item: UtteranceNode, action):
+        self.item = item
+        self.action = action
+
+
+def optional(item: UtteranceNode) -> Choice:
+    return Choice([item, Sequence([])])
+
+
+def from_lark(tree: Tree) -> UtteranceNode:
+    """utterance node from a lark_parser.parse_utterance tree"""
+    if tree.data == "utterance":
+        return from_lark(tree.children[0])
+    if tree.data == "utterance_choices_items":
+        alternatives = [from_lark(child) for child in tree.children]
+        return alternatives[0] if len(alternatives) == 1 else Choice(alternatives)
+    if tree.data == "utterance_sequence":
+        items = [from_lark(child) for child in tree.children]
+        return items[0] if len(items) == 1 else Sequence(items)
+    if tree.data == "utterance_piece":
+        content, repetition, substitute = tree.children
+        node = piece_content(content)
+        if repetition is not None:
+            node = Repeat(node, *repetition_range(repetition))
+        if substitute is not None:
+            node = Substitute(node, substitute.children[0])
+        return node
+    raise UtteranceError(f"Unexpected utterance node {tree.data}")
+
+
+def piece_content(content) -> UtteranceNode:
+    if isinstance(content, Token):
+        return Word(str(content))
+    if content.data == "utterance_reference":
+        [name] = content.children[0].children
+        return Reference(str(name))
+    if content.data == "utterance_choices":
+        return from_lark(content.children[0])
+    if content.data == "utterance_choices_optional":
+        return optional(from_lark(content.children[0]))
+    raise UtteranceError(f"Unexpected utterance piece {content.data}")
+
+
+def repetition_range(repetition: Tree | Token) -> tuple[int, int | None]:
+    children = repetition.children if isinstance(repetition, Tree) else [repetition]
+    if len(children) == 1:
+        return {"*": (0, None), "+": (1, None), "?": (0, 1)}[str(children[0])]
+    count = children[1]
+    if isinstance(count, Token):
+        return int(count), int(count)
+    low, high = count.children
+    return int(low), None if high is None else int(high)
+
+
+class Command:
+    def __init__(self, index: int, utterance: UtteranceNode, action):
+        self.index = index
+        self.utterance = utterance
+        self.action = action
+
+
+class Capture:
+    def __init__(self, slot: int, words: list[str], action):
+        self.slot = slot
+        self.words = words
+        self.action = action
+
+    def __repr__(self) -> str:
+        return f"Capture(slot={self.slot}, words={self.words})"
+
+
+class Match:
+    def __init__(self, command: Command, words: list[str], captures: list[Capture]):
+        self.command = command
+        self.words = words
+        self.captures = captures
+
+
+class UtteranceMatcher:
+    def __init__(self):
+        self.named_utterances: dict[str, UtteranceNode] = {}
+        self.commands: list[Command] = []
+        self._automaton: Automaton | None = None
+
+    def define(self, name: str, utterance: str | UtteranceNode):
+        self.named_utterances[name] = self._to_node(utterance)
+        self._automaton = None
+
+    def add_command(self, utterance: str | UtteranceNode, action=None) -> Command:
+        command = Command(len(self.commands), self._to_node(utterance), action)
+        self.commands.append(command)
+        self._automaton = None
+        return command
+
+    def load_command_module(self, text: str):
+        for node in lark_parser.parse_command_module(text).children:
+            if node.data == "named_utterance":
+                [name] = node.children[0].children
+                self.define(str(name), from_lark(node.children[1]))
+            elif node.data == "command":
+                utterance, action = node.children
+                self.add_command(from_lark(utterance), action)
+
+    @property
+    def automaton(self) -> Automaton:
+        if self._automaton is None:
+            self._automaton = Automaton(self.commands, self.named_utterances)
+        return self._automaton
+
+    def compile(self, eager=False) -> Automaton:
+        """
+        build the automaton now rather than on the first match. With eager=True
+        the whole dfa is built so no match ever pays for determinization
+        """
+        automaton = self.automaton
+        if eager:
+            automaton.determinize()
+        return automaton
+
+    def match(self, text: str | list[str]) -> Match | None:
+        words = text.split() if isinstance(text, str) else text
+        automaton = self.automaton
+        command_index = automaton.recognize(words)
+        if command_index is None:
+            return None
+        command = self.commands[command_index]
+        captures = automaton.captures(command, words)
+        return Match(command, words, captures)
+
+    def _to_node(self, utterance: str | UtteranceNode) -> UtteranceNode:
+        if isinstance(utterance, UtteranceNode):
+            return utterance
+        return from_lark(lark_parser.parse_utterance(utterance))
+
+
+class Automaton:
+    DEAD = -1
+
+    def __init__(self, commands: list[Command], named_utterances: dict[str, UtteranceNode]):
+        self.named_utterances = named_utterances
+        # nfa
+        self.transitions: list[dict[str, list[int]]] = []
+        self.epsilons: list[list[int]] = []
+        self.accepting: dict[int, int] = {}
+        # lazily built dfa, a state is an epsilon closed set of nfa states
+        self.dfa_ids: dict[frozenset[int], int] = {}
+        self.dfa_sets: list[frozenset[int]] = []
+        self.dfa_transitions: list[dict[str, int] | None] = []
+        self.dfa_accepting: list[int | None] = []
+        self.slots: dict[int, dict[int, int]] = {}
+        start = self.new_state()
+        for command in commands:
+            command_start = self.new_state()
+            self.epsilons[start].append(command_start)
+            end = self.build(command.utterance, command_start, [])
+            self.accepting[end] = command.index
+            self.slots[command.index] = self.number_slots(command.utterance)
+        self.start = self.dfa_state(self.closure([start]))
+        # the start state fans out to every command, expand it up front
+        self.expand(self.start)
+
+    def new_state(self) -> int:
+        self.transitions.append({})
+        self.epsilons.append([])
+        return len(self.transitions) - 1
+
+    def build(self, node: UtteranceNode, start: int, expanding: list[str]) -> int:
+        """add node to the nfa starting at start, returning its end state"""
+        if isinstance(node, Word):
+            end = self.new_state()
+            self.transitions[start].setdefault(node.word, []).append(end)
+            return end
+        if isinstance(node, Sequence):
+            current = start
+            for item in node.items:
+                current = self.build(item, current, expanding)
+            end = self.new_state()
+            self.epsilons[current].append(end)
+            return end
+        if isinstance(node, Choice):
+            end = self.new_state()
+            for alternative in node.alternatives:
+                alternative_start = self.new_state()
+                self.epsilons[start].append(alternative_start)
+                self.epsilons[self.build(alternative, alternative_start, expanding)].append(end)
+            return end
+        if isinstance(node, Repeat):
+            current = start
+            for _ in range(node.low):
+                current = self.build(node.item, current, expanding)
+            end = self.new_state()
+            self.epsilons[current].append(end)
+            if node.high is None:
+                loop_start = self.new_state()
+                self.epsilons[current].append(loop_start)
+                loop_end = self.build(node.item, loop_start, expanding)
+                self.epsilons[loop_end].extend((loop_start, end))
+                return end
+            for _ in range(node.high - node.low):
+                current = self.build(node.item, current, expanding)
+                self.epsilons[current].append(end)
+            return end
+        if isinstance(node, Reference):
+            return self.build(self.resolve(node, expanding), start, expanding + [node.name])
+        if isinstance(node, Substitute):
+            return self.build(node.item, start, expanding)
+        raise UtteranceError(f"Unexpected utterance node {node}")
+
+    def resolve(self, reference: Reference, expanding: list[str]) -> UtteranceNode:
+        if reference.name in expanding:
+            raise UtteranceError(f"Recursive utterance reference <{reference.name}>")
+        try:
+            return self.named_utterances[reference.name]
+        except KeyError:
+            raise UtteranceError(f"Undefined utterance <{reference.name}>") from None
+
+    def closure(self, states) -> frozenset[int]:
+        seen = set(states)
+        stack = list(states)
+        while stack:
+            for next_state in self.epsilons[stack.pop()]:
+                if next_state not in seen:
+                    seen.add(next_state)
+                    stack.append(next_state)
+        return frozenset(seen)
+
+    def dfa_state(self, nfa_states: frozenset[int]) -> int:
+        state_id = self.dfa_ids.get(nfa_states)
+        if state_id is None:
+            state_id = len(self.dfa_sets)
+            self.dfa_ids[nfa_states] = state_id
+            self.dfa_sets.append(nfa_states)
+            self.dfa_transitions.append(None)
+            commands = [self.accepting[s] for s in nfa_states if s in self.accepting]
+            # the first command added wins when several accept the same words
+            self.dfa_accepting.append(min(commands) if commands else None)
+        return state_id
+
+    def expand(self, state_id: int) -> dict[str, int]:
+        targets: dict[str, list[int]] = {}
+        for nfa_state in self.dfa_sets[state_id]:
+            for word, next_states in self.transitions[nfa_state].items():
+                targets.setdefault(word, []).extend(next_states)
+        table = {word: self.dfa_state(self.closure(states)) for word, states in targets.items()}
+        self.dfa_transitions[state_id] = table
+        return table
+
+    def determinize(self):
+        state_id = 0
+        while state_id < len(self.dfa_sets):
+            if self.dfa_transitions[state_id] is None:
+                self.expand(state_id)
+            state_id += 1
+
+    def recognize(self, words: list[str]) -> int | None:
+        state = self.start
+        for word in words:
+            table = self.dfa_transitions[state]
+            if table is None:
+                table = self.expand(state)
+            state = table.get(word, self.DEAD)
+            if state == self.DEAD:
+                return None
+        return self.dfa_accepting[state]
+
+    def number_slots(self, node: UtteranceNode) -> dict[int, int]:
+        slots: dict[int, int] = {}
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Substitute):
+                slots[id(node)] = len(slots)
+                stack.append(node.item)
+            elif isinstance(node, Sequence):
+                stack.extend(reversed(node.items))
+            elif isinstance(node, Choice):
+                stack.extend(reversed(node.alternatives))
+            elif isinstance(node, Repeat):
+                stack.append(node.item)
+            elif isinstance(node, Reference):
+                stack.append(self.named_utterances[node.name])
+        return slots
+
+    def captures(self, command: Command, words: list[str]) -> list[Capture]:
+        """recover action_substitute slots by backtracking over the one matched command"""
+        slots = self.slots[command.index]
+        for end, captures in self.walk(command.utterance, words, 0, (), slots, []):
+            if end == len(words):
+                return list(captures)
+        raise UtteranceError("Recognized words do not match the command")
+
+    def walk(self, node, words, pos, captures, slots, expanding):
+        if isinstance(node, Word):
+            if pos < len(words) and words[pos] == node.word:
+                yield pos + 1, captures
+        elif isinstance(node, Sequence):
+            yield from self.walk_sequence(node.items, 0, words, pos, captures, slots, expanding)
+        elif isinstance(node, Choice):
+            for alternative in node.alternatives:
+                yield from self.walk(alternative, words, pos, captures, slots, expanding)
+        elif isinstance(node, Repeat):
+            yield from self.walk_repeat(node, 0, words, pos, captures, slots, expanding)
+        elif isinstance(node, Reference):
+            resolved = self.resolve(node, expanding)
+            yield from self.walk(resolved, words, pos, captures, slots, expanding + [node.name])
+        elif isinstance(node, Substitute):
+            for end, inner in self.walk(node.item, words, pos, captures, slots, expanding):
+                capture = Capture(slots.get(id(node), -1), words[pos:end], node.action)
+                yield end, inner + (capture,)
+
+    def walk_sequence(self, items, i, words, pos, captures, slots, expanding):
+        if i == len(items):
+            yield pos, captures
+            return
+        for end, inner in self.walk(items[i], words, pos, captures, slots, expanding):
+            yield from self.walk_sequence(items, i + 1, words, end, inner, slots, expanding)
+
+    def walk_repeat(self, node: Repeat, count, words, pos, captures, slots, expanding):
+        if node.high is None or count < node.high:
+            for end, inner in self.walk(node.item, words, pos, captures, slots, expanding):
+                # an empty match only counts towards the minimum, otherwise it could loop forever
+                if end > pos or count < node.low:
+                    yield from self.walk_repeat(node, count + 1, words, end, inner, slots, expanding)
+        if count >= node.low:
+            yield pos, captures
@@ -11,4 +11,7 @@ from values.base import BaseValue
 from values.function import Function, NativeFunction
 from values.class_definition import ClassDefinition
 from values.class_instance import ClassInstance
+from values.module import Module
+from values.iterator import Iterator, Generator
+from values.range import Range
 # from values.attributes import expose
\ No newline at end of file
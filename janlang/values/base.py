@@ -1,8 +1,5 @@
 from __future__ import annotations
-import types
-from typing import Any
 import operator
-import inspect
 
 
 def create_type_maps():
@@ -30,7 +27,7 @@ class NoProxy:
 
 
 class BaseValue:
-    def __init__(self, proxy: Any = NoProxy) -> None:
+    def __init__(self, proxy: object = NoProxy) -> None:
         global map_python_to_jan_types
         global map_jan_to_python_types
         if not (isinstance(proxy, NoProxy) or proxy is NoProxy):
@@ -66,6 +63,12 @@ class BaseValue:
     def __div__(self, other: BaseValue):
         return binary_op(self, other, operator.div)
 
+    def __truediv__(self, other: BaseValue):
+        return binary_op(self, other, operator.truediv)
+
+    def __pow__(self, other: BaseValue):
+        return binary_op(self, other, operator.pow)
+
     def __eq__(self, other: BaseValue):
         return binary_op(self, other, operator.eq)
 
@@ -106,6 +109,11 @@ class BaseValue:
         if not isinstance(self.proxy, NoProxy):
             return iter(self.proxy)
         raise NotImplementedError
+
+    def __len__(self):
+        if not isinstance(self.proxy, NoProxy):
+            return len(self.proxy)
+        raise NotImplementedError
     
     def getattr(self, name: str):
         return self.attributes[name]
@@ -1,4 +1,3 @@
-from typing import Any
 from values import base, function
 import astree as ast
 
@@ -1,4 +1,3 @@
-from typing import Any
 from values import base, function, class_definition
 import astree as ast
 
@@ -1,8 +1,7 @@
 import environment
-import inspect
 import values
 import astree as ast
-from typing import Any, Callable
+from collections.abc import Callable
 
 class NativeFunction(values.BaseValue):
     
@@ -16,23 +15,27 @@ class NativeFunction(values.BaseValue):
 
 class Function(values.BaseValue):
 
-    def __init__(self, name: str, parameters: list[ast.Parameter], defaults, body: ast.Block | Callable, closure):
+    def __init__(self, name: str, parameters: list[ast.Parameter], defaults, body: ast.Block | Callable, closure, is_generator=False):
         super().__init__()
         self.name = name
         self.parameters = parameters
         self.defaults = defaults
         self.body = body
         self.closure: environment.Environment = closure
+        # the body yields, so calling returns a values.Generator
+        self.is_generator = is_generator
 
     @classmethod
-    def from_ast(cls, func_ast: ast.FunctionDefinition, closure):
-        return cls(func_ast.name, func_ast.parameters, func_ast.defaults, func_ast.body, closure)
+    def from_ast(cls, func_ast: ast.FunctionDefinition, closure, is_generator=False):
+        return cls(func_ast.name, func_ast.parameters, func_ast.defaults, func_ast.body, closure, is_generator)
 
     def call(self, interpreter, args, kwargs):
         env = self.closure.add_child()
         for arg, param in zip(args, self.parameters):
             env.declare(param.name, 'parameter')
             env.assign(param.name, arg)
+        if self.is_generator:
+            return interpreter.start_generator(self, env)
         try:
             interpreter.execute_block(self.body, env)
         except Return as ret:
@@ -0,0 +1,30 @@
+from values import base
+
+
+class Iterator(base.BaseValue):
+    """a value produced one element at a time, from iter() or a generator function"""
+
+    def __init__(self, iterator) -> None:
+        super().__init__()
+        self.iterator = iterator
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.iterator)
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self) -> str:
+        return f"<iterator at {id(self):#x}>"
+
+
+class Generator(Iterator):
+    def __init__(self, name: str, iterator) -> None:
+        super().__init__(iterator)
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"<generator {self.name} at {id(self):#x}>"
@@ -0,0 +1,31 @@
+from values import base
+
+
+class Module(base.BaseValue):
+    """
+    an imported jan module, parsed and executed the first time one of its
+    attributes is used
+    """
+
+    def __init__(self, name: str, path: str, interpreter) -> None:
+        super().__init__()
+        import environment
+        self.name = name
+        self.path = path
+        self.interpreter = interpreter
+        self.environment: environment.Environment | None = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.environment is not None
+
+    def getattr(self, name: str):
+        if self.environment is None:
+            self.interpreter.load_module(self)
+        if name not in self.environment.values:
+            import errors
+            raise errors.JanRuntimeException(f"Module {self.name} has no attribute {name}")
+        return self.environment.values[name].value
+
+    def __repr__(self) -> str:
+        return f"<module {self.name} from {self.path}>"
@@ -0,0 +1,30 @@
+from values import base, integer
+
+
+class Range(base.BaseValue):
+    """integers from start up to stop by step, computed when needed instead of stored"""
+
+    def __init__(self, start: int, stop: int, step: int = 1) -> None:
+        super().__init__()
+        self.range = range(start, stop, step)
+
+    def __reduce__(self):
+        return type(self), (self.range.start, self.range.stop, self.range.step)
+
+    def __iter__(self):
+        return map(integer.Integer, self.range)
+
+    def __len__(self):
+        return len(self.range)
+
+    def __bool__(self):
+        return len(self.range) > 0
+
+    def __getitem__(self, i: base.BaseValue):
+        return integer.Integer(self.range[base.get_python_obj(i)])
+
+    def __repr__(self) -> str:
+        r = self.range
+        if r.step == 1:
+            return f"range({r.start}, {r.stop})"
+        return f"range({r.start}, {r.stop}, {r.step})"